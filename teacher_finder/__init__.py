@@ -0,0 +1,4 @@
+"""선생님 발굴 자동화 파이프라인
+
+Streamlit 앱(app.py)과 CLI(python -m teacher_finder)가 함께 사용하는 파이프라인 코드입니다.
+"""
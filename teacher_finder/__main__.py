@@ -0,0 +1,242 @@
+"""선생님 발굴 자동화 CLI
+
+사용 예:
+    python -m teacher_finder run --sheet URL --count 3
+    python -m teacher_finder run --sheet URL --keyword "스피치 자신감"
+    python -m teacher_finder add-keywords --storage sqlite "스피치 자신감" "발표 불안"
+    python -m teacher_finder run --storage sqlite --count 2
+    python -m teacher_finder bench-parsers --repeat 50
+    python -m teacher_finder bench-ingest --rows 500000 --format parquet
+    python -m teacher_finder bench-pipeline --scales 1 10 --save-baseline
+"""
+import argparse
+import logging
+import sys
+
+from . import bench, events, fakes, ingest
+from .engine import PipelineSettings, purge_stale_data, run_batch_automation, run_full_automation
+from .ledger import LEDGER_MAX_AGE_DAYS
+from .sheet_writer import get_sheet_writer
+from .storage import STORAGE_KINDS, STORAGE_MIRROR, STORAGE_SHEETS, STORAGE_SQLITE, open_storage
+
+# 종료 전에 스프레드시트 저장을 기다리는 최대 시간 (초)
+SHEET_WRITE_TIMEOUT = 120
+
+_LEVEL_PREFIXES = {
+    "warning": "[경고] ",
+    "error": "[오류] ",
+    "exception": "[예외] ",
+}
+
+
+def print_event(event):
+    """로그 이벤트를 콘솔에 출력하는 구독자 (진행률/단계 이벤트는 로그로 이미 표시되므로 생략)"""
+    if event.kind == "log":
+        stream = sys.stderr if event.level in ("warning", "error", "exception") else sys.stdout
+        if event.level == "subheader":
+            print(f"\n{'=' * 50}\n{event.message}\n{'=' * 50}", file=stream, flush=True)
+        else:
+            print(f"{_LEVEL_PREFIXES.get(event.level, '')}{event.message}", file=stream, flush=True)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m teacher_finder", description="선생님 발굴 자동화 CLI")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="시트의 키워드(또는 지정한 키워드)로 전체 자동화 실행")
+    add_storage_arguments(run_parser)
+    run_parser.add_argument("--count", type=int, default=3, help="시트에서 처리할 키워드 수 (기본값: 3)")
+    run_parser.add_argument("--keyword", action="append", help="시트 대신 처리할 키워드 (여러 번 지정 가능)")
+    run_parser.add_argument("--max-videos", type=int, default=5, help="키워드별 댓글 수집할 영상 수")
+    run_parser.add_argument("--max-comments", type=int, default=20, help="영상당 수집할 댓글 수")
+    run_parser.add_argument("--include-replies", action="store_true", help="대댓글 포함")
+    run_parser.add_argument("--videos-per-keyword", type=int, default=3, help="검색 키워드당 수집할 스크립트 수")
+    run_parser.add_argument("--min-subscribers", type=int, default=5000, help="최소 구독자 수")
+    run_parser.add_argument("--no-dedupe", action="store_true", help="중복 채널 필터링 끄기")
+    run_parser.add_argument("--emails", action="store_true", help="영업 이메일 생성 단계 실행")
+    run_parser.add_argument("--parallel", type=int, default=3, help="배치 처리에서 동시에 진행할 키워드 수 (기본값: 3)")
+    run_parser.add_argument("--resume", action="store_true", help="같은 키워드의 마지막 미완료 실행을 완료된 단계 다음부터 이어서 실행")
+    run_parser.add_argument("--no-checkpoints", action="store_true", help="단계별 체크포인트 저장 끄기")
+    run_parser.add_argument("--no-export", action="store_true", help="실행 결과 Parquet/JSONL 내보내기 끄기")
+    run_parser.add_argument("--no-history", action="store_true", help="실행 기록 저장소에 기록하지 않기")
+    run_parser.add_argument("--no-reuse-scores", action="store_true", help="이전에 평가한 영상도 매칭에 다시 보내기")
+    run_parser.add_argument("--score-max-age", type=int, default=LEDGER_MAX_AGE_DAYS, help=f"재사용할 수 있는 점수의 최대 나이 (일, 기본값: {LEDGER_MAX_AGE_DAYS})")
+    run_parser.add_argument("--quiet", action="store_true", help="경고/오류만 출력")
+
+    add_parser = subparsers.add_parser("add-keywords", help="저장소의 키워드 목록에 키워드 추가")
+    add_storage_arguments(add_parser)
+    add_parser.add_argument("keywords", nargs="+", help="추가할 키워드")
+    add_parser.add_argument("--quiet", action="store_true", help="경고/오류만 출력")
+
+    bench_parser = subparsers.add_parser("bench-parsers", help="기록된 Claude 응답으로 파서 마이크로벤치마크 실행")
+    bench_parser.add_argument("files", nargs="*", help="체크포인트 외에 추가로 측정할 응답 텍스트 파일")
+    bench_parser.add_argument("--repeat", type=int, default=20, help="입력별 반복 횟수 (기본값: 20)")
+    bench_parser.add_argument("--quiet", action="store_true", help="경고/오류만 출력")
+
+    ingest_parser = subparsers.add_parser("bench-ingest", help="합성 댓글 파일로 댓글 파일 읽기 시간과 최대 메모리 측정")
+    ingest_parser.add_argument("--rows", type=int, default=bench.INGEST_BENCH_ROWS, help="댓글 수 (기본값: 500000)")
+    ingest_parser.add_argument("--format", choices=(ingest.FORMAT_CSV, ingest.FORMAT_PARQUET, ingest.FORMAT_JSONL), default=ingest.FORMAT_CSV, help="파일 형식")
+    ingest_parser.add_argument("--legacy", action="store_true", help="이전 방식(read_csv + iterrows)도 측정 (CSV만)")
+    ingest_parser.add_argument("--quiet", action="store_true", help="경고/오류만 출력")
+
+    pipeline_parser = subparsers.add_parser("bench-pipeline", help="가짜 외부 API로 스크립트 수집/매칭/전체 실행 시간과 호출 수 측정")
+    pipeline_parser.add_argument("--targets", nargs="+", choices=tuple(bench.PIPELINE_TARGETS), default=list(bench.PIPELINE_TARGETS), help="측정 대상 (기본값: 전체)")
+    pipeline_parser.add_argument("--scales", nargs="+", type=int, default=list(bench.PIPELINE_SCALES), help="키워드 수 (기본값: 1 10 50)")
+    pipeline_parser.add_argument("--latency", type=float, default=fakes.DEFAULT_LATENCY, help=f"YouTube/자막/시트 호출 지연 시간 (초, 기본값: {fakes.DEFAULT_LATENCY})")
+    pipeline_parser.add_argument("--claude-latency", type=float, default=fakes.DEFAULT_CLAUDE_LATENCY, help=f"Claude 호출 지연 시간 (초, 기본값: {fakes.DEFAULT_CLAUDE_LATENCY})")
+    pipeline_parser.add_argument("--error-rate", type=float, default=0.0, help="호출이 오류를 낼 확률 (기본값: 0)")
+    pipeline_parser.add_argument("--search-results", type=int, default=fakes.SEARCH_RESULTS_PER_QUERY, help=f"검색어 하나로 찾을 수 있는 영상 수 (기본값: {fakes.SEARCH_RESULTS_PER_QUERY})")
+    pipeline_parser.add_argument("--real-limits", action="store_true", help="YouTube/Claude 호출 속도 제한을 풀지 않고 설정값 그대로 측정")
+    pipeline_parser.add_argument("--no-memory", action="store_true", help="최대 메모리 측정(tracemalloc으로 한 번 더 실행) 생략")
+    pipeline_parser.add_argument("--baseline", default=bench.PIPELINE_BASELINE_PATH, help="기준 결과 파일")
+    pipeline_parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준으로 저장")
+    pipeline_parser.add_argument("--quiet", action="store_true", help="경고/오류만 출력")
+    return parser
+
+
+def add_storage_arguments(parser):
+    parser.add_argument("--sheet", help="키워드 목록과 결과를 저장할 Google 스프레드시트 URL (sqlite 저장소에서는 생략 가능)")
+    parser.add_argument(
+        "--storage",
+        choices=STORAGE_KINDS,
+        default=STORAGE_SHEETS,
+        help="저장소: sheets(스프레드시트), sqlite(로컬 전용), mirror(로컬에 먼저 쓰고 스프레드시트에 백그라운드 반영)"
+    )
+
+
+def open_storage_from_args(args):
+    if args.storage != STORAGE_SQLITE and not args.sheet:
+        raise SystemExit(f"--storage {args.storage}에는 --sheet URL이 필요합니다.")
+    return open_storage(args.storage, args.sheet)
+
+
+def add_keywords_command(args):
+    storage = open_storage_from_args(args)
+    storage.add_keywords(args.keywords)
+    if args.storage == STORAGE_MIRROR and not storage.wait_until_synced(timeout=SHEET_WRITE_TIMEOUT):
+        events.warning(f"⚠️ {SHEET_WRITE_TIMEOUT}초 안에 스프레드시트에 키워드를 추가하지 못했습니다.")
+    events.success(f"✅ {len(args.keywords)}개 키워드를 추가했습니다.")
+    return 0
+
+
+def run_command(args):
+    settings = PipelineSettings(
+        max_videos=args.max_videos,
+        max_comments=args.max_comments,
+        max_videos_per_keyword=args.videos_per_keyword,
+        filter_duplicate_channels=not args.no_dedupe,
+        min_subscribers=args.min_subscribers,
+        spreadsheet_url=args.sheet,
+        storage=args.storage,
+        include_replies=args.include_replies,
+        generate_emails=args.emails,
+        checkpoints=not args.no_checkpoints,
+        resume=args.resume,
+        export=not args.no_export,
+        history=not args.no_history,
+        reuse_scores=not args.no_reuse_scores,
+        score_max_age_days=args.score_max_age,
+        max_parallel_keywords=args.parallel
+    )
+
+    purge_stale_data(score_max_age_days=max(LEDGER_MAX_AGE_DAYS, args.score_max_age))
+    storage = open_storage_from_args(args)
+    if args.keyword:
+        results = [run_full_automation(keyword, settings) for keyword in args.keyword]
+    else:
+        keywords = storage.get_keywords()
+        results = run_batch_automation(args.sheet, keywords, args.count, settings)
+
+    if args.storage != STORAGE_SQLITE:
+        # 시트 행 추가는 백그라운드에서 진행되므로 종료 전에 기다림 (못 쓴 행은 outbox에 남아 다음 실행 때 추가됨)
+        events.write("⏳ 스프레드시트 저장 대기 중...")
+        if not get_sheet_writer().wait_until_idle(timeout=SHEET_WRITE_TIMEOUT):
+            events.warning(f"⚠️ {SHEET_WRITE_TIMEOUT}초 안에 스프레드시트 저장을 마치지 못했습니다. 남은 행은 다음 실행 때 저장됩니다.")
+        if args.storage == STORAGE_MIRROR:
+            storage.wait_until_synced(timeout=SHEET_WRITE_TIMEOUT)
+
+    return 0 if results and all(r.success for r in results) else 1
+
+
+def bench_parsers_command(args):
+    for name, kind, count, timing in bench.run_parser_benchmark(args.files, repeat=args.repeat):
+        print(f"{name:<30} {kind:<9} 입력 {count}개  {timing['ms_per_call']:8.3f} ms/호출  {timing['mb_per_second']:7.1f} MB/s")
+    return 0
+
+
+def bench_ingest_command(args):
+    for name, timing in bench.run_ingest_benchmark(args.rows, args.format, legacy=args.legacy):
+        print(
+            f"{name:<55} {timing['seconds']:8.2f} s  "
+            f"최대 메모리 {timing['peak_bytes'] / 1_000_000:8.1f} MB  Arrow {timing['arrow_bytes'] / 1_000_000:8.1f} MB"
+        )
+    return 0
+
+
+def bench_pipeline_command(args):
+    options = bench.pipeline_options(args.latency, args.claude_latency, args.error_rate, args.search_results, args.real_limits)
+    baseline = bench.load_pipeline_baseline(args.baseline)
+    if baseline and baseline.get("options") != options:
+        events.warning(f"⚠️ 기준 결과와 측정 설정이 달라 비교하지 않습니다. (기준: {baseline.get('options')})")
+        baseline = None
+    regressions = []
+
+    def report(result):
+        unit = bench.PIPELINE_TARGETS[result["target"]]
+        calls = sum(result["calls"].values())
+        errors = sum(result["errors"].values())
+        comparison = bench.compare_to_baseline(result, baseline)
+        if comparison is None:
+            versus = "기준 없음"
+        else:
+            versus = f"기준 {comparison['baseline_seconds']:.2f} s 대비 {comparison['change']:+.0%}"
+            if comparison["regression"]:
+                versus += " [느려짐]"
+                regressions.append(result)
+        memory = f"{result['peak_bytes'] / 1_000_000:7.1f} MB" if result["peak_bytes"] is not None else "      -   "
+        print(
+            f"{result['target']:<16} 키워드 {result['scale']:>3}개  {result['seconds']:8.2f} s  "
+            f"{result['items_per_second']:8.2f} {unit}/s  호출 {calls:6,}회 (오류 {errors:,})  "
+            f"최대 메모리 {memory}  {versus}",
+            flush=True
+        )
+        print("    " + "  ".join(f"{name}={count:,}" for name, count in sorted(result["calls"].items())), flush=True)
+
+    results = bench.run_pipeline_benchmark(args.targets, args.scales, options, memory=not args.no_memory, on_result=report)
+    if args.save_baseline:
+        bench.save_pipeline_baseline(results, options, args.baseline)
+        events.success(f"✅ 기준 결과를 저장했습니다: {args.baseline}")
+        return 0
+    if regressions:
+        names = ", ".join(f"{result['target']}@{result['scale']}" for result in regressions)
+        events.warning(f"⚠️ 기준보다 {bench.BASELINE_TOLERANCE:.0%} 넘게 느려진 측정: {names}")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    events.configure_log_file()
+
+    def subscriber(event):
+        if args.quiet and not (event.kind == "log" and event.level in ("warning", "error", "exception")):
+            return
+        print_event(event)
+
+    with events.subscribe(subscriber):
+        if args.command == "run":
+            return run_command(args)
+        if args.command == "add-keywords":
+            return add_keywords_command(args)
+        if args.command == "bench-parsers":
+            return bench_parsers_command(args)
+        if args.command == "bench-ingest":
+            return bench_ingest_command(args)
+        if args.command == "bench-pipeline":
+            return bench_pipeline_command(args)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
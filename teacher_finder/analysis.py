@@ -0,0 +1,108 @@
+"""Claude를 이용한 댓글 키워드 분석"""
+from . import clients, config, events, limits, parsers
+
+# 분석 결과에서 검색 키워드를 찾지 못했을 때 사용하는 기본 키워드
+DEFAULT_SEARCH_KEYWORDS = [
+    "스피치 자신감 키우는 5분 연습법",
+    "논리적 스피치 두괄식 말하기 기법",
+    "스피치 리듬감 3가지 비밀",
+    "말더듬 극복하는 스피치 리듬 훈련",
+    "청중을 사로잡는 스피치 기술"
+]
+
+# 프롬프트에 요약해 넣을 수 있는 분석 필드 (format_analysis_for_prompt)
+ANALYSIS_PROMPT_FIELDS = ("keywords", "deficiency_solution_pairs", "message_framework")
+
+
+def analyze_comments_with_claude(comments_data, search_keyword=""):
+    """Claude API를 사용해 댓글 데이터 분석"""
+    events.update_progress(1, 0.3)  # 진행 상태 30%
+    
+    client = clients.get_claude_client()
+    
+    # 댓글 데이터를 문자열로 변환
+    comments_text = "\n\n".join([comment["text"] for comment in comments_data])
+    
+    # 인사이터 프롬프트 준비
+    prompt_template = config.read_prompt(config.INSIGHTER_PROMPT_PATH)
+    
+    # 검색 키워드와 댓글 데이터를 프롬프트에 삽입
+    prompt = prompt_template.replace("{{INITIAL_SEARCH_KEYWORD}}", search_keyword)
+    prompt = prompt.replace("{{COMMENTS_DATA}}", comments_text)
+    
+    try:
+        limits.claude_limiter.acquire()
+        response = clients.create_claude_message(
+            client,
+            model=config.CLAUDE_MODEL,
+            max_tokens=8000,
+            temperature=0.5,
+            system="당신은 댓글 데이터를 분석하여 사용자들의 심리적 결핍과 집착 패턴을 파악하고, 이를 바탕으로 핵심 키워드를 추출하는 전문가입니다.",
+            messages=[{"role": "user", "content": prompt}]
+        )
+        
+        analysis_result = response.content[0].text
+        events.update_progress(1, 1.0)  # 이 단계 완료
+        return analysis_result
+    except Exception as e:
+        events.error(f"Claude API 호출 중 오류 발생: {str(e)}")
+        return None
+
+def extract_structured_data_from_analysis(analysis_text):
+    """분석 텍스트에서 구조화된 데이터 추출 (parsers.parse_insighter_analysis)
+
+    raw_text(전체 분석)와 함께 핵심 키워드, 결핍-솔루션 페어, 메시지 프레임워크(선생님 발화
+    추정 문구), 검색 키워드를 저장합니다. 이후 프롬프트에는 format_analysis_for_prompt()로
+    필요한 필드만 요약해 넣습니다.
+    """
+    return {"raw_text": analysis_text, **parsers.parse_insighter_analysis(analysis_text)}
+
+def extract_keywords(analysis_text):
+    """분석 텍스트에서 핵심 키워드 추출 ([{deficiency, related_keywords}])"""
+    return parsers.parse_insighter_analysis(analysis_text)["keywords"]
+
+def extract_deficiency_solution_pairs(analysis_text):
+    """분석 텍스트에서 결핍-솔루션 페어 추출 ([{deficiency, solutions}])"""
+    return parsers.parse_insighter_analysis(analysis_text)["deficiency_solution_pairs"]
+
+def extract_message_framework(analysis_text):
+    """분석 텍스트에서 메시지 프레임워크(선생님 발화 추정 문구) 추출 ([{deficiency, phrases}])"""
+    return parsers.parse_insighter_analysis(analysis_text)["message_framework"]
+
+def has_structured_analysis(keywords_analysis):
+    """구조화 필드가 하나라도 추출된 분석인지 (이전 체크포인트나 형식이 다른 응답이면 False)"""
+    return any(keywords_analysis.get(field) for field in ANALYSIS_PROMPT_FIELDS)
+
+def format_analysis_for_prompt(keywords_analysis, fields=ANALYSIS_PROMPT_FIELDS):
+    """프롬프트에 넣을 분석 요약 (fields에 해당하는 구조화 필드만, 없으면 raw_text 전체)"""
+    if not keywords_analysis:
+        return ""
+    if not has_structured_analysis(keywords_analysis):
+        return keywords_analysis.get("raw_text", "")
+
+    lines = []
+    if "keywords" in fields and keywords_analysis.get("keywords"):
+        lines.append("[핵심 키워드]")
+        lines.extend(f"- {item['deficiency']}: {', '.join(item['related_keywords'])}" for item in keywords_analysis["keywords"])
+    if "deficiency_solution_pairs" in fields and keywords_analysis.get("deficiency_solution_pairs"):
+        lines.append("[결핍-솔루션 페어]")
+        lines.extend(f"- {item['deficiency']} → {', '.join(item['solutions'])}" for item in keywords_analysis["deficiency_solution_pairs"])
+    if "message_framework" in fields and keywords_analysis.get("message_framework"):
+        lines.append("[선생님 발화 추정 문구]")
+        lines.extend(
+            f"- {item['deficiency']}: " + " / ".join(f'"{phrase}"' for phrase in item['phrases'])
+            for item in keywords_analysis["message_framework"]
+        )
+    return "\n".join(lines)
+
+def analysis_search_keywords(keywords_analysis):
+    """분석 결과의 검색 키워드 (이전 체크포인트처럼 필드가 없으면 raw_text에서 추출)"""
+    if not keywords_analysis:
+        return []
+    if "search_keywords" in keywords_analysis:
+        return list(keywords_analysis["search_keywords"])
+    return extract_search_keywords(keywords_analysis.get("raw_text", ""))
+
+def extract_search_keywords(analysis_text, max_keywords=10):
+    """분석 텍스트의 '유튜브 검색 최적화 키워드' 섹션에서 검색 키워드 추출 (없으면 빈 리스트)"""
+    return parsers.parse_search_keywords(analysis_text, max_keywords=max_keywords)
@@ -0,0 +1,95 @@
+"""실행 결과물 디스크 저장소
+
+스크립트 전문, 댓글 목록, Claude 원문 응답, 생성된 이메일처럼 큰 데이터는 화면 세션
+(st.session_state)에 그대로 두지 않고 gzip JSON 파일로 저장합니다.
+
+    DATA_DIR/artifacts/<artifact_id>.json.gz
+
+세션에는 ArtifactRef(ID, 종류, 항목 수 등 가벼운 정보)만 두고, 내용은 실제로 필요할 때
+load()로 읽습니다. 최근에 읽은 몇 개는 프로세스 안에서 캐시해 같은 화면을 다시 그릴 때
+디스크를 반복해서 읽지 않습니다. 오래된 파일은 purge_artifacts()로 지웁니다.
+"""
+import functools
+import gzip
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass
+
+from . import config
+
+ARTIFACT_DIR = os.path.join(config.DATA_DIR, "artifacts")
+
+# 결과물을 보관하는 기간 (초)
+ARTIFACT_MAX_AGE = 7 * 24 * 60 * 60
+
+# 프로세스 안에 캐시해 두는 최근 결과물 수 (모든 세션 공유)
+LOAD_CACHE_SIZE = 8
+
+
+@dataclass(frozen=True)
+class ArtifactRef:
+    """디스크에 저장된 결과물의 핸들 (세션 상태에 저장하는 가벼운 객체)
+
+    len()은 저장한 데이터의 항목 수(문자열이면 글자 수)를 돌려주므로, 기존 코드처럼
+    빈 결과는 거짓으로 취급됩니다.
+    """
+    artifact_id: str
+    kind: str
+    count: int
+    size: int  # 압축된 파일 크기 (바이트)
+    created_at: float
+
+    def load(self):
+        """저장된 데이터 읽기 (캐시된 객체를 공유하므로 수정하지 말고 필요하면 복사해서 사용)"""
+        return load_artifact(self.artifact_id)
+
+    def __len__(self):
+        return self.count
+
+
+def _artifact_path(artifact_id):
+    return os.path.join(ARTIFACT_DIR, f"{artifact_id}.json.gz")
+
+
+def save_artifact(kind, data):
+    """데이터를 압축해 저장하고 ArtifactRef 반환"""
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    artifact_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{kind}-{uuid.uuid4().hex[:8]}"
+    path = _artifact_path(artifact_id)
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, "wb") as f:
+        f.write(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+    os.replace(tmp_path, path)
+    return ArtifactRef(
+        artifact_id=artifact_id,
+        kind=kind,
+        count=len(data) if hasattr(data, "__len__") else 1,
+        size=os.path.getsize(path),
+        created_at=time.time()
+    )
+
+
+@functools.lru_cache(maxsize=LOAD_CACHE_SIZE)
+def load_artifact(artifact_id):
+    """ID로 결과물 읽기 (파일이 지워졌으면 FileNotFoundError)"""
+    with gzip.open(_artifact_path(artifact_id), "rb") as f:
+        return json.loads(f.read().decode("utf-8"))
+
+
+def purge_artifacts(max_age=ARTIFACT_MAX_AGE):
+    """max_age초보다 오래된 결과물 파일 삭제 (삭제한 파일 수 반환)"""
+    if not os.path.isdir(ARTIFACT_DIR):
+        return 0
+    removed = 0
+    cutoff = time.time() - max_age
+    for name in os.listdir(ARTIFACT_DIR):
+        path = os.path.join(ARTIFACT_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
@@ -0,0 +1,374 @@
+"""마이크로벤치마크 (파서, 댓글 파일 읽기)와 파이프라인 벤치마크
+
+    python -m teacher_finder bench-parsers [텍스트 파일 ...] [--repeat N]
+    python -m teacher_finder bench-ingest [--rows 500000] [--format csv] [--legacy]
+    python -m teacher_finder bench-pipeline [--scales 1 10 50] [--latency 0.02] [--error-rate 0.01] [--save-baseline]
+
+bench-parsers는 체크포인트에 기록된 실제 Claude 응답(매칭 결과, 키워드 분석)과 인자로 넘긴
+텍스트 파일로 parsers 모듈의 함수를 반복 실행해 호출당 시간과 처리량을 측정합니다. 기록된
+매칭 응답이 없으면 매칭 출력 형식으로 만든 합성 응답을 사용합니다.
+
+bench-ingest는 합성 댓글 파일을 만들어 ingest.read_comment_table의 읽기 시간과 최대
+메모리(tracemalloc으로 추적되는 Python/NumPy 메모리와 Arrow 메모리)를 측정합니다.
+
+bench-pipeline은 외부 API를 가짜 API(fakes 모듈)로 바꿔 스크립트 수집(collect_scripts_by_keywords),
+콘텐츠 매칭(match_content_with_claude), 전체 배치 실행(run_batch_automation, 스프레드시트 저장 대기 포함)을
+키워드 수(scales)별로 실행하고 걸린 시간, 처리량, 외부 API 호출 수, 최대 메모리(tracemalloc)를 잽니다.
+실행 하나마다 빈 임시 DATA_DIR를 쓰는 새 프로세스에서 실행하므로 실제 실행 기록, 내보내기, 점수 기록,
+추적 파일에는 남지 않고, 실행끼리 캐시나 풀을 공유하지 않습니다. (최대 메모리는 tracemalloc이 느리므로
+별도 프로세스에서 한 번 더 실행해 잽니다) 결과는 같은 설정으로 저장한 기준 결과(PIPELINE_BASELINE_PATH)와
+비교합니다.
+"""
+import concurrent.futures
+import glob
+import gzip
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from . import config, events, fakes, ingest, limits, parsers
+from .checkpoints import CHECKPOINT_DIR
+
+# 기록된 응답이 없을 때 만드는 합성 매칭 응답의 영상 수
+SYNTHETIC_VIDEO_COUNT = 500
+
+# bench-ingest 기본 댓글 수
+INGEST_BENCH_ROWS = 500_000
+
+# bench-pipeline 측정 대상 (이름 -> 처리량 단위)
+TARGET_COLLECT_SCRIPTS = "collect_scripts"
+TARGET_MATCHING = "matching"
+TARGET_FULL = "full"
+PIPELINE_TARGETS = {
+    TARGET_COLLECT_SCRIPTS: "키워드",
+    TARGET_MATCHING: "스크립트",
+    TARGET_FULL: "키워드",
+}
+PIPELINE_SCALES = (1, 10, 50)
+
+# 키워드당 스크립트 수 (PipelineSettings.max_videos_per_keyword 기본값과 같음)
+PIPELINE_VIDEOS_PER_KEYWORD = 3
+
+# 기준 결과 파일과 회귀로 보는 기준 (기준보다 이 비율 이상 느리면 회귀)
+PIPELINE_BASELINE_PATH = os.path.join(config.DATA_DIR, "bench", "pipeline_baseline.json")
+BASELINE_TOLERANCE = 0.2
+
+# 호출 속도 제한을 풀 때 측정 프로세스에 넘기는 값 (limits 모듈이 읽는 환경 변수)
+UNLIMITED_RATE_ENV = {
+    "TEACHER_FINDER_YOUTUBE_QPS": "100000",
+    "TEACHER_FINDER_CLAUDE_RPM": "6000000",
+}
+
+BENCH_SPREADSHEET_URL = "https://docs.google.com/spreadsheets/d/teacher-finder-bench/edit"
+
+
+def load_recorded_outputs(base_dir=CHECKPOINT_DIR):
+    """체크포인트에 저장된 응답 텍스트 {"matching": [...], "analysis": [...]}"""
+    outputs = {"matching": [], "analysis": []}
+    for path in sorted(glob.glob(os.path.join(base_dir, "*", "*", "matching.json.gz"))):
+        with gzip.open(path, "rb") as f:
+            text = json.loads(f.read().decode("utf-8"))
+        if text:
+            outputs["matching"].append(text)
+    for path in sorted(glob.glob(os.path.join(base_dir, "*", "*", "analysis.json.gz"))):
+        with gzip.open(path, "rb") as f:
+            analysis = json.loads(f.read().decode("utf-8"))
+        if analysis and analysis.get("raw_text"):
+            outputs["analysis"].append(analysis["raw_text"])
+    return outputs
+
+
+def synthetic_matching_output(video_count=SYNTHETIC_VIDEO_COUNT):
+    """매칭 출력 형식의 합성 응답 (제목에 '-'와 '[...]'가 들어간 영상 포함)"""
+    blocks = ["# 키워드-스크립트 매칭 결과", "", "## 최종 추천 영상 (관련성 점수 5.0점 이상)", ""]
+    for i in range(video_count):
+        video_id = f"vid{i:05d}-x"
+        blocks.append(
+            f"[{video_id}] - 발표 - 자신감 루틴 [{i}편] - 종합 점수: {5 + i % 50 / 10:.1f}/10\n"
+            f"* 링크: https://www.youtube.com/watch?v={video_id}\n"
+            f"* 채널: 채널{i % 37}\n"
+            f"* 주요 키워드: 자신감, 발표, 루틴\n"
+            f"* 콘텐츠 품질: 7.5/10 | 제작자 역량: 8.0/10 | 키워드 연관성: 6.5/10\n"
+            f"\n<인사이트>\n이 영상은 발표 불안에 관한 콘텐츠로, 실전 연습이 돋보입니다.\n\n"
+        )
+    return "\n".join(blocks)
+
+
+def time_parser(fn, texts, repeat):
+    """texts 전체를 repeat번 파싱하는 시간 측정 (호출당 밀리초, MB/s)"""
+    total_bytes = sum(len(text.encode("utf-8")) for text in texts) * repeat
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            fn(text)
+    elapsed = time.perf_counter() - started
+    calls = len(texts) * repeat
+    return {
+        "calls": calls,
+        "ms_per_call": elapsed * 1000 / calls if calls else 0.0,
+        "mb_per_second": total_bytes / elapsed / 1_000_000 if elapsed else 0.0,
+    }
+
+
+def run_parser_benchmark(paths=(), repeat=20, base_dir=CHECKPOINT_DIR):
+    """파서별 벤치마크 결과 [(파서 이름, 입력 종류, 입력 수, 측정 결과)]"""
+    outputs = load_recorded_outputs(base_dir)
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        outputs["matching" if "종합 점수" in text else "analysis"].append(text)
+    if not outputs["matching"]:
+        outputs["matching"].append(synthetic_matching_output())
+
+    benchmarks = [
+        ("parse_matching_blocks", "matching", parsers.parse_matching_blocks),
+        ("index_matching_blocks", "matching", lambda text: parsers.index_matching_blocks(parsers.parse_matching_blocks(text))),
+        ("parse_final_recommendations", "matching", parsers.parse_final_recommendations),
+        ("parse_batch_recommendations", "matching", parsers.parse_batch_recommendations),
+        ("parse_search_keywords", "analysis", parsers.parse_search_keywords),
+        ("parse_insighter_analysis", "analysis", parsers.parse_insighter_analysis),
+    ]
+    results = []
+    for name, kind, fn in benchmarks:
+        texts = outputs[kind]
+        if texts:
+            results.append((name, kind, len(texts), time_parser(fn, texts, repeat)))
+    return results
+
+
+def write_synthetic_comments(path, rows=INGEST_BENCH_ROWS, fmt=ingest.FORMAT_CSV):
+    """합성 댓글 파일 작성 (댓글 길이와 좋아요 수가 다양한 rows행)"""
+    rng = np.random.default_rng(0)
+    ids = np.arange(rows).astype(str)
+    df = pd.DataFrame({
+        "text": pd.Series(ids).radd("발표할 때 목소리가 떨려서 고민이었는데 이 영상 덕분에 자신감이 생겼어요 #"),
+        "author": pd.Series(rng.integers(0, 50_000, rows).astype(str)).radd("user"),
+        "likes": rng.zipf(2.0, rows).clip(max=100_000),
+        "published_at": "2024-01-01T00:00:00Z",
+        "video_id": pd.Series(rng.integers(0, 500, rows).astype(str)).radd("video"),
+        "video_title": "발표 자신감 루틴",
+        "channel_name": "말하기 채널",
+    })
+    if fmt == ingest.FORMAT_PARQUET:
+        df.to_parquet(path, index=False)
+    elif fmt == ingest.FORMAT_JSONL:
+        df.to_json(path, orient="records", lines=True, force_ascii=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def _legacy_parse_csv(path):
+    """이전 방식 (전체 read_csv 후 iterrows로 행마다 dict 생성) - 비교용"""
+    df = pd.read_csv(path)
+    return [
+        {
+            "text": row["text"],
+            "author": row.get("author", "Unknown"),
+            "likes": row.get("likes", 0),
+            "published_at": row.get("published_at", ""),
+            "video_id": row.get("video_id", ""),
+            "video_title": row.get("video_title", ""),
+            "channel_name": row.get("channel_name", "")
+        }
+        for _, row in df.iterrows()
+    ]
+
+
+def _measure(fn):
+    """fn() 실행 시간(초), tracemalloc 최대 메모리, 늘어난 Arrow 메모리 (바이트)
+
+    tracemalloc은 Python 코드가 많은 방식일수록 느려지므로 시간은 추적 없이 한 번 더 실행해 잽니다.
+    """
+    try:
+        import pyarrow as pa
+        arrow_before = pa.total_allocated_bytes()
+    except ImportError:
+        pa = None
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    arrow = pa.total_allocated_bytes() - arrow_before if pa else 0
+    del result
+
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    return result, {"seconds": elapsed, "peak_bytes": peak, "arrow_bytes": arrow}
+
+
+def run_ingest_benchmark(rows=INGEST_BENCH_ROWS, fmt=ingest.FORMAT_CSV, legacy=False):
+    """댓글 파일 읽기 벤치마크 [(방식, 측정 결과)] (legacy=True면 CSV 이전 방식도 측정)"""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, f"comments.{fmt}")
+        write_synthetic_comments(path, rows, fmt)
+        file_size = os.path.getsize(path)
+
+        with events.subscribe(lambda event: None, exclusive=True):
+            table, timing = _measure(lambda: ingest.read_comment_table(path, fmt=fmt))
+            sample, sample_timing = _measure(lambda: table.sample())
+        results.append((f"read_comment_table ({fmt}, {len(table):,}행, {file_size / 1_000_000:.1f} MB)", timing))
+        results.append((f"CommentTable.sample ({len(sample):,}개)", sample_timing))
+        del table, sample
+
+        if legacy and fmt == ingest.FORMAT_CSV:
+            comments, legacy_timing = _measure(lambda: _legacy_parse_csv(path))
+            results.append((f"이전 방식 read_csv + iterrows ({len(comments):,}행)", legacy_timing))
+    return results
+
+
+def _run_pipeline_target(target, scale, services):
+    """측정 대상 하나 실행 (처리한 항목 수 반환)"""
+    from .analysis import extract_structured_data_from_analysis
+    from .engine import PipelineSettings, run_batch_automation
+    from .matching import match_content_with_claude
+    from .scripts import collect_scripts_by_keywords
+    from .sheet_writer import get_sheet_writer
+    from .sheets import KEYWORD_WORKSHEET, LISTUP_HEADERS, LISTUP_WORKSHEET
+
+    keywords = fakes.sample_keywords(scale)
+    if target == TARGET_COLLECT_SCRIPTS:
+        collect_scripts_by_keywords(keywords, PIPELINE_VIDEOS_PER_KEYWORD)
+        return scale
+
+    if target == TARGET_MATCHING:
+        analysis_text = services.analysis_texts[0] if services.analysis_texts else fakes.synthetic_analysis(keywords[0])
+        scripts_data = fakes.synthetic_scripts(scale * PIPELINE_VIDEOS_PER_KEYWORD)
+        match_content_with_claude(extract_structured_data_from_analysis(analysis_text), scripts_data)
+        return len(scripts_data)
+
+    spreadsheet = services.sheets.spreadsheet(BENCH_SPREADSHEET_URL)
+    spreadsheet.seed(KEYWORD_WORKSHEET, [["키워드", "실행 상태"]] + [[keyword, ""] for keyword in keywords])
+    spreadsheet.seed(LISTUP_WORKSHEET, [LISTUP_HEADERS])
+    settings = PipelineSettings(spreadsheet_url=BENCH_SPREADSHEET_URL, max_videos_per_keyword=PIPELINE_VIDEOS_PER_KEYWORD)
+    results = run_batch_automation(BENCH_SPREADSHEET_URL, keywords, scale, settings)
+    get_sheet_writer().wait_until_idle()
+    return scale if all(result.success for result in results) else sum(1 for result in results if result.success)
+
+
+def _pipeline_worker(target, scale, fake_options, trace_memory=False):
+    """측정 프로세스에서 실행되는 측정 하나 (로그는 버림, trace_memory=True면 tracemalloc 최대 메모리도 기록)"""
+    with events.subscribe(lambda event: None, exclusive=True), fakes.fake_services(**fake_options) as services:
+        quota_before = limits.youtube_quota.used
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        items = _run_pipeline_target(target, scale, services)
+        seconds = time.perf_counter() - started
+        peak = None
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        return {
+            "target": target,
+            "scale": scale,
+            "items": items,
+            "seconds": seconds,
+            "items_per_second": items / seconds if seconds else 0.0,
+            "calls": dict(services.calls),
+            "errors": dict(services.errors),
+            "youtube_quota": limits.youtube_quota.used - quota_before,
+            "peak_bytes": peak,
+        }
+
+
+def _run_in_scratch_process(fn, *args, env=None):
+    """빈 임시 DATA_DIR를 쓰는 새 프로세스(spawn)에서 fn(*args) 실행
+
+    DATA_DIR와 호출 속도 제한은 모듈을 불러올 때 환경 변수에서 읽으므로, 프로세스를 띄우는 동안만
+    환경 변수를 바꿉니다.
+    """
+    with tempfile.TemporaryDirectory() as data_dir:
+        overrides = {**(env or {}), "TEACHER_FINDER_DATA_DIR": data_dir}
+        previous = {key: os.environ.get(key) for key in overrides}
+        os.environ.update(overrides)
+        try:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                return executor.submit(fn, *args).result()
+        finally:
+            for key, value in previous.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+
+def pipeline_options(latency=fakes.DEFAULT_LATENCY, claude_latency=fakes.DEFAULT_CLAUDE_LATENCY, error_rate=0.0,
+                     search_results=fakes.SEARCH_RESULTS_PER_QUERY, real_limits=False):
+    """측정 설정 (기준 결과와 같은 설정으로 잰 결과만 비교)"""
+    return {
+        "latency": latency,
+        "claude_latency": claude_latency,
+        "error_rate": error_rate,
+        "search_results": search_results,
+        "real_limits": real_limits,
+    }
+
+
+def run_pipeline_benchmark(targets=tuple(PIPELINE_TARGETS), scales=PIPELINE_SCALES, options=None, memory=True, on_result=None):
+    """파이프라인 벤치마크 결과 [dict] (대상마다 scales 순서로)
+
+    options는 pipeline_options()의 반환값입니다. 키워드 분석 응답은 체크포인트에 기록된 응답이 있으면
+    그것을 재사용합니다. memory=False면 최대 메모리를 재지 않습니다. (peak_bytes는 None)
+    on_result가 주어지면 측정 하나가 끝날 때마다 결과 dict로 호출됩니다.
+    """
+    options = options or pipeline_options()
+    fake_options = {key: value for key, value in options.items() if key != "real_limits"}
+    fake_options["analysis_texts"] = load_recorded_outputs()["analysis"]
+    env = None if options["real_limits"] else UNLIMITED_RATE_ENV
+
+    results = []
+    for target in targets:
+        for scale in scales:
+            result = _run_in_scratch_process(_pipeline_worker, target, scale, fake_options, env=env)
+            if memory:
+                traced = _run_in_scratch_process(_pipeline_worker, target, scale, fake_options, True, env=env)
+                result["peak_bytes"] = traced["peak_bytes"]
+            results.append(result)
+            if on_result:
+                on_result(result)
+    return results
+
+
+def _baseline_key(result):
+    return f"{result['target']}@{result['scale']}"
+
+
+def load_pipeline_baseline(path=PIPELINE_BASELINE_PATH):
+    """저장된 기준 결과 {"options", "results": {"대상@규모": 결과}} (없으면 None)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_pipeline_baseline(results, options, path=PIPELINE_BASELINE_PATH):
+    """결과를 기준으로 저장 (같은 대상/규모의 이전 기준은 덮어쓰고 나머지는 유지)"""
+    baseline = load_pipeline_baseline(path)
+    if not baseline or baseline.get("options") != options:
+        baseline = {"options": options, "results": {}}
+    baseline["created_at"] = time.time()
+    baseline["results"].update({_baseline_key(result): result for result in results})
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return baseline
+
+
+def compare_to_baseline(result, baseline, tolerance=BASELINE_TOLERANCE):
+    """기준 대비 시간 변화 {"baseline_seconds", "change", "regression"} (비교할 기준이 없으면 None)"""
+    previous = (baseline or {}).get("results", {}).get(_baseline_key(result))
+    if not previous or not previous.get("seconds"):
+        return None
+    change = result["seconds"] / previous["seconds"] - 1
+    return {"baseline_seconds": previous["seconds"], "change": change, "regression": change > tolerance}
@@ -0,0 +1,227 @@
+"""이미 수집한 채널 목록 (중복 채널 필터링용 로컬 저장소)
+
+'리스트업' 시트의 채널명(B열)을 로컬 SQLite(ChannelRegistry)에 옮겨 두고, 이후에는 시트 전체를
+다시 받지 않고 마지막으로 읽은 행(high-water mark) 다음 행만 읽어 추가합니다. 스프레드시트의
+Drive modifiedTime이 지난번 동기화 때와 같으면 시트를 아예 읽지 않습니다.
+시트 위쪽 행을 고치거나 지운 경우를 반영하도록 FULL_RESYNC_INTERVAL마다 처음부터 다시 읽습니다.
+
+파이프라인이 시트에 저장을 요청한 채널은 시트에 실제로 쓰이기 전에도 바로 등록되므로
+(source='local') 다음 키워드 처리부터 중복으로 걸러집니다.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import gspread
+
+from . import config, events
+from .sheets import forget_spreadsheet, get_listup_channels, get_spreadsheet_modified_time
+
+# 시트 전체를 다시 읽는 간격 (초)
+FULL_RESYNC_INTERVAL = 24 * 60 * 60
+
+# 동기화할 때 재사용할 수 있는 시트 스냅샷의 최대 나이 (초)
+# 배치 시작 시 키워드와 함께 읽은 채널명 열은 재사용하되, 오래된 스냅샷 때문에
+# 바뀐 modifiedTime만 기록하고 새 행을 놓치지 않도록 짧게 둡니다.
+SYNC_SNAPSHOT_MAX_AGE = 10.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS channels (
+    spreadsheet_id TEXT NOT NULL,
+    channel_name TEXT NOT NULL,
+    channel_id TEXT DEFAULT '',
+    sheet_row INTEGER,
+    source TEXT NOT NULL,
+    added_at REAL NOT NULL,
+    PRIMARY KEY (spreadsheet_id, channel_name)
+);
+CREATE INDEX IF NOT EXISTS idx_channels_channel_id ON channels (spreadsheet_id, channel_id);
+CREATE TABLE IF NOT EXISTS channel_sync (
+    spreadsheet_id TEXT PRIMARY KEY,
+    next_row INTEGER NOT NULL,
+    modified_time TEXT DEFAULT '',
+    full_synced_at REAL DEFAULT 0,
+    synced_at REAL DEFAULT 0
+);
+"""
+
+
+def spreadsheet_id_from_url(spreadsheet_url):
+    """스프레드시트 URL에서 문서 ID 추출 (gid 등이 달라도 같은 문서는 같은 ID)"""
+    match = re.search(r"/spreadsheets/d/([a-zA-Z0-9-_]+)", spreadsheet_url or "")
+    return match.group(1) if match else (spreadsheet_url or "")
+
+
+class ChannelRegistry:
+    """스프레드시트별로 이미 수집한 채널을 저장하는 SQLite 저장소 (스레드 간 공유 가능)"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(config.DATA_DIR, "channels.db")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def _execute(self, sql, params=()):
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params)
+
+    def _query_one(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def contains(self, spreadsheet_url, channel_name=None, channel_id=None):
+        """채널명 또는 채널 ID가 이미 등록되어 있는지 확인"""
+        spreadsheet_id = spreadsheet_id_from_url(spreadsheet_url)
+        if channel_name and self._query_one(
+            "SELECT 1 FROM channels WHERE spreadsheet_id = ? AND channel_name = ?",
+            (spreadsheet_id, channel_name)
+        ):
+            return True
+        if channel_id and self._query_one(
+            "SELECT 1 FROM channels WHERE spreadsheet_id = ? AND channel_id = ?",
+            (spreadsheet_id, channel_id)
+        ):
+            return True
+        return False
+
+    def count(self, spreadsheet_url):
+        row = self._query_one(
+            "SELECT COUNT(*) FROM channels WHERE spreadsheet_id = ?",
+            (spreadsheet_id_from_url(spreadsheet_url),)
+        )
+        return row[0]
+
+    def add(self, spreadsheet_url, channel_name, channel_id="", source="local", sheet_row=None):
+        """채널 등록 (이미 있으면 비어 있던 채널 ID/행 번호만 채움)"""
+        if not channel_name or not channel_name.strip():
+            return
+        spreadsheet_id = spreadsheet_id_from_url(spreadsheet_url)
+        self._execute(
+            """
+            INSERT INTO channels (spreadsheet_id, channel_name, channel_id, sheet_row, source, added_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (spreadsheet_id, channel_name) DO UPDATE SET
+                channel_id = CASE WHEN channels.channel_id = '' THEN excluded.channel_id ELSE channels.channel_id END,
+                sheet_row = COALESCE(channels.sheet_row, excluded.sheet_row)
+            """,
+            (spreadsheet_id, channel_name, channel_id or "", sheet_row, source, time.time())
+        )
+
+    def has_synced(self, spreadsheet_url):
+        """스프레드시트를 한 번이라도 동기화했는지 확인"""
+        return bool(self._query_one(
+            "SELECT 1 FROM channel_sync WHERE spreadsheet_id = ?",
+            (spreadsheet_id_from_url(spreadsheet_url),)
+        ))
+
+    def sync(self, spreadsheet_url, full=False):
+        """'리스트업' 시트에서 새로 추가된 행의 채널만 읽어 등록 (추가된 채널 수 반환)"""
+        spreadsheet_id = spreadsheet_id_from_url(spreadsheet_url)
+        with self._sync_lock:
+            state = self._query_one(
+                "SELECT next_row, modified_time, full_synced_at FROM channel_sync WHERE spreadsheet_id = ?",
+                (spreadsheet_id,)
+            )
+            next_row, last_modified, full_synced_at = state or (2, "", 0)
+
+            try:
+                modified_time = get_spreadsheet_modified_time(spreadsheet_url)
+                if full or time.time() - full_synced_at > FULL_RESYNC_INTERVAL:
+                    full = True
+                    next_row = 2
+                elif modified_time == last_modified:
+                    events.write("✅ 스프레드시트가 지난 동기화 이후 바뀌지 않아 채널 목록을 다시 읽지 않습니다.")
+                    return 0
+
+                rows = get_listup_channels(spreadsheet_url, start_row=next_row, max_age=SYNC_SNAPSHOT_MAX_AGE)
+            except gspread.exceptions.WorksheetNotFound:
+                events.warning("⚠️ '리스트업' 시트가 없어 시트 기준 중복 채널 필터링을 적용할 수 없습니다.")
+                return 0
+            except Exception as e:
+                forget_spreadsheet(spreadsheet_url)
+                events.error(f"❌ 시트에서 채널 목록을 가져오는 중 오류 발생: {str(e)}")
+                return 0
+
+            before = self.count(spreadsheet_url)
+            with self._lock, self._conn:
+                if full:
+                    # 시트에서 지워진 채널을 반영하되, 아직 시트에 쓰이지 않았을 수 있는 로컬 등록은 유지
+                    self._conn.execute(
+                        "DELETE FROM channels WHERE spreadsheet_id = ? AND source = 'sheet'",
+                        (spreadsheet_id,)
+                    )
+                self._conn.executemany(
+                    """
+                    INSERT INTO channels (spreadsheet_id, channel_name, sheet_row, source, added_at)
+                    VALUES (?, ?, ?, 'sheet', ?)
+                    ON CONFLICT (spreadsheet_id, channel_name) DO UPDATE SET
+                        sheet_row = COALESCE(channels.sheet_row, excluded.sheet_row)
+                    """,
+                    [(spreadsheet_id, name, row, time.time()) for row, name in rows if name.strip()]
+                )
+                self._conn.execute(
+                    """
+                    INSERT INTO channel_sync (spreadsheet_id, next_row, modified_time, full_synced_at, synced_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (spreadsheet_id) DO UPDATE SET
+                        next_row = excluded.next_row,
+                        modified_time = excluded.modified_time,
+                        full_synced_at = excluded.full_synced_at,
+                        synced_at = excluded.synced_at
+                    """,
+                    (
+                        spreadsheet_id,
+                        next_row + len(rows),
+                        modified_time,
+                        time.time() if full else full_synced_at,
+                        time.time()
+                    )
+                )
+            added = self.count(spreadsheet_url) - before
+            events.write(f"✅ 시트 {next_row}행부터 {len(rows)}개 행을 읽어 채널 {max(added, 0)}개를 새로 등록했습니다.")
+            return added
+
+    def channel_set(self, spreadsheet_url):
+        """collect_scripts_parallel에 넘길 수 있는 집합 형태의 보기"""
+        return RegisteredChannels(self, spreadsheet_url)
+
+
+class RegisteredChannels:
+    """이번 실행에서 수집한 채널(메모리)과 레지스트리에 등록된 채널을 함께 확인하는 집합 형태 객체"""
+
+    def __init__(self, registry, spreadsheet_url):
+        self.registry = registry
+        self.spreadsheet_url = spreadsheet_url
+        self._local = set()
+
+    def __contains__(self, channel):
+        """채널명 또는 채널 ID로 확인"""
+        if not channel:
+            return False
+        return channel in self._local or self.registry.contains(self.spreadsheet_url, channel_name=channel, channel_id=channel)
+
+    def add(self, channel_name):
+        self._local.add(channel_name)
+
+    def __len__(self):
+        new_channels = [c for c in self._local if not self.registry.contains(self.spreadsheet_url, channel_name=c)]
+        return self.registry.count(self.spreadsheet_url) + len(new_channels)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_channel_registry():
+    """프로세스 전역 ChannelRegistry (처음 호출할 때 생성)"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ChannelRegistry()
+        return _registry
@@ -0,0 +1,153 @@
+"""파이프라인 단계별 체크포인트
+
+키워드 하나의 실행(run)마다 단계 결과를 gzip JSON 파일로 저장합니다.
+
+    DATA_DIR/checkpoints/<키워드>/<run_id>/manifest.json
+    DATA_DIR/checkpoints/<키워드>/<run_id>/<단계>.json.gz
+
+이어서 실행(resume) 모드에서는 같은 키워드의 마지막 미완료 실행을 열어 이미 끝난 단계를
+건너뛰므로, 시트 저장이나 매칭 단계에서 실패해도 댓글 수집/분석/스크립트 수집을 반복하지 않습니다.
+오래된 실행은 purge_checkpoints()로 지웁니다.
+"""
+import gzip
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+
+from . import config
+
+CHECKPOINT_DIR = os.path.join(config.DATA_DIR, "checkpoints")
+
+# 체크포인트를 보관하는 기간 (초, 마지막으로 저장한 시각 기준)
+CHECKPOINT_MAX_AGE = 14 * 24 * 60 * 60
+
+# 키워드마다 남겨 두는 최근 실행 수
+CHECKPOINT_KEEP_RUNS = 5
+
+
+def _keyword_dir_name(keyword):
+    """키워드를 디렉터리 이름으로 쓸 수 있게 변환 (한글은 유지)"""
+    name = re.sub(r'[\\/:*?"<>|\s]+', "_", keyword.strip()).strip("._")
+    return name[:80] or "keyword"
+
+
+def _write_atomic(path, data, compress=False):
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    opener = gzip.open if compress else open
+    with opener(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+class KeywordCheckpoint:
+    """키워드 한 번의 실행에 대한 단계별 체크포인트"""
+
+    def __init__(self, keyword, run_id=None, base_dir=None):
+        self.keyword = keyword
+        self.run_id = run_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.keyword_dir = os.path.join(base_dir or CHECKPOINT_DIR, _keyword_dir_name(keyword))
+        self.run_dir = os.path.join(self.keyword_dir, self.run_id)
+        self._lock = threading.Lock()
+        os.makedirs(self.run_dir, exist_ok=True)
+
+        manifest_path = os.path.join(self.run_dir, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {
+                "keyword": keyword,
+                "run_id": self.run_id,
+                "created_at": time.time(),
+                "completed": False,
+                "stages": {}
+            }
+            self._save_manifest()
+
+    @classmethod
+    def open_latest(cls, keyword, base_dir=None):
+        """키워드의 가장 최근 미완료 실행을 열기 (없으면 None)"""
+        keyword_dir = os.path.join(base_dir or CHECKPOINT_DIR, _keyword_dir_name(keyword))
+        if not os.path.isdir(keyword_dir):
+            return None
+
+        for run_id in sorted(os.listdir(keyword_dir), reverse=True):
+            manifest_path = os.path.join(keyword_dir, run_id, "manifest.json")
+            if not os.path.exists(manifest_path):
+                continue
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("keyword") != keyword:
+                continue
+            if manifest.get("completed"):
+                return None  # 가장 최근 실행이 끝났으면 이어서 실행할 것이 없음
+            return cls(keyword, run_id, base_dir)
+        return None
+
+    def _save_manifest(self):
+        _write_atomic(os.path.join(self.run_dir, "manifest.json"), self.manifest)
+
+    def _stage_path(self, stage):
+        return os.path.join(self.run_dir, f"{stage}.json.gz")
+
+    def has(self, stage):
+        return stage in self.manifest["stages"] and os.path.exists(self._stage_path(stage))
+
+    @property
+    def completed_stages(self):
+        return [stage for stage in self.manifest["stages"] if self.has(stage)]
+
+    def save(self, stage, data):
+        with self._lock:
+            _write_atomic(self._stage_path(stage), data, compress=True)
+            self.manifest["stages"][stage] = {"saved_at": time.time()}
+            self._save_manifest()
+
+    def load(self, stage):
+        with gzip.open(self._stage_path(stage), "rb") as f:
+            return json.loads(f.read().decode("utf-8"))
+
+    def mark_completed(self):
+        with self._lock:
+            self.manifest["completed"] = True
+            self.manifest["completed_at"] = time.time()
+            self._save_manifest()
+
+
+def purge_checkpoints(max_age=CHECKPOINT_MAX_AGE, keep_runs=CHECKPOINT_KEEP_RUNS, base_dir=None):
+    """오래된 실행 디렉터리 삭제 (삭제한 실행 수 반환)
+
+    마지막 저장 시각(manifest.json 수정 시각)이 max_age초보다 오래됐거나, 키워드별 최근
+    keep_runs개 밖의 실행을 지웁니다. 실행이 남지 않은 키워드 디렉터리도 함께 지웁니다.
+    """
+    base_dir = base_dir or CHECKPOINT_DIR
+    if not os.path.isdir(base_dir):
+        return 0
+    removed = 0
+    cutoff = time.time() - max_age
+    for keyword_name in os.listdir(base_dir):
+        keyword_dir = os.path.join(base_dir, keyword_name)
+        if not os.path.isdir(keyword_dir):
+            continue
+        # run_id는 시각으로 시작하므로 이름 역순이 최신순
+        for index, run_id in enumerate(sorted(os.listdir(keyword_dir), reverse=True)):
+            run_dir = os.path.join(keyword_dir, run_id)
+            manifest_path = os.path.join(run_dir, "manifest.json")
+            try:
+                saved_at = os.path.getmtime(manifest_path if os.path.exists(manifest_path) else run_dir)
+                if index >= keep_runs or saved_at < cutoff:
+                    shutil.rmtree(run_dir)
+                    removed += 1
+            except OSError:
+                continue
+        try:
+            if not os.listdir(keyword_dir):
+                os.rmdir(keyword_dir)
+        except OSError:
+            continue
+    return removed
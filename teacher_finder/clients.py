@@ -0,0 +1,98 @@
+"""외부 API 클라이언트 (YouTube, Claude)"""
+import queue
+import threading
+from contextlib import contextmanager
+
+from anthropic import Anthropic
+from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
+
+from . import config, events, limits, tracing
+
+
+class RateLimitedHttpRequest(HttpRequest):
+    """모든 YouTube API 요청에 공용 호출 속도 제한과 할당량 집계를 적용하는 요청 클래스"""
+
+    def execute(self, *args, **kwargs):
+        limits.youtube_limiter.acquire()
+        quota = limits.YOUTUBE_QUOTA_COSTS.get(self.methodId, 1)
+        limits.youtube_quota.add(quota)
+        attributes = {
+            tracing.ATTR_DEPENDENCY: tracing.DEPENDENCY_YOUTUBE,
+            "youtube.method": self.methodId,
+            "youtube.quota": quota,
+            "http.request.resend_count": kwargs.get("num_retries", 0),
+        }
+        with tracing.start_as_current_span(self.methodId or "youtube.request", attributes) as span:
+            postproc = self.postproc
+
+            def traced_postproc(resp, content):
+                span.set_attributes({"http.response.status_code": resp.status, "http.response.body.size": len(content or b"")})
+                return postproc(resp, content)
+
+            self.postproc = traced_postproc
+            try:
+                return super().execute(*args, **kwargs)
+            finally:
+                self.postproc = postproc
+
+
+# YouTube API 클라이언트 설정
+def get_youtube_client():
+    api_service_name = "youtube"
+    api_version = "v3"
+
+    try:
+        youtube = build(api_service_name, api_version, developerKey=config.get_secret("YOUTUBE_API_KEY"), requestBuilder=RateLimitedHttpRequest)
+        return youtube
+    except Exception as e:
+        events.error(f"YouTube API 클라이언트 생성 실패: {str(e)}")
+        return None
+
+# YouTube API 클라이언트 풀
+# googleapiclient 클라이언트는 스레드 간 공유가 안전하지 않으므로, 스레드마다 하나씩 빌려 쓰고 반납합니다.
+_youtube_client_pool = queue.LifoQueue()
+
+@contextmanager
+def borrow_youtube_client():
+    """풀에서 YouTube 클라이언트를 빌려오고, 사용이 끝나면 반납"""
+    try:
+        youtube = _youtube_client_pool.get_nowait()
+    except queue.Empty:
+        youtube = get_youtube_client()
+    try:
+        yield youtube
+    finally:
+        if youtube is not None:
+            _youtube_client_pool.put(youtube)
+
+# Anthropic(Claude) 클라이언트 (스레드 간 공유가 안전하므로 API 키마다 하나를 만들어 재사용)
+_claude_clients = {}
+_claude_clients_lock = threading.Lock()
+
+def get_claude_client():
+    api_key = config.get_secret("CLAUDE_API_KEY")
+    with _claude_clients_lock:
+        client = _claude_clients.get(api_key)
+        if client is None:
+            client = _claude_clients[api_key] = Anthropic(api_key=api_key)
+        return client
+
+def create_claude_message(client, attempt=0, **kwargs):
+    """client.messages.create 호출 (호출마다 모델, 재시도 회차, 토큰 수, 응답 길이를 추적 span으로 기록)"""
+    attributes = {
+        tracing.ATTR_DEPENDENCY: tracing.DEPENDENCY_CLAUDE,
+        "gen_ai.request.model": kwargs.get("model", ""),
+        "gen_ai.request.max_tokens": kwargs.get("max_tokens", 0),
+        "retry.attempt": attempt,
+    }
+    with tracing.start_as_current_span("claude.messages.create", attributes) as span:
+        response = client.messages.create(**kwargs)
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            span.set_attributes({
+                "gen_ai.usage.input_tokens": usage.input_tokens,
+                "gen_ai.usage.output_tokens": usage.output_tokens,
+            })
+        span.set_attribute("http.response.body.size", sum(len(getattr(block, "text", "") or "") for block in response.content))
+        return response
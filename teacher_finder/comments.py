@@ -0,0 +1,224 @@
+"""댓글 데이터 수집 (키워드 검색, 유튜브 URL, CSV 업로드)"""
+import concurrent.futures
+
+from . import clients, events
+from .ingest import DEFAULT_SAMPLE_SIZE, read_comment_table
+from .search import get_top_videos_by_keyword, get_youtube_video_id
+
+
+def _comment_from_snippet(snippet, video_id, thread_id, is_reply=False):
+    """댓글 snippet을 내부 댓글 dict 형식으로 변환"""
+    return {
+        "text": snippet["textDisplay"],
+        "author": snippet["authorDisplayName"],
+        "likes": snippet["likeCount"],
+        "published_at": snippet["publishedAt"],
+        "video_id": video_id,
+        "thread_id": thread_id,
+        "is_reply": is_reply
+    }
+
+def get_comment_replies(youtube, thread_id, video_id, max_replies):
+    """댓글 스레드의 대댓글을 페이지 단위로 가져오기 (최대 max_replies개)"""
+    replies = []
+    next_page_token = None
+
+    while len(replies) < max_replies:
+        request_params = {
+            'part': "snippet",
+            'parentId': thread_id,
+            'maxResults': min(100, max_replies - len(replies)),
+            'textFormat': "plainText"
+        }
+        if next_page_token:
+            request_params['pageToken'] = next_page_token
+
+        response = youtube.comments().list(**request_params).execute()
+        for item in response.get("items", []):
+            replies.append(_comment_from_snippet(item["snippet"], video_id, thread_id, is_reply=True))
+            if len(replies) >= max_replies:
+                break
+
+        next_page_token = response.get("nextPageToken")
+        if not next_page_token:
+            break
+
+    return replies
+
+def get_video_comments(video_id, max_comments=20, include_replies=False, youtube=None):
+    """영상의 댓글 가져오기 (좋아요 많은 순, nextPageToken으로 max_comments개까지 페이지 순회)
+
+    include_replies가 True이면 대댓글도 함께 수집하며, 대댓글도 max_comments 할당량에 포함됩니다.
+    youtube 클라이언트를 넘기지 않으면 클라이언트 풀에서 빌려 사용합니다.
+    """
+    if youtube is None:
+        with clients.borrow_youtube_client() as pooled_client:
+            if pooled_client is None:
+                return []
+            return get_video_comments(video_id, max_comments, include_replies, pooled_client)
+
+    comments = []
+    next_page_token = None
+
+    try:
+        while len(comments) < max_comments:
+            request_params = {
+                'part': "snippet,replies" if include_replies else "snippet",
+                'videoId': video_id,
+                'maxResults': min(100, max_comments - len(comments)),  # API 최대값은 100
+                'order': "relevance",  # 관련성(좋아요 많은 순) 기준
+                'textFormat': "plainText"  # 대댓글(comments.list)과 같은 형식 (HTML 태그/엔티티 없이)
+            }
+            if next_page_token:
+                request_params['pageToken'] = next_page_token
+
+            response = youtube.commentThreads().list(**request_params).execute()
+
+            for item in response.get("items", []):
+                thread_id = item["id"]
+                thread_snippet = item["snippet"]
+                comments.append(_comment_from_snippet(thread_snippet["topLevelComment"]["snippet"], video_id, thread_id))
+
+                if include_replies and len(comments) < max_comments:
+                    remaining = max_comments - len(comments)
+                    inline_replies = item.get("replies", {}).get("comments", [])
+                    # 응답에 포함된 대댓글은 최대 5개이므로, 그보다 많으면 comments.list로 전체를 가져옴
+                    if thread_snippet.get("totalReplyCount", 0) > len(inline_replies):
+                        comments.extend(get_comment_replies(youtube, thread_id, video_id, remaining))
+                    else:
+                        comments.extend(
+                            _comment_from_snippet(reply["snippet"], video_id, thread_id, is_reply=True)
+                            for reply in inline_replies[:remaining]
+                        )
+
+                if len(comments) >= max_comments:
+                    break
+
+            next_page_token = response.get("nextPageToken")
+            if not next_page_token:
+                break
+
+        return comments[:max_comments]
+    except Exception as e:
+        error_message = str(e)
+        if "disabled comments" in error_message:
+            events.warning(f"영상 '{video_id}'의 댓글이 비활성화되어 있어 수집할 수 없습니다.")
+        else:
+            events.error(f"댓글 수집 중 오류 발생: {error_message}")
+        # 페이지 순회 중 오류가 나면 그때까지 수집한 댓글은 유지
+        return comments[:max_comments]
+
+def collect_comments_by_keyword(keyword, max_videos=5, max_comments=20, include_replies=False, max_workers=5, on_comments=None):
+    """키워드로 검색해 상위 영상들의 댓글을 병렬로 수집
+
+    영상별 댓글은 완료되는 순서대로 결과 버퍼에 추가되며, on_comments가 주어지면
+    영상 하나가 끝날 때마다 (video, comments)로 호출됩니다. (엔진은 이것으로 부분 결과를 기록)
+    """
+    events.update_progress(0, 0.2)  # 진행 상태 20%
+    
+    videos = get_top_videos_by_keyword(keyword, max_videos, exclude_shorts=False, min_duration=0) # 숏츠 제외
+    
+    events.update_progress(0, 0.4)  # 진행 상태 40%
+    
+    all_comments = []
+    disabled_comments_count = 0  # 댓글이 비활성화된 영상 카운트
+
+    if not videos:
+        events.update_progress(0, 1.0)
+        return all_comments
+
+    with events.ContextThreadPoolExecutor(max_workers=min(max_workers, len(videos))) as executor:
+        future_to_video = {
+            executor.submit(get_video_comments, video["video_id"], max_comments, include_replies): video
+            for video in videos
+        }
+
+        for completed, future in enumerate(concurrent.futures.as_completed(future_to_video), 1):
+            video = future_to_video[future]
+            try:
+                video_comments = future.result()
+            except Exception as e:
+                events.warning(f"영상 '{video['title']}' 댓글 수집 중 오류: {str(e)}")
+                video_comments = []
+
+            if not video_comments:
+                disabled_comments_count += 1  # 댓글 없는 경우 카운트 증가
+
+            for comment in video_comments:
+                comment["video_title"] = video["title"]
+                comment["channel_name"] = video["channel_name"]
+            all_comments.extend(video_comments)
+
+            if on_comments:
+                on_comments(video, video_comments)
+
+            events.update_progress(0, 0.4 + (0.6 * (completed / len(videos))))  # 40%~100% 사이에서 진행
+    
+    events.update_progress(0, 1.0)  # 이 단계 완료
+    
+    # 결과 요약 메시지 출력
+    if disabled_comments_count > 0:
+        events.info(f"{len(videos)}개 영상 중 {disabled_comments_count}개 영상은 댓글이 비활성화되어 있거나 수집 중 오류가 발생했습니다.")
+    
+    return all_comments
+
+def collect_comments_by_url(url, max_comments=20, include_replies=False):
+    """유튜브 URL로 해당 영상의 댓글만 수집 (include_replies가 True이면 대댓글 포함)"""
+    events.update_progress(0, 0.3)  # 진행 상태 30%
+    
+    video_id = get_youtube_video_id(url)
+    if not video_id:
+        events.error("올바른 유튜브 URL이 아닙니다.")
+        return []
+    
+    events.update_progress(0, 0.6)  # 진행 상태 60%
+    
+    # 영상 정보 가져오기
+    try:
+        with clients.borrow_youtube_client() as youtube:
+            if not youtube:
+                events.error("YouTube API 클라이언트를 생성할 수 없습니다.")
+                return []
+            video_response = youtube.videos().list(
+                part="snippet",
+                id=video_id
+            ).execute()
+        
+        if not video_response.get("items"):
+            events.error("영상 정보를 찾을 수 없습니다.")
+            return []
+        
+        video_info = video_response["items"][0]["snippet"]
+        title = video_info["title"]
+        channel_name = video_info["channelTitle"]
+        
+        # 댓글 수집
+        comments = get_video_comments(video_id, max_comments, include_replies)
+        for comment in comments:
+            comment["video_title"] = title
+            comment["channel_name"] = channel_name
+        
+        events.update_progress(0, 1.0)  # 이 단계 완료
+        return comments
+    except Exception as e:
+        events.error(f"영상 정보 수집 중 오류 발생: {str(e)}")
+        return []
+
+def parse_csv_comments(uploaded_file, max_comments=DEFAULT_SAMPLE_SIZE):
+    """업로드된 댓글 파일(CSV, Parquet, JSONL)에서 댓글 데이터 파싱
+
+    파일은 ingest 모듈로 청크 단위로 읽고, 좋아요 순 상위 max_comments개만 댓글 dict로
+    변환해 반환합니다. (max_comments=None이면 전체)
+    """
+    events.update_progress(0, 0.5)  # 진행 상태 50%
+    
+    try:
+        table = read_comment_table(uploaded_file)
+        comments = table.sample(max_comments)
+        events.write(f"✅ 파일에서 {len(table):,}개의 댓글을 읽어 {len(comments):,}개를 분석에 사용합니다.")
+        
+        events.update_progress(0, 1.0)  # 이 단계 완료
+        return comments
+    except Exception as e:
+        events.error(f"댓글 파일 파싱 중 오류 발생: {str(e)}")
+        return []
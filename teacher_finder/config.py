@@ -0,0 +1,83 @@
+"""API 키, 경로 등 파이프라인 공통 설정
+
+Streamlit 앱에서는 use_secrets(st.secrets)로 st.secrets를 그대로 넘기고,
+CLI/워커에서는 환경 변수 또는 .streamlit/secrets.toml에서 같은 키를 읽습니다.
+"""
+import os
+import threading
+import tomllib
+
+# 프로젝트 루트 (프롬프트 파일 등의 기준 경로)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 작업 상태, 체크포인트 등 로컬 저장소 위치
+DATA_DIR = os.environ.get("TEACHER_FINDER_DATA_DIR") or os.path.join(BASE_DIR, ".teacher_finder")
+
+INSIGHTER_PROMPT_PATH = os.path.join(BASE_DIR, "insighter_prompt.txt")
+MATCHING_PROMPT_PATH = os.path.join(BASE_DIR, "matching_prompt.txt")
+
+# Claude 모델
+CLAUDE_MODEL = "claude-3-7-sonnet-20250219"
+
+# 추천 영상으로 취급하는 최소 종합 점수
+MIN_RECOMMEND_SCORE = 5.0
+
+_secrets = None
+_secrets_lock = threading.Lock()
+
+_prompts = {}  # 경로 -> (수정 시각, 내용)
+_prompts_lock = threading.Lock()
+
+
+def use_secrets(secrets):
+    """외부에서 읽은 secrets(st.secrets 등 dict 형태)를 설정으로 사용"""
+    global _secrets
+    with _secrets_lock:
+        _secrets = secrets
+
+
+def _load_secrets_file():
+    """Streamlit과 같은 위치의 secrets.toml을 읽음 (없으면 빈 dict)"""
+    candidates = [
+        os.path.join(os.getcwd(), ".streamlit", "secrets.toml"),
+        os.path.join(BASE_DIR, ".streamlit", "secrets.toml"),
+        os.path.join(os.path.expanduser("~"), ".streamlit", "secrets.toml"),
+    ]
+    for path in candidates:
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                return tomllib.load(f)
+    return {}
+
+
+def get_secret(name):
+    """설정 값 가져오기 (use_secrets로 넘긴 값 → 환경 변수 → secrets.toml 순서)"""
+    global _secrets
+    with _secrets_lock:
+        if _secrets is not None and name in _secrets:
+            return _secrets[name]
+
+        env_value = os.environ.get(name) or os.environ.get(name.upper())
+        if env_value:
+            return env_value
+
+        if _secrets is None:
+            _secrets = _load_secrets_file()
+        if name in _secrets:
+            return _secrets[name]
+
+    raise KeyError(f"설정 값 '{name}'을(를) 찾을 수 없습니다. 환경 변수 또는 .streamlit/secrets.toml에 추가해주세요.")
+
+
+def read_prompt(path):
+    """프롬프트 파일 내용 (파일 수정 시각이 바뀌었을 때만 다시 읽음)"""
+    mtime = os.path.getmtime(path)
+    with _prompts_lock:
+        cached = _prompts.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    with _prompts_lock:
+        _prompts[path] = (mtime, content)
+    return content
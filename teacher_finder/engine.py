@@ -0,0 +1,486 @@
+"""Streamlit과 분리된 전체 자동화 파이프라인
+
+각 단계의 로그와 진행률은 events 모듈로 발행되고, 단계 결과는 stage_completed 이벤트와
+반환값(KeywordRunResult)으로 전달됩니다. Streamlit UI와 CLI는 모두 이 엔진의 구독자입니다.
+"""
+import threading
+import time
+from dataclasses import dataclass, field, replace
+
+from . import config, events, limits, tracing
+from .checkpoints import KeywordCheckpoint, purge_checkpoints
+from .exporter import export_run, new_export_id
+from .history import get_history
+from .ledger import LEDGER_MAX_AGE_DAYS, get_ledger
+from .analysis import (
+    DEFAULT_SEARCH_KEYWORDS,
+    analysis_search_keywords,
+    analyze_comments_with_claude,
+    extract_structured_data_from_analysis,
+)
+from .comments import collect_comments_by_keyword
+from .matching import (
+    extract_recommended_videos,
+    generate_email_with_claude,
+    index_matching_result,
+    match_content_with_claude,
+)
+from .records import RunStore
+from .scripts import collect_scripts_by_keywords
+from .sheets import build_listup_rows
+from .storage import STORAGE_SHEETS, open_storage
+
+# 단계 이름 (stage_completed 이벤트의 stage 값)
+STAGE_COMMENTS = "comments"
+STAGE_VIDEO_COMMENTS = "video_comments"  # 영상 하나의 댓글 수집이 끝날 때마다 (부분 결과)
+STAGE_ANALYSIS = "analysis"
+STAGE_SEARCH_KEYWORDS = "search_keywords"
+STAGE_SCRIPTS = "scripts"
+STAGE_MATCHING = "matching"
+STAGE_MATCHING_INDEX = "matching_index"
+STAGE_RECOMMENDATIONS = "recommendations"
+STAGE_EMAILS = "emails"
+STAGE_SHEET = "sheet"
+STAGE_EXPORT = "export"
+STAGE_HISTORY = "history"
+
+# 배치 처리 중 대기 중인 키워드 상태를 시트에 쓰는 간격 (초)
+STATUS_FLUSH_INTERVAL = 5.0
+
+# 단계별로 사용하는 외부 자원 (같은 그룹의 단계는 limits.stage_slot으로 동시 실행 수가 제한됨)
+STAGE_GROUPS = {
+    STAGE_COMMENTS: limits.GROUP_YOUTUBE,
+    STAGE_SCRIPTS: limits.GROUP_YOUTUBE,
+    STAGE_ANALYSIS: limits.GROUP_CLAUDE,
+    STAGE_MATCHING: limits.GROUP_CLAUDE,
+    STAGE_EMAILS: limits.GROUP_CLAUDE,
+}
+
+
+@dataclass
+class PipelineSettings:
+    """run_full_automation / run_batch_automation 실행 설정"""
+    max_videos: int = 5  # 댓글 수집할 영상 수
+    max_comments: int = 20  # 영상당 수집할 댓글 수
+    max_videos_per_keyword: int = 3  # 검색 키워드당 수집할 스크립트 수
+    filter_duplicate_channels: bool = True
+    min_subscribers: int = 5000
+    spreadsheet_url: str = None
+    include_replies: bool = False
+    generate_emails: bool = False  # 영업 이메일 생성 (현재 기본값은 중단 상태)
+    min_duration_seconds: int = 180
+    max_duration_seconds: int = 1800
+    max_age_days: int = 1000
+    checkpoints: bool = True  # 단계별 결과를 체크포인트로 저장
+    resume: bool = False  # 같은 키워드의 마지막 미완료 실행을 이어서 진행
+    max_parallel_keywords: int = 3  # 배치 처리에서 동시에 진행할 키워드 수
+    storage: str = STORAGE_SHEETS  # 키워드 상태/채널 목록/결과 저장소 (storage.STORAGE_KINDS)
+    export: bool = True  # 실행 결과를 Parquet/JSONL로 내보내기 (exporter)
+    history: bool = True  # 실행 기록 저장소에 기록 (history)
+    reuse_scores: bool = True  # 비슷한 분석으로 최근에 평가한 영상은 매칭에 다시 보내지 않고 점수 재사용 (ledger)
+    score_max_age_days: int = LEDGER_MAX_AGE_DAYS  # 재사용할 수 있는 점수의 최대 나이 (일)
+
+
+@dataclass
+class KeywordRunResult:
+    """키워드 하나에 대한 파이프라인 실행 결과"""
+    keyword: str
+    run_id: str = ""
+    trace_id: str = ""  # 실행 추적 ID (tracing, DATA_DIR/traces/<trace_id>.jsonl)
+    success: bool = False
+    error: str = ""
+    comments: list = field(default_factory=list)
+    keywords_analysis: dict = None
+    search_keywords: list = field(default_factory=list)
+    scripts: list = field(default_factory=list)
+    matching_result: str = None
+    matching_index: dict = field(default_factory=dict)  # 영상 ID -> 매칭 결과 섹션 (matching.index_matching_result)
+    recommended_videos: list = field(default_factory=list)
+    emails: dict = field(default_factory=dict)
+    store: RunStore = field(default_factory=RunStore, repr=False)  # 단계들이 공유하는 레코드 색인 (records.RunStore)
+
+
+def _fail(result, message):
+    events.error(f"❌ {message}")
+    result.error = message
+    return result
+
+
+def generate_emails(recommended_videos, keywords_analysis, store):
+    """추천 영상별 영업 이메일 생성 ({video_id: {title, channel, score, email}})
+
+    스크립트는 실행 저장소(store)의 영상 ID 색인에서 찾습니다.
+    """
+    all_emails = {}
+    for i, video in enumerate(recommended_videos):
+        events.write(f"({i+1}/{len(recommended_videos)}) {video['title']} 처리 중...")
+
+        try:
+            # 영상마다 스크립트 목록 전체를 훑지 않도록 해당 영상의 스크립트만 전달
+            script = store.script(video['video_id'])
+            email_content = generate_email_with_claude(video, keywords_analysis, [script] if script else None)
+            if email_content:
+                all_emails[video['video_id']] = {
+                    'title': video['title'],
+                    'channel': video['channel'],
+                    'score': video['score'],
+                    'email': email_content
+                }
+        except Exception as e:
+            events.error(f"'{video['title']}' 이메일 생성 중 오류 발생: {str(e)}")
+
+    return all_emails
+
+
+def _run_stage(checkpoint, stage, compute):
+    """체크포인트에 단계 결과가 있으면 불러오고, 없으면 compute()로 계산해 저장
+
+    compute()는 단계가 쓰는 외부 자원(STAGE_GROUPS)의 자리가 날 때까지 기다린 뒤 실행됩니다.
+    compute()가 빈 결과를 반환하면 실패로 보고 저장하지 않습니다.
+    """
+    with tracing.start_as_current_span(f"stage.{stage}", {"stage": stage}) as span:
+        if checkpoint and checkpoint.has(stage):
+            events.info(f"⏭️ '{stage}' 단계 결과를 체크포인트에서 불러왔습니다. (실행 ID: {checkpoint.run_id})")
+            span.set_attribute("checkpoint.hit", True)
+            return checkpoint.load(stage)
+
+        started = time.perf_counter()
+        with limits.stage_slot(STAGE_GROUPS.get(stage)), events.stage_scope(stage):
+            span.set_attribute("stage.slot_wait_ms", round((time.perf_counter() - started) * 1000, 1))
+            data = compute()
+        if checkpoint and data:
+            checkpoint.save(stage, data)
+        return data
+
+
+def open_checkpoint(keyword, settings):
+    """설정에 맞는 체크포인트 열기 (이어서 실행이면 마지막 미완료 실행, 아니면 새 실행)"""
+    if not settings.checkpoints:
+        return None
+    if settings.resume:
+        checkpoint = KeywordCheckpoint.open_latest(keyword)
+        if checkpoint:
+            events.info(f"🔁 키워드 '{keyword}'의 이전 실행({checkpoint.run_id})을 이어서 진행합니다. 완료된 단계: {checkpoint.completed_stages}")
+            return checkpoint
+    return KeywordCheckpoint(keyword)
+
+
+_purged = False
+_purge_lock = threading.Lock()
+
+
+def purge_stale_data(score_max_age_days=LEDGER_MAX_AGE_DAYS):
+    """오래된 실행 데이터(체크포인트, 평가 기록) 정리 (프로세스당 한 번, 앱/작업 실행기/CLI 시작 시)
+
+    score_max_age_days보다 오래된 평가 기록은 재사용할 수 없으므로 지웁니다.
+    """
+    global _purged
+    with _purge_lock:
+        if _purged:
+            return
+        _purged = True
+    removed = purge_checkpoints()
+    if removed:
+        events.write(f"🧹 오래된 체크포인트 실행 {removed}개를 정리했습니다.")
+    removed = get_ledger().purge(score_max_age_days)
+    if removed:
+        events.write(f"🧹 재사용 기간이 지난 평가 기록 {removed}개를 정리했습니다.")
+
+
+def run_full_automation(keyword, settings, checkpoint=None):
+    """키워드 하나에 대해 전체 과정을 자동으로 실행하고 KeywordRunResult를 반환
+
+    checkpoint를 넘기지 않으면 settings(checkpoints, resume)에 따라 체크포인트를 엽니다.
+    실행 하나가 trace 하나로 기록됩니다. (result.trace_id)
+    """
+    with tracing.start_trace("run_full_automation", {"keyword": keyword}) as span:
+        result = _run_keyword(keyword, settings, checkpoint)
+        result.trace_id = span.trace_id
+        span.set_attributes({"run_id": result.run_id, "success": result.success})
+        if not result.success:
+            span.set_status(tracing.STATUS_ERROR, result.error)
+        return result
+
+
+def _run_keyword(keyword, settings, checkpoint):
+    result = KeywordRunResult(keyword=keyword)
+    storage = open_storage(settings.storage, settings.spreadsheet_url)
+    if checkpoint is None:
+        checkpoint = open_checkpoint(keyword, settings)
+    if checkpoint:
+        result.run_id = checkpoint.run_id
+
+    try:
+        events.write("🚀 자동화 프로세스 시작...")
+
+        # 1. 데이터 수집
+        events.write("1️⃣ 댓글 데이터 수집 단계 시작")
+        streamed_count = 0
+
+        def on_video_comments(video, video_comments):
+            # 영상별 댓글이 도착하는 대로 실행 기록에 쌓고 화면에 부분 결과를 알림
+            nonlocal streamed_count
+            result.store.add_comments(video_comments)
+            streamed_count += len(video_comments)
+            events.stage_completed(STAGE_VIDEO_COMMENTS, {
+                "video": video,
+                "comments": video_comments,
+                "collected": streamed_count
+            })
+
+        comments = _run_stage(checkpoint, STAGE_COMMENTS, lambda: collect_comments_by_keyword(
+            keyword,
+            settings.max_videos,
+            settings.max_comments,
+            include_replies=settings.include_replies,
+            on_comments=on_video_comments
+        ))
+        if not comments:
+            return _fail(result, "댓글 수집 실패. 프로세스를 중단합니다.")
+
+        result.comments = comments
+        if not streamed_count:  # 체크포인트에서 불러온 댓글
+            result.store.add_comments(comments)
+        events.success(f"✅ {len(comments)}개의 댓글 수집 완료")
+        events.stage_completed(STAGE_COMMENTS, comments)
+        events.update_progress(1, 1.0)
+
+        # 2. 키워드 분석
+        events.write("2️⃣ 키워드 분석 단계 시작")
+
+        def analyze():
+            analysis_result = analyze_comments_with_claude(comments, keyword)
+            return extract_structured_data_from_analysis(analysis_result) if analysis_result else None
+
+        result.keywords_analysis = _run_stage(checkpoint, STAGE_ANALYSIS, analyze)
+        if not result.keywords_analysis:
+            return _fail(result, "키워드 분석 실패. 프로세스를 중단합니다.")
+
+        events.success("✅ 키워드 분석 완료")
+        events.stage_completed(STAGE_ANALYSIS, result.keywords_analysis)
+        events.update_progress(2, 1.0)
+
+        # 유튜브 검색 최적화 키워드 추출
+        def choose_search_keywords():
+            search_keywords = analysis_search_keywords(result.keywords_analysis)
+            if not search_keywords:
+                search_keywords = list(DEFAULT_SEARCH_KEYWORDS)
+                events.warning("⚠️ 유튜브 검색 최적화 키워드를 찾지 못했습니다. 기본 키워드를 사용합니다.")
+            return search_keywords
+
+        result.search_keywords = _run_stage(checkpoint, STAGE_SEARCH_KEYWORDS, choose_search_keywords)
+        events.stage_completed(STAGE_SEARCH_KEYWORDS, result.search_keywords)
+
+        # 3. 스크립트 수집
+        events.write("3️⃣ 스크립트 수집 단계 시작")
+        scripts_data = _run_stage(checkpoint, STAGE_SCRIPTS, lambda: collect_scripts_by_keywords(
+            result.search_keywords,
+            settings.max_videos_per_keyword,
+            settings.filter_duplicate_channels,
+            min_duration_seconds=settings.min_duration_seconds,
+            max_duration_seconds=settings.max_duration_seconds,
+            max_age_days=settings.max_age_days,
+            min_subscribers=settings.min_subscribers,
+            known_channels=storage.known_channels() if storage and settings.filter_duplicate_channels else None
+        ))
+        if not scripts_data:
+            return _fail(result, "스크립트 수집 실패. 프로세스를 중단합니다.")
+
+        result.scripts = scripts_data
+        result.store.add_scripts(scripts_data)
+        events.success(f"✅ {len(scripts_data)}개 스크립트 수집 완료")
+        events.stage_completed(STAGE_SCRIPTS, scripts_data)
+        events.update_progress(3, 1.0)
+
+        # 4. 콘텐츠 매칭 단계
+        events.write("4️⃣ 콘텐츠 매칭 단계 시작")
+        matching_result = _run_stage(checkpoint, STAGE_MATCHING, lambda: match_content_with_claude(
+            result.keywords_analysis,
+            scripts_data,
+            ledger=get_ledger() if settings.reuse_scores else None,
+            max_age_days=settings.score_max_age_days
+        ))
+        if not matching_result:
+            return _fail(result, "콘텐츠 매칭 실패. 프로세스를 중단합니다.")
+
+        result.matching_result = matching_result
+        events.stage_completed(STAGE_MATCHING, matching_result)
+
+        # 매칭 결과를 한 번만 훑어 영상 ID별 섹션 색인을 만들고 실행 결과와 함께 저장
+        result.matching_index = _run_stage(checkpoint, STAGE_MATCHING_INDEX, lambda: index_matching_result(matching_result))
+        events.stage_completed(STAGE_MATCHING_INDEX, result.matching_index)
+
+        # 추천 영상 추출
+        result.recommended_videos = _run_stage(checkpoint, STAGE_RECOMMENDATIONS, lambda: extract_recommended_videos(matching_result, result.matching_index))
+        result.store.add_recommendations(result.recommended_videos)
+        recommended_videos = result.store.recommendations(min_score=config.MIN_RECOMMEND_SCORE)
+        events.success(f"✅ 콘텐츠 매칭 완료. 추천 영상(5.0점 이상): {len(recommended_videos)}개")
+        events.stage_completed(STAGE_RECOMMENDATIONS, result.recommended_videos)
+        events.update_progress(4, 1.0)
+
+        # 5. 영업 이메일 생성
+        def build_emails():
+            if settings.generate_emails:
+                events.write("5️⃣ 영업 이메일 생성 단계 시작")
+                all_emails = generate_emails(recommended_videos, result.keywords_analysis, result.store)
+                events.success(f"✅ {len(all_emails)}개 이메일 생성 완료")
+                return all_emails
+
+            events.write("5️⃣ 영업 이메일 생성 단계 (임시 중단)")
+            events.warning("⚠️ 이메일 생성 기능은 일시적으로 중단되었습니다.")
+            # 빈 이메일 데이터 생성 (이메일 내용이 없는 객체)
+            return {
+                video['video_id']: {
+                    'title': video['title'],
+                    'channel': video['channel'],
+                    'score': video['score'],
+                    'email': ''  # 빈 이메일
+                }
+                for video in recommended_videos
+            }
+
+        result.emails = _run_stage(checkpoint, STAGE_EMAILS, build_emails)
+        result.store.add_emails(result.emails)
+        events.stage_completed(STAGE_EMAILS, result.emails)
+        events.update_progress(4, 1.0)  # 이 단계 완료로 표시
+
+        # 6. 저장소(스프레드시트 등)에 저장 (스프레드시트 행은 sheet_writer가 백그라운드에서 추가하므로
+        #    기다리지 않음. 저장 요청이 끝난 실행은 이어서 실행할 때 다시 저장하지 않음)
+        if storage:
+            events.write("6️⃣ 스프레드시트 저장 단계 시작")
+
+            def save_to_storage():
+                events.write(f"✅ {len(result.emails)}개의 이메일 데이터로 스프레드시트 저장을 진행합니다.")
+                if settings.spreadsheet_url:
+                    events.write(f"✅ 사용할 스프레드시트 URL: {settings.spreadsheet_url}")
+
+                rows = build_listup_rows(result.matching_index, result.recommended_videos, result.emails)
+                if not rows:
+                    return [True, "스프레드시트에 저장할 데이터가 없습니다."]
+                message = storage.append_results(rows)
+
+                # 시트에 쓰이기 전에도 다음 키워드부터 중복으로 걸러지도록 채널 목록에 바로 등록
+                scripts = (result.store.script(email.video_id) for email in result.store.emails(min_score=config.MIN_RECOMMEND_SCORE))
+                storage.register_channels([(script.channel_name, script.channel_id) for script in scripts if script])
+                return [True, message]
+
+            saved = _run_stage(checkpoint, STAGE_SHEET, save_to_storage)
+            events.success(f"✅ {saved[1]}")
+            events.stage_completed(STAGE_SHEET, saved)
+
+        # 체크포인트 없이 실행한 경우에도 내보내기/실행 기록에 쓸 실행 ID
+        if not result.run_id:
+            result.run_id = new_export_id()
+
+        # 7. 실행 결과 내보내기 (실패해도 실행 결과에는 영향 없음)
+        if settings.export:
+            try:
+                with tracing.start_as_current_span(f"stage.{STAGE_EXPORT}", {"stage": STAGE_EXPORT}):
+                    manifest = export_run(
+                        keyword,
+                        {
+                            "comments": result.store.comments,
+                            "scripts": result.store.scripts,
+                            "recommendations": result.recommended_videos,
+                            "emails": result.emails,
+                        },
+                        texts={
+                            "analysis": (result.keywords_analysis or {}).get("raw_text", ""),
+                            "matching": result.matching_result or "",
+                        },
+                        run_id=result.run_id
+                    )
+                events.success(f"📦 실행 결과를 내보냈습니다. (실행 ID: {manifest['run_id']})")
+                events.stage_completed(STAGE_EXPORT, manifest)
+            except Exception as e:
+                events.warning(f"⚠️ 실행 결과 내보내기 중 오류 발생: {str(e)}")
+
+        # 8. 실행 기록 저장 (여러 실행에 걸친 조회용, 실패해도 실행 결과에는 영향 없음)
+        if settings.history:
+            try:
+                with tracing.start_as_current_span(f"stage.{STAGE_HISTORY}", {"stage": STAGE_HISTORY}):
+                    get_history().record_run(
+                        result.run_id,
+                        keyword,
+                        comments=len(result.comments),
+                        search_keywords=result.search_keywords,
+                        scripts=result.store.scripts,
+                        recommendations=result.recommended_videos,
+                        emails=result.emails
+                    )
+                events.stage_completed(STAGE_HISTORY, result.run_id)
+            except Exception as e:
+                events.warning(f"⚠️ 실행 기록 저장 중 오류 발생: {str(e)}")
+
+        if checkpoint:
+            checkpoint.mark_completed()
+        events.success("🎉 전체 자동화 프로세스가 완료되었습니다!")
+        result.success = True
+        return result
+
+    except Exception as e:
+        events.error(f"❌ 자동화 프로세스 중 오류 발생: {str(e)}")
+        events.exception(e)
+        result.error = str(e)
+        return result
+
+
+def run_batch_automation(spreadsheet_url, keywords, execution_count, settings):
+    """지정된 개수의 키워드를 자동으로 처리하고 키워드별 KeywordRunResult 리스트를 반환
+
+    키워드는 settings.max_parallel_keywords개까지 동시에 진행되며, 단계별 동시 실행 수와
+    API 호출 속도는 limits 모듈의 공용 제한을 따릅니다. 따라서 키워드 A가 Claude 분석/매칭을
+    기다리는 동안 키워드 B의 댓글/스크립트 수집이 진행됩니다. 결과는 입력 순서대로 반환합니다.
+    """
+    if not keywords:
+        events.error("❌ 처리할 키워드가 없습니다.")
+        return []
+
+    settings = replace(settings, spreadsheet_url=spreadsheet_url)
+
+    # 실행할 키워드 수 제한
+    keywords_to_process = keywords[:execution_count]
+    total = len(keywords_to_process)
+    events.write(f"🚀 {total}개 키워드 자동 처리를 시작합니다: {keywords_to_process}")
+    quota_before = limits.youtube_quota.used
+    max_workers = max(1, min(settings.max_parallel_keywords, total))
+
+    # 키워드 상태는 저장소의 상태 관리자로 모아서 씀 (스프레드시트는 시트를 한 번 읽어 만든 행 인덱스 사용.
+    # 동시 진행 중에는 '처리 중' 상태를 STATUS_FLUSH_INTERVAL초마다 한 번에, 키워드가 끝나면 바로)
+    storage = open_storage(settings.storage, spreadsheet_url)
+    if storage is None:
+        events.error("❌ 키워드 상태를 저장할 스프레드시트 URL이 필요합니다.")
+        return []
+    status_board = storage.status_board(flush_interval=STATUS_FLUSH_INTERVAL if max_workers > 1 else None)
+
+    def process(index, keyword):
+        events.subheader(f"키워드 {index+1}/{total}: '{keyword}' 처리 중...")
+
+        # 키워드 처리 시작 상태 업데이트
+        status_board.set(keyword, "처리 중")
+
+        try:
+            # 단일 키워드 자동화 실행
+            result = run_full_automation(keyword, settings)
+            status_board.set(keyword, "완료" if result.success else "실패", flush=True)
+
+        except Exception as e:
+            events.error(f"❌ 키워드 '{keyword}' 처리 중 오류 발생: {str(e)}")
+            status_board.set(keyword, f"오류: {str(e)[:50]}", flush=True)
+            result = KeywordRunResult(keyword=keyword, error=str(e))
+
+        return result
+
+    if max_workers == 1:
+        # 동시 실행하지 않을 때는 호출한 스레드에서 그대로 실행 (Streamlit 화면 출력 유지)
+        results = [process(i, keyword) for i, keyword in enumerate(keywords_to_process)]
+    else:
+        with events.ContextThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="teacher-finder-keyword") as executor:
+            futures = [executor.submit(process, i, keyword) for i, keyword in enumerate(keywords_to_process)]
+            results = [future.result() for future in futures]
+    status_board.close()
+
+    success_count = sum(1 for r in results if r.success)
+    events.success(f"🎉 배치 처리 완료: {success_count}/{total}개 키워드 처리 성공")
+    events.info(f"📊 YouTube API 할당량 사용량(추정): {limits.youtube_quota.used - quota_before} units")
+    return results
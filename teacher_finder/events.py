@@ -0,0 +1,212 @@
+"""파이프라인 이벤트/진행 상태 인터페이스
+
+파이프라인 코드는 Streamlit을 직접 호출하지 않고 이 모듈의 함수로 로그, 진행률,
+단계 완료 이벤트를 발행합니다. Streamlit UI, CLI 콘솔 출력 등은 subscribe()로
+구독자를 등록해 이벤트를 받아 처리합니다.
+
+구독자 목록은 contextvars로 관리되므로 동시에 실행되는 여러 파이프라인이 서로의
+이벤트를 받지 않습니다. 워커 스레드에서도 이벤트가 전달되도록 파이프라인 내부의
+스레드 풀은 ContextThreadPoolExecutor를 사용해야 합니다.
+
+구독자는 이벤트를 발행한 스레드에서 호출됩니다. Streamlit처럼 특정 스레드에서만 화면을
+그릴 수 있는 구독자는 EventQueue를 구독자로 등록하고, 화면 스레드에서 drain()으로 꺼내 처리합니다.
+모든 로그 이벤트는 configure_log_file()로 설정한 회전 로그 파일에도 남습니다.
+"""
+import concurrent.futures
+import contextvars
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from . import config
+
+logger = logging.getLogger("teacher_finder")
+
+# 구독자가 받은 로그 이벤트를 파일에만 남기는 로거 (콘솔 등 상위 핸들러로 전달하지 않음)
+_event_logger = logging.getLogger("teacher_finder.events")
+_event_logger.propagate = False
+_event_logger.addHandler(logging.NullHandler())  # 로그 파일을 설정하지 않았으면 버림
+
+# 회전 로그 파일 설정
+LOG_DIR = os.path.join(config.DATA_DIR, "logs")
+LOG_FILE_NAME = "teacher_finder.log"
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+# 로그 레벨별 logging 레벨 매핑 (구독자가 없을 때 사용)
+_LOGGING_LEVELS = {
+    "write": logging.INFO,
+    "subheader": logging.INFO,
+    "info": logging.INFO,
+    "success": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "exception": logging.ERROR,
+}
+
+_subscribers = contextvars.ContextVar("teacher_finder_event_subscribers", default=())
+_current_stage = contextvars.ContextVar("teacher_finder_current_stage", default="")
+_log_handler = None
+_log_handler_lock = threading.Lock()
+
+
+@dataclass
+class PipelineEvent:
+    """파이프라인에서 발행되는 이벤트
+
+    kind는 "log"(level, message), "progress"(step, fraction), "stage"(stage, data) 중 하나입니다.
+    로그 이벤트의 stage에는 이벤트가 발행된 파이프라인 단계(stage_scope)가 들어갑니다.
+    """
+    kind: str
+    level: str = ""
+    message: str = ""
+    step: int = 0
+    fraction: float = 0.0
+    stage: str = ""
+    data: object = None
+    timestamp: float = field(default_factory=time.time)
+
+
+@contextmanager
+def subscribe(callback, exclusive=False):
+    """with 블록 안에서 발행되는 이벤트를 callback(event)으로 전달받도록 등록
+
+    exclusive=True이면 바깥(제출한 스레드의 컨텍스트 포함)에서 등록된 구독자에게는 전달하지 않습니다.
+    """
+    token = _subscribers.set((callback,) if exclusive else _subscribers.get() + (callback,))
+    try:
+        yield callback
+    finally:
+        _subscribers.reset(token)
+
+
+@contextmanager
+def stage_scope(stage):
+    """with 블록 안(워커 스레드 포함)에서 발행되는 로그 이벤트에 단계 이름을 붙임"""
+    token = _current_stage.set(stage)
+    try:
+        yield
+    finally:
+        _current_stage.reset(token)
+
+
+def configure_log_file(path=None, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT):
+    """모든 로그 이벤트를 회전 로그 파일에 기록 (여러 번 호출해도 핸들러는 하나)"""
+    global _log_handler
+    with _log_handler_lock:
+        if _log_handler is not None:
+            return _log_handler.baseFilename
+        path = path or os.path.join(LOG_DIR, LOG_FILE_NAME)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(threadName)s] %(message)s"))
+        for target in (logger, _event_logger):
+            target.addHandler(handler)
+            if target.level == logging.NOTSET or target.level > logging.INFO:
+                target.setLevel(logging.INFO)
+        _log_handler = handler
+        return path
+
+
+def emit(event):
+    """등록된 모든 구독자에게 이벤트 전달 (구독자가 없으면 logging으로 출력)"""
+    subscribers = _subscribers.get()
+    if event.kind == "log":
+        message = f"[{event.stage}] {event.message}" if event.stage else event.message
+        # 구독자가 있으면 화면 출력은 구독자가 맡으므로 로그 파일에만 남김
+        (_event_logger if subscribers else logger).log(_LOGGING_LEVELS.get(event.level, logging.INFO), message)
+    if not subscribers:
+        return
+
+    for callback in subscribers:
+        try:
+            callback(event)
+        except Exception:
+            # 구독자 오류가 파이프라인을 중단시키지 않도록 로그만 남김
+            logger.exception("이벤트 구독자 처리 중 오류 발생")
+
+
+def _log(level, message):
+    emit(PipelineEvent(kind="log", level=level, message=str(message), stage=_current_stage.get()))
+
+
+def write(message):
+    _log("write", message)
+
+
+def subheader(message):
+    _log("subheader", message)
+
+
+def info(message):
+    _log("info", message)
+
+
+def success(message):
+    _log("success", message)
+
+
+def warning(message):
+    _log("warning", message)
+
+
+def error(message):
+    _log("error", message)
+
+
+def exception(e):
+    """예외의 상세 traceback을 error 레벨보다 자세한 exception 이벤트로 발행"""
+    emit(PipelineEvent(
+        kind="log",
+        level="exception",
+        message="".join(traceback.format_exception(type(e), e, e.__traceback__)),
+        stage=_current_stage.get(),
+        data=e
+    ))
+
+
+def update_progress(step, progress_within_step=0):
+    """진행 상태 업데이트 (step: 0~4 단계, progress_within_step: 단계 내 진행률 0~1)"""
+    emit(PipelineEvent(kind="progress", step=step, fraction=progress_within_step))
+
+
+def stage_completed(stage, data):
+    """단계 결과가 준비되었음을 알림 (UI는 이 이벤트로 결과를 표시하거나 저장)"""
+    emit(PipelineEvent(kind="stage", stage=stage, data=data))
+
+
+class EventQueue:
+    """어느 스레드에서든 이벤트를 받아 두었다가 한 스레드(화면 스레드 등)에서 꺼내 처리하는 구독자
+
+    subscribe(EventQueue())로 등록하고 drain()으로 쌓인 이벤트를 꺼냅니다.
+    """
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+
+    def __call__(self, event):
+        self._queue.put(event)
+
+    def drain(self, limit=None):
+        """쌓인 이벤트를 발행 순서대로 꺼냄 (limit개까지)"""
+        drained = []
+        while limit is None or len(drained) < limit:
+            try:
+                drained.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return drained
+
+
+class ContextThreadPoolExecutor(concurrent.futures.ThreadPoolExecutor):
+    """제출 시점의 contextvars(이벤트 구독자 포함)를 워커 스레드로 전달하는 스레드 풀"""
+
+    def submit(self, fn, /, *args, **kwargs):
+        context = contextvars.copy_context()
+        return super().submit(context.run, fn, *args, **kwargs)
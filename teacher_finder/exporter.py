@@ -0,0 +1,191 @@
+"""실행 결과 내보내기 (Parquet / JSONL)
+
+키워드 한 번의 실행 결과(댓글, 스크립트, 추천 영상, 이메일)를 표마다 Parquet와 JSONL로,
+분석/매칭 원문은 텍스트 파일로 저장하고 manifest.json에 목록을 기록합니다.
+
+    DATA_DIR/exports/<run_id>/manifest.json
+    DATA_DIR/exports/<run_id>/<표>.parquet, <표>.jsonl
+    DATA_DIR/exports/<run_id>/<원문>.txt
+
+표는 EXPORT_BATCH_SIZE행씩 나눠 쓰므로 큰 결과도 한 번에 메모리에 올리지 않습니다.
+manifest.json은 모든 파일을 쓴 뒤 마지막에 쓰므로, manifest가 있는 실행만 완성된 내보내기입니다.
+화면에서는 open_export_file()로 디스크의 파일을 그대로 다운로드 버튼에 넘깁니다.
+"""
+import json
+import os
+import time
+import uuid
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from . import config
+
+EXPORT_DIR = os.path.join(config.DATA_DIR, "exports")
+
+# 한 번에 쓰는 행 수
+EXPORT_BATCH_SIZE = 5000
+
+FORMAT_PARQUET = "parquet"
+FORMAT_JSONL = "jsonl"
+EXPORT_FORMATS = (FORMAT_PARQUET, FORMAT_JSONL)
+
+EXPORT_MIME_TYPES = {
+    FORMAT_PARQUET: "application/vnd.apache.parquet",
+    FORMAT_JSONL: "application/x-ndjson",
+    "txt": "text/plain",
+}
+
+# 표별 열 형식 (실행마다 같은 형식으로 써야 여러 실행을 함께 조회할 수 있음)
+TABLE_SCHEMAS = {
+    "comments": pa.schema([
+        ("text", pa.string()),
+        ("author", pa.string()),
+        ("likes", pa.int64()),
+        ("published_at", pa.string()),
+        ("video_id", pa.string()),
+        ("thread_id", pa.string()),
+        ("is_reply", pa.bool_()),
+    ]),
+    "scripts": pa.schema([
+        ("video_id", pa.string()),
+        ("title", pa.string()),
+        ("channel_name", pa.string()),
+        ("channel_id", pa.string()),
+        ("subscriber_count", pa.int64()),
+        ("view_count", pa.int64()),
+        ("like_count", pa.int64()),
+        ("published_at", pa.string()),
+        ("duration_seconds", pa.int64()),
+        ("category_id", pa.string()),
+        ("video_link", pa.string()),
+        ("description", pa.string()),
+        ("script", pa.string()),
+    ]),
+    "recommendations": pa.schema([
+        ("rank", pa.int64()),
+        ("video_id", pa.string()),
+        ("title", pa.string()),
+        ("channel", pa.string()),
+        ("score", pa.float64()),
+        ("url", pa.string()),
+        ("content_type", pa.string()),
+    ]),
+    "emails": pa.schema([
+        ("video_id", pa.string()),
+        ("title", pa.string()),
+        ("channel", pa.string()),
+        ("score", pa.float64()),
+        ("email", pa.string()),
+    ]),
+}
+
+
+def _coerce(value, arrow_type):
+    """값을 열 형식에 맞게 변환 (변환할 수 없는 숫자는 None)"""
+    if value is None:
+        return None
+    if pa.types.is_string(arrow_type):
+        return str(value)
+    try:
+        if pa.types.is_integer(arrow_type):
+            return int(float(value))
+        if pa.types.is_floating(arrow_type):
+            return float(value)
+        return bool(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _record_batch(rows, schema):
+    columns = [
+        pa.array([_coerce(row.get(field.name), field.type) for row in rows], type=field.type)
+        for field in schema
+    ]
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def _write_table(run_dir, name, rows, schema):
+    """표 하나를 Parquet와 JSONL로 쓰고 manifest 항목 반환"""
+    files = {fmt: f"{name}.{fmt}" for fmt in EXPORT_FORMATS}
+    parquet_tmp = os.path.join(run_dir, f"{files[FORMAT_PARQUET]}.tmp")
+    jsonl_tmp = os.path.join(run_dir, f"{files[FORMAT_JSONL]}.tmp")
+    with pq.ParquetWriter(parquet_tmp, schema) as parquet_writer, open(jsonl_tmp, "w", encoding="utf-8") as jsonl_file:
+        for start in range(0, len(rows), EXPORT_BATCH_SIZE):
+            batch = _record_batch(rows[start:start + EXPORT_BATCH_SIZE], schema)
+            parquet_writer.write_batch(batch)
+            for record in batch.to_pylist():
+                jsonl_file.write(json.dumps(record, ensure_ascii=False))
+                jsonl_file.write("\n")
+    for fmt, file_name in files.items():
+        os.replace(os.path.join(run_dir, f"{file_name}.tmp"), os.path.join(run_dir, file_name))
+    return {"rows": len(rows), "files": files, "columns": schema.names}
+
+
+def new_export_id():
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def export_run(keyword, tables, texts=None, run_id=None):
+    """실행 결과를 내보내고 manifest(dict) 반환
+
+    tables: {"comments": [dict], "scripts": [dict], "recommendations": [dict], "emails": {video_id: dict}}
+    texts: {"analysis": 분석 원문, "matching": 매칭 원문} (선택)
+    같은 run_id로 다시 내보내면 덮어씁니다.
+    """
+    run_id = run_id or new_export_id()
+    run_dir = os.path.join(EXPORT_DIR, run_id)
+    os.makedirs(run_dir, exist_ok=True)
+
+    manifest = {
+        "run_id": run_id,
+        "keyword": keyword,
+        "created_at": time.time(),
+        "tables": {},
+        "texts": {},
+    }
+    for name, schema in TABLE_SCHEMAS.items():
+        rows = tables.get(name) or []
+        if isinstance(rows, dict):  # 이메일: {video_id: {...}}
+            rows = [{**data, "video_id": video_id} for video_id, data in rows.items()]
+        manifest["tables"][name] = _write_table(run_dir, name, rows, schema)
+
+    for name, text in (texts or {}).items():
+        if not text:
+            continue
+        file_name = f"{name}.txt"
+        with open(os.path.join(run_dir, file_name), "w", encoding="utf-8") as f:
+            f.write(text)
+        manifest["texts"][name] = file_name
+
+    manifest_tmp = os.path.join(run_dir, "manifest.json.tmp")
+    with open(manifest_tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(manifest_tmp, os.path.join(run_dir, "manifest.json"))
+    return manifest
+
+
+def load_manifest(run_id):
+    """내보낸 실행의 manifest (없으면 None)"""
+    try:
+        with open(os.path.join(EXPORT_DIR, run_id, "manifest.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def list_exports():
+    """완성된 내보내기의 manifest 목록 (최근 실행부터)"""
+    if not os.path.isdir(EXPORT_DIR):
+        return []
+    manifests = [load_manifest(run_id) for run_id in os.listdir(EXPORT_DIR)]
+    return sorted((m for m in manifests if m), key=lambda m: m["created_at"], reverse=True)
+
+
+def export_file_path(run_id, file_name):
+    return os.path.join(EXPORT_DIR, run_id, os.path.basename(file_name))
+
+
+def open_export_file(run_id, file_name):
+    """내보낸 파일을 바이너리 모드로 열기 (다운로드 버튼에 그대로 넘길 수 있는 파일 객체)"""
+    return open(export_file_path(run_id, file_name), "rb")
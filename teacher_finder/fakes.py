@@ -0,0 +1,570 @@
+"""벤치마크용 가짜 외부 API (YouTube Data API, 자막, Claude, Google Sheets)
+
+실제 API 응답과 같은 형식의 응답을 돌려주는 가짜 클라이언트들입니다. 호출마다 지정한 지연 시간만큼
+기다리고(±50% 흔들림), error_rate 확률로 오류를 냅니다. 호출 수와 주입한 오류 수는 FakeServices에
+모입니다.
+
+- YouTube: 실제 googleapiclient 클라이언트에 가짜 HTTP 전송 계층을 끼웁니다. 따라서 요청 생성,
+  clients.RateLimitedHttpRequest의 호출 속도 제한/할당량 집계/추적 span은 실제와 같이 실행되고,
+  HTTP 응답만 가짜입니다. (오류는 HTTP 500)
+- 자막: youtube_transcript_api.YouTubeTranscriptApi 대신 쓰는 클래스
+- Claude: messages.create만 있는 클라이언트. 프롬프트 종류(키워드 분석, 배치 매칭, 이메일)에 맞는
+  형식의 응답을 만들고, 키워드 분석은 analysis_texts(체크포인트에 기록된 응답 등)가 있으면 그것을 재사용
+- Google Sheets: 메모리에 행을 두는 gspread 클라이언트 (sheets 모듈이 쓰는 메서드만)
+
+영상/채널/댓글/자막은 요청 값의 해시로 정해지므로 같은 요청에는 항상 같은 응답이 옵니다. 검색 결과는
+VIDEO_POOL_SIZE개 영상 중에서 뽑으므로 다른 검색어끼리 영상과 채널이 겹치기도 합니다.
+
+    with fakes.fake_services(latency=0.02, claude_latency=0.5, error_rate=0.01) as services:
+        collect_scripts_by_keywords(["발표 자신감"])
+    print(services.calls)
+"""
+import collections
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import gspread
+import httplib2
+from googleapiclient.discovery import build
+
+from . import clients, sheets
+
+# 가짜 응답 규모
+VIDEO_POOL_SIZE = 5000  # 검색 결과로 나올 수 있는 영상 수
+CHANNEL_POOL_SIZE = 800  # 영상이 속하는 채널 수
+SEARCH_RESULTS_PER_QUERY = 20  # 검색어 하나로 찾을 수 있는 영상 수 (페이지당 최대 maxResults개)
+COMMENTS_PER_VIDEO = 60  # 영상 하나의 댓글 수
+TRANSCRIPT_SEGMENTS = 120  # 자막 한 편의 구간 수
+
+# 기본 지연 시간 (초)
+DEFAULT_LATENCY = 0.02
+DEFAULT_CLAUDE_LATENCY = 0.5
+
+_TOPICS = ["발표", "스피치", "면접", "보이스", "말하기", "프레젠테이션", "토론", "낭독"]
+_ASPECTS = ["자신감", "긴장 극복", "호흡법", "발음 교정", "목소리 톤", "논리 구성", "시선 처리", "속도 조절"]
+_SCRIPT_SENTENCES = [
+    "오늘은 발표할 때 떨리는 목소리를 잡는 방법을 알려드릴게요",
+    "먼저 복식 호흡으로 숨을 길게 내쉬는 연습부터 해 보겠습니다",
+    "청중의 눈을 한 사람씩 바라보면서 문장을 끝까지 말해 보세요",
+    "두괄식으로 결론부터 말하면 듣는 사람이 훨씬 편하게 따라옵니다",
+    "제가 처음 강의를 시작했을 때도 손이 떨려서 원고를 못 읽었어요",
+    "매일 오 분씩 소리 내어 읽는 습관이 생각보다 큰 차이를 만듭니다",
+]
+
+_VIDEO_ID_PATTERN = re.compile(r"\*\*영상 ID\*\*:\s*(\S+)")
+_VIDEO_TITLE_PATTERN = re.compile(r"\*\*영상 제목\*\*:\s*(.+)")
+_CHANNEL_NAME_PATTERN = re.compile(r"\*\*채널명\*\*:\s*(.+)")
+
+
+class FakeApiError(Exception):
+    """가짜 API가 주입한 오류"""
+
+
+def _hash_int(*parts):
+    return int.from_bytes(hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).digest()[:8], "big")
+
+
+def _video_id(index):
+    return f"fk{index:09d}"
+
+
+def _video_index(video_id):
+    try:
+        return int(video_id[2:])
+    except ValueError:
+        return _hash_int(video_id) % VIDEO_POOL_SIZE
+
+
+def _channel_index(video_index):
+    return _hash_int("channel", video_index) % CHANNEL_POOL_SIZE
+
+
+def _channel_id(channel_index):
+    return f"UCfake{channel_index:06d}"
+
+
+def sample_keywords(count):
+    """벤치마크용 키워드 count개 (항상 같은 목록)"""
+    return [
+        f"{_TOPICS[i % len(_TOPICS)]} {_ASPECTS[i // len(_TOPICS) % len(_ASPECTS)]} {i}"
+        for i in range(count)
+    ]
+
+
+def _title(video_index):
+    topic = _TOPICS[video_index % len(_TOPICS)]
+    aspect = _ASPECTS[_hash_int("aspect", video_index) % len(_ASPECTS)]
+    return f"{topic} {aspect} 루틴 {video_index}편"
+
+
+class FakeServices:
+    """가짜 API들이 공유하는 지연/오류 주입 설정과 호출 집계 (스레드 안전)"""
+
+    def __init__(self, latency=DEFAULT_LATENCY, claude_latency=DEFAULT_CLAUDE_LATENCY, error_rate=0.0, seed=0,
+                 search_results=SEARCH_RESULTS_PER_QUERY, analysis_texts=None):
+        self.latency = latency
+        self.claude_latency = claude_latency
+        self.error_rate = error_rate
+        self.search_results = search_results
+        self.analysis_texts = list(analysis_texts or [])
+        self.calls = collections.Counter()
+        self.errors = collections.Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.claude = FakeClaudeClient(self)
+        self.sheets = FakeSheetsClient(self)
+
+    def call(self, name, latency=None):
+        """호출 하나를 집계하고 지연 시간만큼 대기. 오류를 주입할 호출이면 True"""
+        with self._lock:
+            self.calls[name] += 1
+            jitter = self._random.uniform(0.5, 1.5)
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors[name] += 1
+        delay = (self.latency if latency is None else latency) * jitter
+        if delay > 0:
+            time.sleep(delay)
+        return failed
+
+    def youtube_client(self):
+        """가짜 HTTP 전송 계층을 쓰는 실제 YouTube 클라이언트 (clients.get_youtube_client 대신)"""
+        return build("youtube", "v3", http=FakeYouTubeHttp(self), developerKey="fake-key", requestBuilder=clients.RateLimitedHttpRequest)
+
+    @property
+    def total_calls(self):
+        with self._lock:
+            return sum(self.calls.values())
+
+
+# YouTube Data API
+class FakeYouTubeHttp:
+    """googleapiclient가 쓰는 httplib2.Http 자리에 넣는 가짜 전송 계층"""
+
+    def __init__(self, services):
+        self.services = services
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        url = urlparse(uri)
+        resource = url.path.rstrip("/").rsplit("/", 1)[-1]
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        name = f"youtube.{resource}.list"
+        if self.services.call(name):
+            payload = {"error": {"code": 500, "message": "Backend Error (주입한 오류)", "errors": [{"reason": "backendError"}]}}
+            return httplib2.Response({"status": "500", "content-type": "application/json"}), json.dumps(payload).encode("utf-8")
+
+        builder = _YOUTUBE_RESOURCES.get(resource)
+        if builder is None:
+            payload = {"error": {"code": 404, "message": f"지원하지 않는 리소스: {resource}"}}
+            return httplib2.Response({"status": "404", "content-type": "application/json"}), json.dumps(payload).encode("utf-8")
+        payload = builder(self.services, params)
+        return httplib2.Response({"status": "200", "content-type": "application/json"}), json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def _page(params, total):
+    """pageToken/maxResults로 (시작 위치, 끝 위치, 다음 페이지 토큰)"""
+    start = int(params.get("pageToken") or 0)
+    end = min(total, start + int(params.get("maxResults") or 5))
+    return start, end, str(end) if end < total else None
+
+
+def _search_payload(services, params):
+    query = params.get("q", "")
+    start, end, next_token = _page(params, services.search_results)
+    items = [
+        {"kind": "youtube#searchResult", "id": {"kind": "youtube#video", "videoId": _video_id(_hash_int(query, rank) % VIDEO_POOL_SIZE)}}
+        for rank in range(start, end)
+    ]
+    payload = {"kind": "youtube#searchListResponse", "items": items, "pageInfo": {"totalResults": services.search_results}}
+    if next_token:
+        payload["nextPageToken"] = next_token
+    return payload
+
+
+def _video_resource(video_id):
+    index = _video_index(video_id)
+    channel = _channel_index(index)
+    seconds = 120 + _hash_int("duration", index) % 1800
+    published = datetime.now(timezone.utc) - timedelta(days=_hash_int("published", index) % 900)
+    return {
+        "kind": "youtube#video",
+        "id": video_id,
+        "snippet": {
+            "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "channelId": _channel_id(channel),
+            "title": _title(index),
+            "description": f"{_title(index)} - 매일 따라 하는 연습 영상입니다.",
+            "channelTitle": f"말하기 채널 {channel}",
+            "categoryId": "27",
+        },
+        "contentDetails": {"duration": f"PT{seconds // 60}M{seconds % 60}S"},
+        "statistics": {
+            "viewCount": str(_hash_int("views", index) % 2_000_000),
+            "likeCount": str(_hash_int("likes", index) % 50_000),
+        },
+    }
+
+
+def _videos_payload(services, params):
+    video_ids = [video_id for video_id in params.get("id", "").split(",") if video_id]
+    return {"kind": "youtube#videoListResponse", "items": [_video_resource(video_id) for video_id in video_ids]}
+
+
+def _channels_payload(services, params):
+    items = []
+    for channel_id in params.get("id", "").split(","):
+        if not channel_id:
+            continue
+        index = _hash_int(channel_id)
+        items.append({
+            "kind": "youtube#channel",
+            "id": channel_id,
+            "snippet": {"title": f"말하기 채널 {channel_id[-6:]}"},
+            "statistics": {"subscriberCount": str(index % 300_000), "videoCount": str(index % 900)},
+        })
+    return {"kind": "youtube#channelListResponse", "items": items}
+
+
+def _comment_snippet(video_id, number):
+    return {
+        "textDisplay": f"{_SCRIPT_SENTENCES[number % len(_SCRIPT_SENTENCES)]} 덕분에 자신감이 생겼어요 ({video_id} #{number})",
+        "authorDisplayName": f"user{_hash_int('author', video_id, number) % 50_000}",
+        "likeCount": _hash_int("comment-likes", video_id, number) % 500,
+        "publishedAt": "2024-01-01T00:00:00Z",
+    }
+
+
+def _comment_threads_payload(services, params):
+    video_id = params.get("videoId", "")
+    start, end, next_token = _page(params, COMMENTS_PER_VIDEO)
+    items = [
+        {
+            "kind": "youtube#commentThread",
+            "id": f"{video_id}.t{number}",
+            "snippet": {
+                "videoId": video_id,
+                "topLevelComment": {"id": f"{video_id}.t{number}", "snippet": _comment_snippet(video_id, number)},
+                "totalReplyCount": 0,
+            },
+        }
+        for number in range(start, end)
+    ]
+    payload = {"kind": "youtube#commentThreadListResponse", "items": items}
+    if next_token:
+        payload["nextPageToken"] = next_token
+    return payload
+
+
+def _comments_payload(services, params):
+    return {"kind": "youtube#commentListResponse", "items": []}
+
+
+_YOUTUBE_RESOURCES = {
+    "search": _search_payload,
+    "videos": _videos_payload,
+    "channels": _channels_payload,
+    "commentThreads": _comment_threads_payload,
+    "comments": _comments_payload,
+}
+
+
+# 자막
+class FakeTranscriptApi:
+    """youtube_transcript_api.YouTubeTranscriptApi 대신 쓰는 클래스 (fake_services 안에서만 사용)"""
+    services = None
+
+    @classmethod
+    def get_transcript(cls, video_id, languages=None):
+        if cls.services.call("transcript.get_transcript"):
+            raise FakeApiError(f"자막을 가져올 수 없습니다: {video_id} (주입한 오류)")
+        index = _video_index(video_id)
+        return [
+            {
+                "text": _SCRIPT_SENTENCES[(index + segment) % len(_SCRIPT_SENTENCES)],
+                "start": segment * 4.0,
+                "duration": 4.0,
+            }
+            for segment in range(TRANSCRIPT_SEGMENTS)
+        ]
+
+
+def synthetic_scripts(count):
+    """collect_scripts_by_keywords 결과 형식의 스크립트 count개 (자막 포함, 매칭 단계만 따로 잴 때 사용)"""
+    scripts = []
+    for index in range(count):
+        video_id = _video_id(index)
+        video = _video_resource(video_id)
+        snippet = video["snippet"]
+        scripts.append({
+            "video_id": video_id,
+            "title": snippet["title"],
+            "channel_name": snippet["channelTitle"],
+            "channel_id": snippet["channelId"],
+            "description": snippet["description"],
+            "view_count": int(video["statistics"]["viewCount"]),
+            "like_count": int(video["statistics"]["likeCount"]),
+            "published_at": snippet["publishedAt"],
+            "category_id": snippet["categoryId"],
+            "video_link": f"https://www.youtube.com/watch?v={video_id}",
+            "subscriber_count": 10_000,
+            "script": " ".join(_SCRIPT_SENTENCES[(index + segment) % len(_SCRIPT_SENTENCES)] for segment in range(TRANSCRIPT_SEGMENTS)),
+        })
+    return scripts
+
+
+# Claude
+def synthetic_analysis(seed_text):
+    """키워드 분석 응답 형식의 합성 응답 (검색 키워드 5개, seed_text마다 다름)"""
+    seed = _hash_int(seed_text)
+    aspects = [_ASPECTS[(seed + i) % len(_ASPECTS)] for i in range(3)]
+    topic = _TOPICS[seed % len(_TOPICS)]
+    lines = ["# 댓글 분석 결과", "", "## 1. 핵심 키워드"]
+    for aspect in aspects:
+        lines += [f"- {aspect} 부족", f"  - {topic}, {aspect}, 연습"]
+    lines += ["", "## 2. 결핍-솔루션 페어"]
+    for aspect in aspects:
+        lines += [f"- {aspect} 부족", f"  - {aspect} 훈련 루틴, 실전 {topic} 연습"]
+    lines += ["", "## 3. 메시지 프레임워크"]
+    for aspect in aspects:
+        lines += [f"- {aspect} 부족", f"  - \"{aspect}은 연습으로 충분히 바뀝니다\""]
+    lines += ["", "## 4. 유튜브 검색 최적화 키워드"]
+    lines += [f"{i + 1}. {topic} {_ASPECTS[(seed + i) % len(_ASPECTS)]} 연습법" for i in range(5)]
+    return "\n".join(lines)
+
+
+def synthetic_batch_matching(prompt):
+    """배치 매칭 응답 형식의 합성 응답 (프롬프트에 들어간 영상마다 블록 하나, 점수는 영상마다 고정)"""
+    video_ids = _VIDEO_ID_PATTERN.findall(prompt)
+    titles = _VIDEO_TITLE_PATTERN.findall(prompt)
+    channels = _CHANNEL_NAME_PATTERN.findall(prompt)
+    blocks = []
+    for i, video_id in enumerate(video_ids):
+        score = 3 + _hash_int("score", video_id) % 66 / 10
+        blocks.append(
+            f"[{video_id}] - {titles[i].strip() if i < len(titles) else video_id} - 종합 점수: {score:.1f}/10\n"
+            f"* 링크: https://www.youtube.com/watch?v={video_id}\n"
+            f"* 채널: {channels[i].strip() if i < len(channels) else 'Unknown'}\n"
+            f"* 주요 키워드: 자신감, 발표, 루틴\n"
+            f"* 콘텐츠 품질: 7.5/10 | 제작자 역량: 8.0/10 | 키워드 연관성: 6.5/10\n"
+            f"\n<인사이트>\n발표 불안을 실전 연습으로 다루는 영상입니다.\n"
+        )
+    return "\n".join(blocks)
+
+
+class _FakeMessages:
+    def __init__(self, services):
+        self.services = services
+
+    def create(self, model=None, max_tokens=0, system="", messages=(), **kwargs):
+        if self.services.call("claude.messages.create", self.services.claude_latency):
+            raise FakeApiError("Error code: 529 - overloaded_error (주입한 오류)")
+        prompt = "\n".join(message.get("content", "") for message in messages if isinstance(message.get("content"), str))
+        if "**영상 ID**" in prompt:
+            text = synthetic_batch_matching(prompt)
+        elif "댓글 데이터" in system:
+            recorded = self.services.analysis_texts
+            text = recorded[_hash_int(prompt) % len(recorded)] if recorded else synthetic_analysis(prompt)
+        else:
+            text = "안녕하세요, 선생님. 영상을 인상 깊게 보고 연락드립니다.\n\n함께 강의를 만들어 보고 싶습니다."
+        return SimpleNamespace(
+            id=f"msg_fake_{_hash_int(prompt) % 10**12}",
+            model=model,
+            content=[SimpleNamespace(type="text", text=text)],
+            usage=SimpleNamespace(input_tokens=(len(system) + len(prompt)) // 2, output_tokens=len(text) // 2),
+        )
+
+
+class FakeClaudeClient:
+    """Anthropic 클라이언트 대신 쓰는 클라이언트 (messages.create만 지원)"""
+
+    def __init__(self, services):
+        self.messages = _FakeMessages(services)
+
+
+# Google Sheets
+def _column_number(letters):
+    number = 0
+    for letter in letters.upper():
+        number = number * 26 + ord(letter) - ord("A") + 1
+    return number
+
+
+def _parse_a1(a1):
+    """'A1', 'B3', 'A:B' 등의 시작 (행, 열) (행이 없으면 1)"""
+    match = re.match(r"([A-Za-z]+)(\d*)", a1.split("!")[-1].split(":")[0])
+    return int(match.group(2) or 1), _column_number(match.group(1))
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, rows=None):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.rows = [list(row) for row in rows or []]
+
+    def _call(self, name):
+        self.spreadsheet.touch()
+        if self.spreadsheet.services.call(name):
+            raise FakeApiError(f"{name} 실패 (주입한 오류)")
+
+    def _set(self, row, column, values):
+        for r, row_values in enumerate(values):
+            while len(self.rows) < row + r:
+                self.rows.append([])
+            target = self.rows[row + r - 1]
+            while len(target) < column - 1 + len(row_values):
+                target.append("")
+            target[column - 1:column - 1 + len(row_values)] = row_values
+
+    def update(self, range_name, values, **kwargs):
+        self._call("sheets.values_update")
+        self._set(*_parse_a1(range_name), values)
+
+    def batch_update(self, data, **kwargs):
+        self._call("sheets.values_batch_update")
+        for item in data:
+            self._set(*_parse_a1(item["range"]), item["values"])
+
+    def append_rows(self, values, value_input_option=None, **kwargs):
+        self._call("sheets.values_append")
+        start = len(self.rows) + 1
+        self.rows.extend(list(row) for row in values)
+        return {"updates": {"updatedRange": f"'{self.title}'!A{start}:Z{len(self.rows)}"}}
+
+    def get(self, range_name, **kwargs):
+        """'B5:B' 같은 범위의 값 (시작 행부터 끝까지, 한 열)"""
+        self._call("sheets.values_get")
+        row, column = _parse_a1(range_name)
+        return [values[column - 1:column] for values in self.rows[row - 1:]]
+
+    def col_values(self, col):
+        self._call("sheets.values_get")
+        return [row[col - 1] if len(row) >= col else "" for row in self.rows]
+
+    def values_in(self, a1):
+        """'A:B' 같은 열 범위의 값 (values.batchGet 응답의 values)"""
+        first, last = (a1.split(":") + [a1])[:2]
+        start, end = _column_number(re.sub(r"\d", "", first)), _column_number(re.sub(r"\d", "", last))
+        return [row[start - 1:end] for row in self.rows]
+
+
+class FakeSpreadsheet:
+    def __init__(self, services, url):
+        self.services = services
+        self.url = url
+        self._worksheets = {}
+        self._updated_at = time.time()
+
+    def touch(self):
+        self._updated_at = time.time()
+
+    def seed(self, title, rows):
+        """워크시트를 만들고 행을 채움 (호출로 집계하지 않음)"""
+        self._worksheets[title] = FakeWorksheet(self, title, rows)
+        return self._worksheets[title]
+
+    def worksheets(self):
+        self.services.call("sheets.get")
+        return list(self._worksheets.values())
+
+    def worksheet(self, title):
+        self.services.call("sheets.get")
+        if title not in self._worksheets:
+            raise gspread.exceptions.WorksheetNotFound(title)
+        return self._worksheets[title]
+
+    def add_worksheet(self, title, rows=1000, cols=26, **kwargs):
+        self.services.call("sheets.batch_update")
+        return self.seed(title, [])
+
+    def values_batch_get(self, ranges, **kwargs):
+        if self.services.call("sheets.values_batch_get"):
+            raise FakeApiError("values.batchGet 실패 (주입한 오류)")
+        value_ranges = []
+        for range_name in ranges:
+            title, _, a1 = range_name.rpartition("!")
+            worksheet = self._worksheets.get(title.strip("'"))
+            value_ranges.append({"range": range_name, "values": worksheet.values_in(a1) if worksheet else []})
+        return {"spreadsheetId": self.url, "valueRanges": value_ranges}
+
+    def get_lastUpdateTime(self):
+        self.services.call("drive.files.get")
+        return datetime.fromtimestamp(self._updated_at, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class FakeSheetsClient:
+    """gspread 클라이언트 대신 쓰는 메모리 스프레드시트 클라이언트"""
+
+    def __init__(self, services):
+        self.services = services
+        self._spreadsheets = {}
+        self._lock = threading.Lock()
+
+    def spreadsheet(self, url):
+        """URL의 가짜 스프레드시트 (없으면 빈 스프레드시트 생성, 호출로 집계하지 않음)"""
+        with self._lock:
+            if url not in self._spreadsheets:
+                self._spreadsheets[url] = FakeSpreadsheet(self.services, url)
+            return self._spreadsheets[url]
+
+    def open_by_url(self, url):
+        self.services.call("sheets.open")
+        return self.spreadsheet(url)
+
+
+# 교체/복원
+def _reset_sheet_handles():
+    with sheets._handles_lock:
+        sheets._spreadsheets.clear()
+        sheets._worksheets.clear()
+    with sheets._snapshots_lock:
+        sheets._snapshots.clear()
+
+
+def _drain_youtube_pool():
+    drained = []
+    while not clients._youtube_client_pool.empty():
+        drained.append(clients._youtube_client_pool.get_nowait())
+    return drained
+
+
+@contextmanager
+def fake_services(**kwargs):
+    """블록 안에서 YouTube/자막/Claude/Sheets 호출을 가짜 API로 보내고 FakeServices를 넘김
+
+    kwargs는 FakeServices 인자입니다. 블록이 끝나면 원래 클라이언트로 되돌립니다.
+    """
+    import youtube_transcript_api
+
+    services = FakeServices(**kwargs)
+    original_youtube_client = clients.get_youtube_client
+    original_claude_client = clients.get_claude_client
+    original_transcript_api = youtube_transcript_api.YouTubeTranscriptApi
+    original_sheets_client = sheets._client
+    pooled = _drain_youtube_pool()
+    _reset_sheet_handles()
+
+    FakeTranscriptApi.services = services
+    clients.get_youtube_client = services.youtube_client
+    clients.get_claude_client = lambda: services.claude
+    youtube_transcript_api.YouTubeTranscriptApi = FakeTranscriptApi
+    sheets._client = services.sheets
+    try:
+        yield services
+    finally:
+        clients.get_youtube_client = original_youtube_client
+        clients.get_claude_client = original_claude_client
+        youtube_transcript_api.YouTubeTranscriptApi = original_transcript_api
+        sheets._client = original_sheets_client
+        FakeTranscriptApi.services = None
+        _drain_youtube_pool()
+        for youtube in pooled:
+            clients._youtube_client_pool.put(youtube)
+        _reset_sheet_handles()
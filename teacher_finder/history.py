@@ -0,0 +1,327 @@
+"""실행 기록 저장소 (여러 실행에 걸친 조회용 로컬 SQLite)
+
+파이프라인이 실행을 마칠 때마다 실행, 키워드, 영상, 채널, 점수, 이메일을 색인된 표에 기록합니다.
+'리스트업' 시트의 자유 형식 텍스트를 다시 읽지 않고도 "최근 3개월 동안 이 주제에서 점수가 높은
+선생님", "여러 키워드에서 반복해서 평가된 채널" 같은 질문에 바로 답할 수 있습니다.
+
+    runs       실행 ID, 키워드, 실행 시각, 댓글/스크립트/추천 수
+    keywords   실행별 키워드 (kind: 'main' 입력 키워드, 'search' 스크립트 검색 키워드)
+    videos     영상 ID별 최신 정보 (제목, 채널, 링크, 조회수 등)
+    channels   채널별 최신 정보 (채널 ID가 없으면 채널명으로 구분)
+    scores     실행별 영상 점수 (관련성 점수, 순위, 콘텐츠 유형)
+    emails     실행별 영업 이메일
+
+같은 실행 ID로 다시 기록하면 그 실행의 점수/키워드/이메일을 새로 씁니다.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from . import config, exporter
+
+# 기본 조회 기간 (일)
+DEFAULT_PERIOD_DAYS = 90
+
+# 조회 결과 최대 행 수
+DEFAULT_QUERY_LIMIT = 50
+
+KEYWORD_MAIN = "main"
+KEYWORD_SEARCH = "search"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    keyword TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    comments INTEGER DEFAULT 0,
+    scripts INTEGER DEFAULT 0,
+    recommended INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_runs_created ON runs (created_at);
+CREATE TABLE IF NOT EXISTS keywords (
+    run_id TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    PRIMARY KEY (run_id, keyword, kind)
+);
+CREATE INDEX IF NOT EXISTS idx_keywords_keyword ON keywords (keyword);
+CREATE TABLE IF NOT EXISTS channels (
+    channel_key TEXT PRIMARY KEY,
+    channel_id TEXT DEFAULT '',
+    channel_name TEXT DEFAULT '',
+    subscriber_count INTEGER DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_channels_name ON channels (channel_name);
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    channel_key TEXT DEFAULT '',
+    title TEXT DEFAULT '',
+    video_link TEXT DEFAULT '',
+    view_count INTEGER DEFAULT 0,
+    duration_seconds INTEGER DEFAULT 0,
+    published_at TEXT DEFAULT '',
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_videos_channel ON videos (channel_key);
+CREATE TABLE IF NOT EXISTS scores (
+    run_id TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    channel_key TEXT DEFAULT '',
+    score REAL NOT NULL,
+    rank INTEGER DEFAULT 0,
+    content_type TEXT DEFAULT '',
+    created_at REAL NOT NULL,
+    PRIMARY KEY (run_id, video_id)
+);
+CREATE INDEX IF NOT EXISTS idx_scores_created ON scores (created_at, score);
+CREATE INDEX IF NOT EXISTS idx_scores_channel ON scores (channel_key, created_at, score, run_id, video_id);
+CREATE INDEX IF NOT EXISTS idx_scores_video ON scores (video_id);
+CREATE TABLE IF NOT EXISTS emails (
+    run_id TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    email TEXT DEFAULT '',
+    created_at REAL NOT NULL,
+    PRIMARY KEY (run_id, video_id)
+);
+"""
+
+
+def _number(value, cast=int):
+    try:
+        return cast(float(value or 0))
+    except (TypeError, ValueError):
+        return cast(0)
+
+
+def channel_key(channel_id, channel_name):
+    """채널 구분 값 (채널 ID가 없으면 채널명)"""
+    return channel_id or f"name:{channel_name or ''}"
+
+
+class HistoryWarehouse:
+    """실행 기록 SQLite 저장소 (스레드 간 공유 가능)"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(config.DATA_DIR, "history.db")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def record_run(self, run_id, keyword, comments=0, search_keywords=(), scripts=(), recommendations=(), emails=None, created_at=None):
+        """실행 하나를 기록
+
+        scripts: 스크립트 dict/레코드 (영상/채널 정보), recommendations: 추천 영상 dict,
+        emails: {video_id: {email, ...}}
+        """
+        created_at = created_at or time.time()
+        scripts = list(scripts)
+        recommendations = list(recommendations)
+        emails = emails or {}
+
+        scripts_by_video = {}
+        channel_rows = {}
+        video_rows = []
+        for script in scripts:
+            key = channel_key(script.get("channel_id", ""), script.get("channel_name", ""))
+            scripts_by_video.setdefault(script.get("video_id", ""), key)
+            channel_rows[key] = (
+                key,
+                script.get("channel_id", "") or "",
+                script.get("channel_name", "") or "",
+                _number(script.get("subscriber_count")),
+                created_at,
+            )
+            video_rows.append((
+                script.get("video_id", ""),
+                key,
+                script.get("title", "") or "",
+                script.get("video_link", "") or "",
+                _number(script.get("view_count")),
+                _number(script.get("duration_seconds")),
+                script.get("published_at", "") or "",
+                created_at,
+            ))
+
+        score_rows = []
+        for video in recommendations:
+            video_id = video.get("video_id", "")
+            key = scripts_by_video.get(video_id)
+            if key is None:  # 스크립트 정보가 없는 영상은 추천 결과의 채널명으로 구분
+                key = channel_key("", video.get("channel", ""))
+                channel_rows.setdefault(key, (key, "", video.get("channel", "") or "", 0, created_at))
+                video_rows.append((video_id, key, video.get("title", "") or "", video.get("url", "") or "", 0, 0, "", created_at))
+            score_rows.append((
+                run_id,
+                video_id,
+                key,
+                _number(video.get("score"), float),
+                _number(video.get("rank")),
+                video.get("content_type", "") or "",
+                created_at,
+            ))
+
+        keyword_rows = [(run_id, keyword, KEYWORD_MAIN)]
+        keyword_rows += [(run_id, search_keyword, KEYWORD_SEARCH) for search_keyword in dict.fromkeys(search_keywords) if search_keyword]
+        email_rows = [(run_id, video_id, data.get("email", ""), created_at) for video_id, data in emails.items() if data.get("email")]
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, keyword, created_at, comments, scripts, recommended) VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, keyword, created_at, comments, len(scripts), len(recommendations))
+            )
+            for table in ("keywords", "scores", "emails"):
+                self._conn.execute(f"DELETE FROM {table} WHERE run_id = ?", (run_id,))
+            self._conn.executemany("INSERT OR IGNORE INTO keywords (run_id, keyword, kind) VALUES (?, ?, ?)", keyword_rows)
+            self._conn.executemany(
+                """
+                INSERT INTO channels (channel_key, channel_id, channel_name, subscriber_count, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (channel_key) DO UPDATE SET
+                    channel_name = excluded.channel_name,
+                    subscriber_count = MAX(channels.subscriber_count, excluded.subscriber_count),
+                    updated_at = excluded.updated_at
+                """,
+                list(channel_rows.values())
+            )
+            self._conn.executemany(
+                """
+                INSERT OR REPLACE INTO videos (video_id, channel_key, title, video_link, view_count, duration_seconds, published_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                video_rows
+            )
+            self._conn.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?, ?, ?)", score_rows)
+            self._conn.executemany("INSERT OR REPLACE INTO emails VALUES (?, ?, ?, ?)", email_rows)
+
+    def has_run(self, run_id):
+        return bool(self._query("SELECT 1 FROM runs WHERE run_id = ?", (run_id,)))
+
+    # 조회
+    def _run_filter(self, topic, since_days):
+        """주제(입력 키워드 또는 검색 키워드 일부)와 기간 조건"""
+        clauses, params = [], []
+        if since_days:
+            clauses.append("s.created_at >= ?")
+            params.append(time.time() - since_days * 24 * 60 * 60)
+        if topic:
+            clauses.append("s.run_id IN (SELECT run_id FROM keywords WHERE keyword LIKE ?)")
+            params.append(f"%{topic}%")
+        return (" AND ".join(clauses) or "1"), params
+
+    def top_teachers(self, topic=None, since_days=DEFAULT_PERIOD_DAYS, min_score=None, limit=DEFAULT_QUERY_LIMIT):
+        """기간/주제 안에서 채널별 최고 점수 순 목록"""
+        where, params = self._run_filter(topic, since_days)
+        if min_score is not None:
+            where += " AND s.score >= ?"
+            params.append(min_score)
+        return self._query(
+            f"""
+            SELECT c.channel_name, c.channel_id, c.subscriber_count,
+                   MAX(s.score) AS best_score, ROUND(AVG(s.score), 2) AS avg_score,
+                   COUNT(DISTINCT s.run_id) AS runs, COUNT(DISTINCT s.video_id) AS videos,
+                   GROUP_CONCAT(DISTINCT r.keyword) AS keywords, MAX(s.created_at) AS last_scored_at
+            FROM scores s
+            JOIN runs r ON r.run_id = s.run_id
+            JOIN channels c ON c.channel_key = s.channel_key
+            WHERE {where}
+            GROUP BY s.channel_key
+            ORDER BY best_score DESC, avg_score DESC
+            LIMIT ?
+            """,
+            (*params, limit)
+        )
+
+    def rescored_channels(self, since_days=DEFAULT_PERIOD_DAYS, min_keywords=2, limit=DEFAULT_QUERY_LIMIT):
+        """서로 다른 키워드 실행에서 여러 번 점수를 받은 채널"""
+        where, params = self._run_filter(None, since_days)
+        return self._query(
+            f"""
+            SELECT c.channel_name, c.channel_id, COUNT(DISTINCT r.keyword) AS keyword_count,
+                   COUNT(*) AS scored, MAX(s.score) AS best_score,
+                   GROUP_CONCAT(DISTINCT r.keyword) AS keywords
+            FROM scores s
+            JOIN runs r ON r.run_id = s.run_id
+            JOIN channels c ON c.channel_key = s.channel_key
+            WHERE {where}
+            GROUP BY s.channel_key
+            HAVING keyword_count >= ?
+            ORDER BY keyword_count DESC, best_score DESC
+            LIMIT ?
+            """,
+            (*params, min_keywords, limit)
+        )
+
+    def channel_scores(self, channel_name, limit=DEFAULT_QUERY_LIMIT):
+        """채널(이름 일부)의 실행별 점수 기록 (최근 순)"""
+        return self._query(
+            """
+            SELECT r.keyword, r.run_id, s.created_at, s.score, s.rank, s.content_type,
+                   v.title, v.video_link, c.channel_name, e.email
+            FROM channels c
+            JOIN scores s ON s.channel_key = c.channel_key
+            JOIN runs r ON r.run_id = s.run_id
+            LEFT JOIN videos v ON v.video_id = s.video_id
+            LEFT JOIN emails e ON e.run_id = s.run_id AND e.video_id = s.video_id
+            WHERE c.channel_name LIKE ?
+            ORDER BY s.created_at DESC
+            LIMIT ?
+            """,
+            (f"%{channel_name}%", limit)
+        )
+
+    def recent_runs(self, limit=DEFAULT_QUERY_LIMIT):
+        return self._query("SELECT * FROM runs ORDER BY created_at DESC LIMIT ?", (limit,))
+
+    def keywords(self):
+        """기록된 입력 키워드 목록 (최근 실행 순)"""
+        rows = self._query("SELECT keyword, MAX(created_at) AS last_run FROM runs GROUP BY keyword ORDER BY last_run DESC")
+        return [row["keyword"] for row in rows]
+
+
+def backfill_from_exports(warehouse):
+    """아직 기록되지 않은 내보내기(exporter) 실행을 기록에 추가하고 추가한 실행 수 반환"""
+    import pyarrow.parquet as pq
+
+    added = 0
+    for manifest in exporter.list_exports():
+        run_id = manifest["run_id"]
+        if warehouse.has_run(run_id):
+            continue
+        tables = {}
+        for name in ("scripts", "recommendations", "emails"):
+            path = exporter.export_file_path(run_id, manifest["tables"][name]["files"][exporter.FORMAT_PARQUET])
+            tables[name] = pq.read_table(path).to_pylist() if os.path.exists(path) else []
+        warehouse.record_run(
+            run_id,
+            manifest["keyword"],
+            comments=manifest["tables"]["comments"]["rows"],
+            scripts=tables["scripts"],
+            recommendations=tables["recommendations"],
+            emails={email["video_id"]: email for email in tables["emails"]},
+            created_at=manifest["created_at"]
+        )
+        added += 1
+    return added
+
+
+_warehouse = None
+_warehouse_lock = threading.Lock()
+
+
+def get_history():
+    """프로세스 전역 HistoryWarehouse (처음 호출할 때 생성)"""
+    global _warehouse
+    with _warehouse_lock:
+        if _warehouse is None:
+            _warehouse = HistoryWarehouse()
+        return _warehouse
@@ -0,0 +1,144 @@
+"""업로드된 댓글 파일 읽기 (CSV, Parquet, JSONL)
+
+파일을 INGEST_CHUNK_SIZE행씩 나눠 읽고, 열 정리(빠진 열 채우기, 빈 값, 좋아요 수 숫자 변환)는
+행마다 dict를 만들지 않고 청크 단위 벡터 연산으로 처리합니다. 읽은 댓글은 CommentTable
+(DataFrame)로 열 단위로 보관하고, 분석 단계에 넘길 때 sample()로 고른 댓글만 dict로 만듭니다.
+
+    table = read_comment_table(uploaded_file)
+    comments = table.sample(max_comments=1000)  # 좋아요 순 상위 댓글 [{text, author, ...}]
+"""
+import os
+
+import pandas as pd
+
+from . import events
+
+# 댓글 열과 빈 값의 기본값 (text만 필수)
+COMMENT_COLUMNS = {
+    "text": "",
+    "author": "Unknown",
+    "likes": 0,
+    "published_at": "",
+    "video_id": "",
+    "video_title": "",
+    "channel_name": "",
+}
+REQUIRED_COLUMNS = ("text",)
+
+# 한 번에 읽는 행 수
+INGEST_CHUNK_SIZE = 50_000
+
+# 분석 단계에 넘기는 기본 댓글 수 (좋아요 순)
+DEFAULT_SAMPLE_SIZE = 1000
+
+FORMAT_CSV = "csv"
+FORMAT_PARQUET = "parquet"
+FORMAT_JSONL = "jsonl"
+
+_EXTENSION_FORMATS = {
+    ".csv": FORMAT_CSV,
+    ".parquet": FORMAT_PARQUET,
+    ".pq": FORMAT_PARQUET,
+    ".jsonl": FORMAT_JSONL,
+    ".ndjson": FORMAT_JSONL,
+}
+
+# CSV 열 형식 (좋아요 수는 잘못된 값이 섞여 있어도 읽을 수 있도록 정리 단계에서 숫자로 변환)
+_CSV_DTYPES = {column: str for column in COMMENT_COLUMNS if column != "likes"}
+
+
+def detect_format(source):
+    """파일 이름(또는 업로드 파일의 name)의 확장자로 형식 판단 (알 수 없으면 CSV)"""
+    name = source if isinstance(source, str) else getattr(source, "name", "")
+    return _EXTENSION_FORMATS.get(os.path.splitext(name or "")[1].lower(), FORMAT_CSV)
+
+
+def normalize_comment_chunk(df):
+    """청크의 열을 댓글 형식으로 정리 (빠진 열은 기본값, 내용이 빈 행은 제외)"""
+    df = df.reindex(columns=list(COMMENT_COLUMNS))
+    for column, default in COMMENT_COLUMNS.items():
+        if column == "likes":
+            df[column] = pd.to_numeric(df[column], errors="coerce").fillna(0).astype("int64")
+        else:
+            df[column] = df[column].fillna(default).astype(str)
+    df["text"] = df["text"].str.strip()
+    return df[df["text"] != ""]
+
+
+def _csv_chunks(source, chunksize):
+    return pd.read_csv(
+        source,
+        chunksize=chunksize,
+        usecols=lambda column: column in COMMENT_COLUMNS,
+        dtype=_CSV_DTYPES,
+    )
+
+
+def _parquet_chunks(source, chunksize):
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(source)
+    columns = [column for column in COMMENT_COLUMNS if column in parquet_file.schema_arrow.names]
+    for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+        yield batch.to_pandas()
+
+
+def _jsonl_chunks(source, chunksize):
+    with pd.read_json(source, lines=True, chunksize=chunksize, dtype=False) as reader:
+        for chunk in reader:
+            yield chunk[[column for column in chunk.columns if column in COMMENT_COLUMNS]]
+
+
+_CHUNK_READERS = {
+    FORMAT_CSV: _csv_chunks,
+    FORMAT_PARQUET: _parquet_chunks,
+    FORMAT_JSONL: _jsonl_chunks,
+}
+
+
+def iter_comment_chunks(source, fmt=None, chunksize=INGEST_CHUNK_SIZE):
+    """파일을 chunksize행씩 읽어 정리된 DataFrame을 차례로 반환
+
+    첫 청크에 필수 열(text)이 없으면 ValueError를 냅니다.
+    """
+    fmt = fmt or detect_format(source)
+    for i, chunk in enumerate(_CHUNK_READERS[fmt](source, chunksize)):
+        if i == 0:
+            missing = [column for column in REQUIRED_COLUMNS if column not in chunk.columns]
+            if missing:
+                raise ValueError(f"파일에 필수 컬럼이 없습니다: {', '.join(missing)}")
+        yield normalize_comment_chunk(chunk)
+
+
+class CommentTable:
+    """열 단위로 보관하는 댓글 목록 (pandas DataFrame)"""
+
+    def __init__(self, df):
+        self.df = df
+
+    def __len__(self):
+        return len(self.df)
+
+    def sample(self, max_comments=DEFAULT_SAMPLE_SIZE, by="likes"):
+        """by 기준 상위 max_comments개 댓글을 dict 목록으로 반환 (같은 값이면 파일 순서)"""
+        df = self.df
+        if max_comments is not None and len(df) > max_comments:
+            df = df.nlargest(max_comments, by, keep="first")
+        return df.to_dict("records")
+
+    def to_records(self):
+        """전체 댓글을 dict 목록으로 반환"""
+        return self.df.to_dict("records")
+
+
+def read_comment_table(source, fmt=None, chunksize=INGEST_CHUNK_SIZE):
+    """댓글 파일 전체를 CommentTable로 읽기 (source: 경로 또는 파일 객체)"""
+    chunks = []
+    rows = 0
+    for chunk in iter_comment_chunks(source, fmt=fmt, chunksize=chunksize):
+        chunks.append(chunk)
+        rows += len(chunk)
+        events.write(f"🔄 댓글 {rows:,}개 읽는 중...")
+    if not chunks:
+        return CommentTable(normalize_comment_chunk(pd.DataFrame(columns=list(COMMENT_COLUMNS))))
+    return CommentTable(pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0])
@@ -0,0 +1,298 @@
+"""백그라운드 작업 실행기
+
+자동화 실행을 Streamlit 스크립트 실행과 분리하기 위한 모듈입니다. 작업은 프로세스 단위의
+JobRunner 스레드 풀에서 실행되고, 상태/진행률/로그는 로컬 SQLite(JobStore)에 저장되므로
+위젯 조작으로 인한 rerun이나 브라우저 연결 종료와 관계없이 계속 진행됩니다.
+UI는 JobStore를 주기적으로 조회해 상태를 표시합니다.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict
+
+from . import config, events
+from .engine import PipelineSettings, purge_stale_data, run_batch_automation, run_full_automation
+
+# 작업 종류
+JOB_KEYWORD = "keyword"  # 단일 키워드 자동화
+JOB_BATCH = "batch"  # 시트 키워드 배치 처리
+
+# 작업 상태
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+STATUS_INTERRUPTED = "interrupted"
+
+FINISHED_STATUSES = (STATUS_SUCCEEDED, STATUS_FAILED, STATUS_INTERRUPTED)
+
+# 동시에 실행할 수 있는 최대 작업 수 (모든 사용자 공통)
+DEFAULT_MAX_CONCURRENT_JOBS = int(os.environ.get("TEACHER_FINDER_MAX_JOBS", "2"))
+
+# 진행률은 이벤트가 잦으므로 이 간격(초)보다 자주 저장하지 않음
+PROGRESS_SAVE_INTERVAL = 1.0
+
+# 끝난 작업의 로그를 보관하는 기간 (초, 작업 종료 시각 기준)
+JOB_LOG_MAX_AGE = 30 * 24 * 60 * 60
+
+# 끝난 작업마다 남겨 두는 최근 로그 수
+JOB_LOG_KEEP_PER_JOB = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    label TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    step INTEGER DEFAULT 0,
+    progress REAL DEFAULT 0,
+    message TEXT DEFAULT '',
+    result TEXT,
+    error TEXT DEFAULT '',
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS job_logs (
+    job_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    level TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_job_logs_job ON job_logs (job_id, ts);
+"""
+
+
+class JobStore:
+    """작업 상태와 로그를 저장하는 SQLite 저장소 (스레드 간 공유 가능)"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(config.DATA_DIR, "jobs.db")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def _execute(self, sql, params=()):
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def create(self, kind, label, params):
+        job_id = uuid.uuid4().hex[:12]
+        self._execute(
+            "INSERT INTO jobs (id, kind, label, params, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, kind, label, json.dumps(params, ensure_ascii=False), STATUS_QUEUED, time.time())
+        )
+        return job_id
+
+    def update(self, job_id, **fields):
+        if not fields:
+            return
+        if "result" in fields and fields["result"] is not None:
+            fields["result"] = json.dumps(fields["result"], ensure_ascii=False)
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        self._execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def add_log(self, job_id, level, message):
+        self._execute(
+            "INSERT INTO job_logs (job_id, ts, level, message) VALUES (?, ?, ?, ?)",
+            (job_id, time.time(), level, message)
+        )
+
+    def trim_logs(self, job_id, keep=JOB_LOG_KEEP_PER_JOB):
+        """작업의 로그를 최근 keep개만 남기고 삭제"""
+        self._execute(
+            """
+            DELETE FROM job_logs WHERE job_id = ? AND rowid NOT IN (
+                SELECT rowid FROM job_logs WHERE job_id = ? ORDER BY ts DESC LIMIT ?
+            )
+            """,
+            (job_id, job_id, keep)
+        )
+
+    def purge_logs(self, max_age=JOB_LOG_MAX_AGE):
+        """max_age초보다 전에 끝난 작업의 로그 삭제 (삭제한 로그 수 반환)"""
+        placeholders = ", ".join("?" for _ in FINISHED_STATUSES)
+        cursor = self._execute(
+            f"""
+            DELETE FROM job_logs WHERE job_id IN (
+                SELECT id FROM jobs WHERE status IN ({placeholders}) AND finished_at < ?
+            )
+            """,
+            (*FINISHED_STATUSES, time.time() - max_age)
+        )
+        return cursor.rowcount
+
+    def get(self, job_id):
+        rows = self._query("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return _decode_job(rows[0]) if rows else None
+
+    def list(self, limit=20):
+        rows = self._query("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,))
+        return [_decode_job(row) for row in rows]
+
+    def list_by_status(self, *statuses):
+        placeholders = ", ".join("?" for _ in statuses)
+        rows = self._query(f"SELECT * FROM jobs WHERE status IN ({placeholders}) ORDER BY created_at", statuses)
+        return [_decode_job(row) for row in rows]
+
+    def recent_logs(self, job_id, limit=50):
+        rows = self._query(
+            "SELECT ts, level, message FROM job_logs WHERE job_id = ? ORDER BY ts DESC LIMIT ?",
+            (job_id, limit)
+        )
+        return list(reversed(rows))
+
+
+def _decode_job(row):
+    row["params"] = json.loads(row["params"])
+    row["result"] = json.loads(row["result"]) if row["result"] else None
+    return row
+
+
+def _summarize_result(result):
+    """KeywordRunResult에서 작업 결과로 저장할 요약만 추출 (스크립트 본문 등 큰 데이터 제외)"""
+    return {
+        "keyword": result.keyword,
+        "run_id": result.run_id,
+        "trace_id": result.trace_id,
+        "success": result.success,
+        "error": result.error,
+        "comments": len(result.comments),
+        "scripts": len(result.scripts),
+        "recommended_videos": [
+            {k: v.get(k) for k in ("video_id", "title", "channel", "score", "url")}
+            for v in result.store.recommendations(min_score=config.MIN_RECOMMEND_SCORE)
+        ]
+    }
+
+
+class JobRunner:
+    """프로세스 단위 작업 실행기
+
+    submit()된 작업은 max_concurrent_jobs개의 워커 스레드에서 순서대로 실행됩니다.
+    하나의 프로세스에서 JobRunner는 하나만 만들어 공유해야 합니다 (get_job_runner 참고).
+    """
+
+    def __init__(self, store=None, max_concurrent_jobs=DEFAULT_MAX_CONCURRENT_JOBS):
+        self.store = store or JobStore()
+        self._executor = events.ContextThreadPoolExecutor(
+            max_workers=max_concurrent_jobs,
+            thread_name_prefix="teacher-finder-job"
+        )
+        self._recover()
+        self.store.purge_logs()
+        purge_stale_data()
+
+    def _recover(self):
+        """이전 프로세스에서 실행 중이던 작업은 중단 처리하고, 대기 중이던 작업은 다시 실행"""
+        for job in self.store.list_by_status(STATUS_RUNNING):
+            self.store.update(
+                job["id"],
+                status=STATUS_INTERRUPTED,
+                finished_at=time.time(),
+                error="프로세스 재시작으로 작업이 중단되었습니다."
+            )
+        for job in self.store.list_by_status(STATUS_QUEUED):
+            self._executor.submit(self._run, job["id"])
+
+    def submit_keyword(self, keyword, settings):
+        """단일 키워드 자동화 작업 등록"""
+        params = {"keyword": keyword, "settings": asdict(settings)}
+        return self._submit(JOB_KEYWORD, f"키워드 '{keyword}'", params)
+
+    def submit_batch(self, spreadsheet_url, keywords, execution_count, settings):
+        """시트 키워드 배치 처리 작업 등록"""
+        params = {
+            "spreadsheet_url": spreadsheet_url,
+            "keywords": list(keywords),
+            "execution_count": execution_count,
+            "settings": asdict(settings)
+        }
+        label = f"배치 {min(execution_count, len(keywords))}개 키워드"
+        return self._submit(JOB_BATCH, label, params)
+
+    def _submit(self, kind, label, params):
+        job_id = self.store.create(kind, label, params)
+        self._executor.submit(self._run, job_id)
+        return job_id
+
+    def _run(self, job_id):
+        job = self.store.get(job_id)
+        if not job or job["status"] != STATUS_QUEUED:
+            return
+
+        self.store.update(job_id, status=STATUS_RUNNING, started_at=time.time())
+        last_progress_save = 0.0
+
+        def record_event(event):
+            nonlocal last_progress_save
+            if event.kind == "log":
+                self.store.add_log(job_id, event.level, event.message)
+                if event.level in ("subheader", "success", "error"):
+                    self.store.update(job_id, message=event.message)
+            elif event.kind == "progress":
+                now = time.time()
+                if now - last_progress_save >= PROGRESS_SAVE_INTERVAL or event.fraction >= 1.0:
+                    last_progress_save = now
+                    self.store.update(job_id, step=event.step, progress=event.step * 20 + event.fraction * 20)
+
+        try:
+            # 저장된 설정이 현재 PipelineSettings와 맞지 않으면(업그레이드 등) 실패로 기록
+            params = job["params"]
+            settings = PipelineSettings(**params["settings"])
+            # 작업을 등록한 화면(Streamlit 스크립트 스레드)의 구독자에게는 이벤트를 보내지 않음
+            with events.subscribe(record_event, exclusive=True):
+                if job["kind"] == JOB_BATCH:
+                    results = run_batch_automation(
+                        params["spreadsheet_url"],
+                        params["keywords"],
+                        params["execution_count"],
+                        settings
+                    )
+                else:
+                    results = [run_full_automation(params["keyword"], settings)]
+
+            succeeded = bool(results) and all(r.success for r in results)
+            self.store.update(
+                job_id,
+                status=STATUS_SUCCEEDED if succeeded else STATUS_FAILED,
+                result=[_summarize_result(r) for r in results],
+                error="" if succeeded else "; ".join(f"{r.keyword}: {r.error}" for r in results if not r.success),
+                finished_at=time.time()
+            )
+            if succeeded:
+                self.store.update(job_id, progress=100)
+        except Exception as e:
+            self.store.add_log(job_id, "exception", str(e))
+            self.store.update(job_id, status=STATUS_FAILED, error=str(e), finished_at=time.time())
+        finally:
+            self.store.trim_logs(job_id)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner():
+    """프로세스 전역 JobRunner (처음 호출할 때 생성)"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
@@ -0,0 +1,163 @@
+"""이미 점수를 매긴 영상 기록 (매칭 결과 재사용)
+
+콘텐츠 매칭에서 Claude가 평가한 영상을 (영상 ID, 분석 지문)별로 저장해 두고, 다음 실행에서
+같은 영상이 다시 후보에 오르면 비슷한 분석으로 최근에 매긴 점수와 인사이트를 재사용합니다.
+재사용한 영상은 Claude에 다시 보내지 않습니다.
+
+분석 지문은 키워드 분석의 결핍 키워드, 관련 키워드, 솔루션, 검색 키워드를 정규화한 단어 집합입니다.
+(구조화 필드가 없는 분석은 원문의 단어) 두 분석의 지문 자카드 유사도가 min_similarity 이상이고
+점수가 max_age_days일 이내이면 재사용합니다.
+
+추천 목록에 없던 영상(점수를 받지 못한 영상)도 평가한 것으로 기록해 다시 보내지 않습니다.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from . import config
+
+# 재사용할 수 있는 점수의 최대 나이 (일)
+LEDGER_MAX_AGE_DAYS = 14
+
+# 재사용할 수 있는 분석 지문의 최소 유사도 (자카드)
+LEDGER_MIN_SIMILARITY = 0.6
+
+# 재사용 현황 이벤트의 단계 이름 (stage_completed, 데이터: candidates/reused/sent/reuse_rate)
+STAGE_SCORE_REUSE = "score_reuse"
+
+# 한 번에 조회하는 영상 ID 수 (SQLite 변수 수 제한)
+_LOOKUP_CHUNK_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scored_videos (
+    video_id TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    terms TEXT NOT NULL,
+    score REAL,
+    recommendation TEXT,
+    scored_at REAL NOT NULL,
+    PRIMARY KEY (video_id, fingerprint)
+);
+CREATE INDEX IF NOT EXISTS idx_scored_videos_scored_at ON scored_videos (video_id, scored_at);
+"""
+
+_WORD_PATTERN = re.compile(r"[0-9A-Za-z가-힣]{2,}")
+
+
+def _normalize(term):
+    return " ".join(str(term).lower().split())
+
+
+def analysis_fingerprint_terms(keywords_analysis):
+    """분석 지문에 쓰는 단어 집합"""
+    if not keywords_analysis:
+        return frozenset()
+    terms = set()
+    for item in keywords_analysis.get("keywords") or []:
+        terms.add(item.get("deficiency", ""))
+        terms.update(item.get("related_keywords") or [])
+    for item in keywords_analysis.get("deficiency_solution_pairs") or []:
+        terms.add(item.get("deficiency", ""))
+        terms.update(item.get("solutions") or [])
+    terms.update(keywords_analysis.get("search_keywords") or [])
+    terms = {_normalize(term) for term in terms if term}
+    if not terms:
+        terms = set(_WORD_PATTERN.findall(keywords_analysis.get("raw_text", "").lower()))
+    return frozenset(terms)
+
+
+def fingerprint_id(terms):
+    """단어 집합의 해시 (같은 분석 지문 구분용)"""
+    return hashlib.sha1("\n".join(sorted(terms)).encode("utf-8")).hexdigest()[:16]
+
+
+def similarity(terms, other_terms):
+    """두 단어 집합의 자카드 유사도"""
+    if not terms or not other_terms:
+        return 0.0
+    return len(terms & other_terms) / len(terms | other_terms)
+
+
+class ScoreLedger:
+    """점수를 매긴 영상 SQLite 저장소 (스레드 간 공유 가능)"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(config.DATA_DIR, "ledger.db")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def record(self, terms, video_ids, recommendations, scored_at=None):
+        """배치 하나의 평가 결과 기록 (video_ids 중 recommendations에 없는 영상은 점수 없음으로 기록)"""
+        scored_at = scored_at or time.time()
+        fingerprint = fingerprint_id(terms)
+        terms_json = json.dumps(sorted(terms), ensure_ascii=False)
+        by_video = {recommendation["video_id"]: recommendation for recommendation in recommendations}
+        rows = []
+        for video_id in dict.fromkeys(list(video_ids) + list(by_video)):
+            recommendation = by_video.get(video_id)
+            rows.append((
+                video_id,
+                fingerprint,
+                terms_json,
+                recommendation.get("score") if recommendation else None,
+                json.dumps(recommendation, ensure_ascii=False) if recommendation else None,
+                scored_at,
+            ))
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO scored_videos VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def lookup(self, terms, video_ids, max_age_days=LEDGER_MAX_AGE_DAYS, min_similarity=LEDGER_MIN_SIMILARITY):
+        """재사용할 수 있는 평가 결과 {video_id: 추천 dict 또는 None(점수 없음)}
+
+        영상마다 기준을 만족하는 기록 중 지문이 가장 비슷하고 최근인 것을 고릅니다.
+        """
+        video_ids = list(dict.fromkeys(video_ids))
+        since = time.time() - max_age_days * 24 * 60 * 60
+        rows = []
+        with self._lock:
+            for start in range(0, len(video_ids), _LOOKUP_CHUNK_SIZE):
+                chunk = video_ids[start:start + _LOOKUP_CHUNK_SIZE]
+                rows += self._conn.execute(
+                    f"""
+                    SELECT video_id, terms, recommendation, scored_at FROM scored_videos
+                    WHERE video_id IN ({", ".join("?" * len(chunk))}) AND scored_at >= ?
+                    """,
+                    (*chunk, since)
+                ).fetchall()
+
+        terms_cache = {}
+        best = {}
+        for video_id, terms_json, recommendation, scored_at in rows:
+            if terms_json not in terms_cache:
+                terms_cache[terms_json] = similarity(terms, frozenset(json.loads(terms_json)))
+            rank = (terms_cache[terms_json], scored_at)
+            if rank[0] >= min_similarity and rank > best.get(video_id, ((-1, 0), None))[0]:
+                best[video_id] = (rank, recommendation)
+        return {video_id: json.loads(recommendation) if recommendation else None for video_id, (_, recommendation) in best.items()}
+
+    def purge(self, max_age_days):
+        """max_age_days보다 오래된 기록 삭제 (삭제한 기록 수 반환, 재사용할 수 없는 기록만 지움)"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM scored_videos WHERE scored_at < ?", (time.time() - max_age_days * 24 * 60 * 60,))
+        return cursor.rowcount
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger():
+    """프로세스 전역 ScoreLedger (처음 호출할 때 생성)"""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = ScoreLedger()
+        return _ledger
@@ -0,0 +1,93 @@
+"""외부 API 공용 동시 실행/호출 속도 제한
+
+같은 프로세스에서 실행되는 모든 파이프라인(배치의 여러 키워드, 여러 백그라운드 작업)이
+이 모듈의 제한을 공유합니다.
+
+- stage_slot(group): 단계 그룹(youtube, claude, sheets)별로 동시에 실행되는 단계 수 제한
+- youtube_limiter / claude_limiter: API 요청 단위 호출 속도 제한 (토큰 버킷)
+- youtube_quota: YouTube Data API 할당량 사용량(추정) 집계
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# 단계 그룹
+GROUP_YOUTUBE = "youtube"
+GROUP_CLAUDE = "claude"
+GROUP_SHEETS = "sheets"
+
+# 그룹별로 동시에 실행할 수 있는 단계 수
+STAGE_CONCURRENCY = {
+    GROUP_YOUTUBE: int(os.environ.get("TEACHER_FINDER_YOUTUBE_STAGES", "2")),
+    GROUP_CLAUDE: int(os.environ.get("TEACHER_FINDER_CLAUDE_STAGES", "2")),
+    GROUP_SHEETS: 1,  # 시트 쓰기는 행 위치가 꼬이지 않도록 항상 하나씩
+}
+
+# API 호출 속도 (초당 요청 수)
+YOUTUBE_REQUESTS_PER_SECOND = float(os.environ.get("TEACHER_FINDER_YOUTUBE_QPS", "10"))
+CLAUDE_REQUESTS_PER_MINUTE = float(os.environ.get("TEACHER_FINDER_CLAUDE_RPM", "50"))
+
+# YouTube Data API 메서드별 할당량 비용 (목록에 없는 메서드는 1)
+YOUTUBE_QUOTA_COSTS = {
+    "youtube.search.list": 100,
+}
+
+
+class RateLimiter:
+    """스레드 간 공유되는 토큰 버킷 (rate: 초당 토큰 수, capacity: 최대 연속 호출 수)"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """토큰을 얻을 때까지 대기"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class QuotaCounter:
+    """API 할당량 사용량 집계 (스레드 안전)"""
+
+    def __init__(self):
+        self._used = 0
+        self._lock = threading.Lock()
+
+    def add(self, units):
+        with self._lock:
+            self._used += units
+
+    @property
+    def used(self):
+        with self._lock:
+            return self._used
+
+
+youtube_limiter = RateLimiter(YOUTUBE_REQUESTS_PER_SECOND)
+claude_limiter = RateLimiter(CLAUDE_REQUESTS_PER_MINUTE / 60.0, capacity=max(1.0, CLAUDE_REQUESTS_PER_MINUTE / 10))
+youtube_quota = QuotaCounter()
+
+_stage_semaphores = {group: threading.BoundedSemaphore(limit) for group, limit in STAGE_CONCURRENCY.items()}
+
+
+@contextmanager
+def stage_slot(group):
+    """group에 속한 단계를 실행할 자리가 날 때까지 대기 (group이 None이면 제한 없음)"""
+    semaphore = _stage_semaphores.get(group)
+    if semaphore is None:
+        yield
+        return
+    with semaphore:
+        yield
@@ -0,0 +1,390 @@
+"""Claude를 이용한 콘텐츠 매칭 및 영업 이메일 생성"""
+import concurrent.futures
+import time
+
+from . import clients, config, events, limits, parsers
+from .analysis import format_analysis_for_prompt, has_structured_analysis
+from .ledger import LEDGER_MAX_AGE_DAYS, LEDGER_MIN_SIMILARITY, STAGE_SCORE_REUSE, analysis_fingerprint_terms
+
+def index_matching_result(matching_text):
+    """매칭 결과 텍스트를 한 번 훑어 영상 ID별 섹션 색인 생성
+
+    {영상 ID: {"section": 섹션 텍스트, "channel": 채널명, "content_type": 콘텐츠 유형}}을 반환합니다.
+    섹션은 '[영상 ID]'로 시작하는 줄부터 다음 영상 블록 전까지입니다. (parsers.parse_matching_blocks)
+    """
+    if not matching_text:
+        return {}
+    return parsers.index_matching_blocks(parsers.parse_matching_blocks(matching_text))
+
+
+def matching_section(matching_index, video_id):
+    """색인에서 영상의 매칭 결과 섹션 찾기 (없으면 안내 문구)"""
+    entry = matching_index.get(video_id)
+    return entry["section"] if entry else f"[{video_id}] 관련 매칭 결과를 찾을 수 없습니다."
+
+
+def extract_recommended_videos(matching_text, matching_index=None):
+    """매칭 결과에서 추천 영상 정보 추출 (개선된 버전)
+
+    채널명과 콘텐츠 유형은 matching_index(없으면 새로 만듦)에서 찾습니다.
+    """
+    events.write("✅ 매칭 결과에서 추천 영상 추출 시작")
+    recommended_videos = []  # 추천 영상 정보를 저장할 리스트 초기화
+    
+    try:
+        if matching_index is None:
+            matching_index = index_matching_result(matching_text)
+
+        # 최종 추천 영상 섹션 찾기
+        final_blocks = parsers.parse_final_recommendations(matching_text)
+        if final_blocks is not None:
+            events.write("✅ 최종 추천 영상 섹션 발견")
+            events.write(f"✅ 추천 영상 패턴 검색 결과: {len(final_blocks)}개 발견")
+            
+            for i, block in enumerate(final_blocks, 1):
+                video_id = block.video_id
+                title = block.title
+                score = block.score
+                
+                events.write(f"✅ 영상 {i} 발견: '{title}', ID: {video_id}, 점수: {score}/10")
+                
+                # 채널명, 콘텐츠 유형 찾기 (영상별 섹션 색인에서 조회)
+                entry = matching_index.get(video_id, {})
+                channel = entry.get("channel", "Unknown")
+                content_type = entry.get("content_type", "Unknown")
+                
+                # 추천 영상 추가
+                recommended_videos.append({
+                    "rank": i,
+                    "title": title,
+                    "channel": channel,
+                    "score": score,
+                    "url": f"https://www.youtube.com/watch?v={video_id}",
+                    "video_id": video_id,
+                    "content_type": content_type  # 여기서 정의된 변수 사용
+                })
+                
+                events.write(f"✅ 추천 영상으로 추가됨: '{title}', 점수: {score}/10")
+        else:
+            # 기존 패턴으로 시도 - 영상별 분석 패턴
+            events.write("⚠️ 최종 추천 영상 섹션이 없습니다. 일반 패턴으로 검색합니다.")
+            listed_videos = parsers.parse_listed_videos(matching_text)
+            
+            for i, (title, channel, url, video_id, score) in enumerate(listed_videos, 1):
+                events.write(f"✅ 영상 발견: '{title}', 점수: {score}/10")
+                
+                # 영상 추가
+                recommended_videos.append({
+                    "rank": i,
+                    "title": title,
+                    "url": url,
+                    "channel": channel,
+                    "score": score,
+                    "video_id": video_id,
+                    "content_type": "Unknown"  # 기본값 설정
+                })
+                
+                # 8.5점 이상인 경우 로그 표시
+                if score >= 5.0:
+                    events.write(f"✅ 추천 영상으로 선택됨: '{title}', 점수: {score}/10")
+        
+        # 점수 순으로 정렬
+        recommended_videos.sort(key=lambda x: x["score"], reverse=True)
+        
+        if not recommended_videos:
+            events.write("⚠️ 영상을 찾지 못했습니다.")
+        else:
+            events.write(f"✅ 총 {len(recommended_videos)}개의 영상을 발견했습니다.")
+            recommended_count = len([v for v in recommended_videos if v["score"] >= 5.0])
+            events.write(f"✅ 그 중 5.0점 이상 추천 영상: {recommended_count}개")
+    
+    except Exception as e:
+        events.error(f"❌ 추천 영상 추출 중 오류 발생: {str(e)}")
+        events.exception(e)  # 상세 오류 출력
+    
+    return recommended_videos
+
+def extract_batch_recommendations(batch_result):
+    """배치 결과에서 추천 영상 정보 추출 (parsers.parse_batch_recommendations)"""
+    try:
+        return parsers.parse_batch_recommendations(batch_result)
+    except Exception as e:
+        events.error(f"추천 영상 추출 중 오류 발생: {str(e)}")
+        return []
+
+def format_final_recommendations(recommendations):
+    """추천 영상 정보를 최종 결과 포맷으로 변환"""
+    formatted_text = ""
+    
+    # 8.5점 이상 영상만 필터링
+    high_score_recommendations = [r for r in recommendations if r.get("score", 0) >= 5.0]
+    
+    for i, rec in enumerate(high_score_recommendations, 1):
+        formatted_text += f"""
+[{rec['video_id']}] - {rec['title']} - 종합 점수: {rec['score']}/10
+* 링크: {rec['url']}
+* 채널: {rec['channel']}
+* 주요 키워드: {rec.get('keywords', '정보 없음')}
+* 교육 콘텐츠 점수: {rec.get('educational_score', 0)}/10 | 교육자/경험 전달자 점수: {rec.get('teacher_score', 0)}/10
+* 키워드 매칭: {rec.get('keyword_score', 0)}/10 | 발화 유사성: {rec.get('similarity_score', 0)}% | 결핍-솔루션: {rec.get('deficiency_score', 0)}/10
+* 주요 결핍 유형: {rec.get('deficiency_types', '정보 없음')}
+
+<인사이트>
+{rec.get('insight', '추가 분석 정보 없음')}
+
+"""
+    
+    if not high_score_recommendations:
+        formatted_text = "5.0점 이상의 추천 영상이 없습니다."
+    
+    return formatted_text
+
+# 기존 함수를 새 버전으로 교체
+def match_content_with_claude(keywords_analysis, scripts_data, batch_size=2, max_workers=3, ledger=None,
+                              max_age_days=LEDGER_MAX_AGE_DAYS, min_similarity=LEDGER_MIN_SIMILARITY):
+    """Claude API를 사용해 키워드와 스크립트 매칭 분석 (병렬 처리 적용)
+
+    ledger(ledger.ScoreLedger)를 넘기면 비슷한 분석으로 최근에 평가한 영상은 기록된 점수를 재사용하고
+    나머지 영상만 Claude에 보낸 뒤, 새로 평가한 결과를 ledger에 기록합니다.
+    """
+    events.update_progress(3, 0.1)  # 진행 상태 10%
+    
+    client = clients.get_claude_client()
+
+    # 이전에 평가한 영상 재사용
+    reused = {}
+    fingerprint_terms = analysis_fingerprint_terms(keywords_analysis) if ledger else None
+    if ledger:
+        reused = ledger.lookup(fingerprint_terms, [s['video_id'] for s in scripts_data], max_age_days, min_similarity)
+        scripts_data = [s for s in scripts_data if s['video_id'] not in reused]
+        total_candidates = len(scripts_data) + len(reused)
+        reuse_rate = len(reused) / total_candidates if total_candidates else 0.0
+        events.success(f"♻️ 이전 평가 재사용: {len(reused)}/{total_candidates}개 ({reuse_rate:.0%}), Claude로 보낼 영상 {len(scripts_data)}개")
+        events.stage_completed(STAGE_SCORE_REUSE, {
+            "candidates": total_candidates,
+            "reused": len(reused),
+            "sent": len(scripts_data),
+            "reuse_rate": reuse_rate,
+        })
+    
+    # 매칭 프롬프트 준비
+    prompt_template = config.read_prompt(config.MATCHING_PROMPT_PATH)
+    
+    # 키워드 분석 데이터 준비 (구조화된 필드만 요약해서 넣고, 추출된 필드가 없으면 분석 전체)
+    keywords_data = format_analysis_for_prompt(keywords_analysis, ("keywords", "message_framework"))
+    if has_structured_analysis(keywords_analysis):
+        pairs_data = format_analysis_for_prompt(keywords_analysis, ("deficiency_solution_pairs",))
+    else:
+        pairs_data = ""  # 분석 전체에 이미 포함됨
+    events.write(f"✅ 매칭 프롬프트용 키워드 분석 요약: {len(keywords_data) + len(pairs_data)}자 (전체 분석 {len(keywords_analysis.get('raw_text', ''))}자)")
+    
+    # 스크립트를 batch_size 크기의 그룹으로 나누기
+    script_batches = [scripts_data[i:i+batch_size] for i in range(0, len(scripts_data), batch_size)]
+    events.write(f"✅ 스크립트를 {len(script_batches)}개 배치로 나눠서 처리합니다 (배치당 최대 {batch_size}개)")
+    
+    # 병렬 처리 시작
+    batch_results = []
+    combined_recommendations = []
+    completed = 0
+    total = len(script_batches)
+    
+    # 배치들을 max_workers 개씩 병렬로 처리
+    for i in range(0, total, max_workers):
+        current_batch_indices = list(range(i, min(i + max_workers, total)))
+        events.write(f"🔄 {len(current_batch_indices)}개 배치 병렬 처리 시작 (배치 {i+1}~{min(i+max_workers, total)}/{total})")
+        
+        with events.ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+            # 배치 처리 함수 정의
+            def process_batch(batch_index):
+                batch = script_batches[batch_index]
+                
+                # 배치의 스크립트 데이터 준비
+                scripts_text = ""
+                for script in batch:
+                    scripts_text += f"""
+                    **영상 ID**: {script['video_id']}
+                    **채널명**: {script['channel_name']}
+                    **영상 제목**: {script['title']}
+                    **카테고리**: {script.get('category_id', 'Unknown')}
+                    **영상 링크**: {script['video_link']}
+                    **조회수**: {script.get('view_count', 0)}
+                    **스크립트**: {script.get('script', 'No transcript available')}
+                    
+                    """
+                
+                # 프롬프트에 데이터 삽입
+                prompt = prompt_template.replace("{핵심 키워드 데이터}", keywords_data)
+                prompt = prompt.replace("{결핍-솔루션 페어 데이터}", pairs_data)
+                prompt = prompt.replace("{크롤링한 스크립트 데이터}", scripts_text)
+                
+                max_retry = 2
+                retry_count = 0
+                
+                while retry_count <= max_retry:
+                    try:
+                        events.write(f"🔄 배치 {batch_index+1}/{total} Claude API 요청 중...")
+                        # 배치별 API 호출
+                        limits.claude_limiter.acquire()
+                        response = clients.create_claude_message(
+                            client,
+                            attempt=retry_count,
+                            model=config.CLAUDE_MODEL,
+                            max_tokens=8000,
+                            temperature=0.4,
+                            system="당신은 유튜브 댓글에서 추출한 핵심 키워드와 크롤링한 여러 유튜브 영상 스크립트 사이의 일치점을 찾는 전문가입니다.",
+                            messages=[{"role": "user", "content": prompt}]
+                        )
+                        
+                        # 응답 처리
+                        events.write(f"✅ 배치 {batch_index+1}/{total} 매칭 분석 완료!")
+                        return response.content[0].text
+                    except Exception as e:
+                        retry_count += 1
+                        events.error(f"Claude API 호출 중 오류 발생 (배치 {batch_index+1}): {str(e)}")
+                        if retry_count <= max_retry:
+                            events.info(f"배치 {batch_index+1} 재시도 중... ({retry_count}/{max_retry})")
+                            time.sleep(2)  # 잠시 대기 후 재시도
+                        else:
+                            events.error(f"최대 재시도 횟수 초과 (배치 {batch_index+1})")
+                            return None
+                
+                return None
+            
+            # 배치 인덱스에 대해 병렬로 함수 실행
+            futures = {executor.submit(process_batch, j): j for j in current_batch_indices}
+            
+            # 완료된 작업 결과 수집
+            for future in concurrent.futures.as_completed(futures):
+                batch_index = futures[future]
+                completed += 1
+                progress = 0.1 + (0.8 * (completed / total))
+                events.update_progress(3, progress)
+                
+                try:
+                    result = future.result()
+                    if result:
+                        batch_results.append(result)
+                        # 개별 배치 결과에서 추천 영상만 추출
+                        batch_recommendations = parsers.parse_batch_recommendations(result)
+                        combined_recommendations.extend(batch_recommendations)
+                        if ledger:
+                            ledger.record(fingerprint_terms, [s['video_id'] for s in script_batches[batch_index]], batch_recommendations)
+                except Exception as e:
+                    events.error(f"처리 결과 가져오기 실패: {str(e)}")
+    
+    # 최종 결과 통합
+    try:
+        events.update_progress(3, 0.9)  # 진행 상태 90%
+        events.write("✅ 모든 배치 처리 완료. 결과 통합 중...")
+        
+        if len(batch_results) == 0 and (total > 0 or not reused):
+            events.error("❌ 모든 배치 처리가 실패했습니다.")
+            return None
+        
+        # 재사용한 추천 영상 추가 (점수를 받지 못했던 영상은 제외)
+        combined_recommendations.extend(recommendation for recommendation in reused.values() if recommendation)
+        
+        # 점수 순으로 정렬
+        combined_recommendations.sort(key=lambda x: x.get("score", 0), reverse=True)
+        
+        # 최종 결과 템플릿
+        final_result = f"""# 키워드-스크립트 매칭 결과
+        
+## 최종 추천 영상 (관련성 점수 5.0점 이상)
+
+{format_final_recommendations(combined_recommendations)}
+
+"""
+        
+        events.update_progress(3, 1.0)  # 진행 상태 100%
+        return final_result
+        
+    except Exception as e:
+        events.error(f"최종 결과 통합 중 오류 발생: {str(e)}")
+        events.exception(e)
+        return "\n\n".join([result for result in batch_results if result])
+
+# 5. 영업 이메일 생성 함수들
+def generate_email_with_claude(recommended_video, keywords_analysis, script_data=None):
+    """Claude API를 사용해 맞춤형 영업 이메일 생성"""
+    events.update_progress(4, 0.5)  # 진행 상태 50%
+    
+    client = clients.get_claude_client()
+    
+    # 영상 스크립트 찾기
+    video_script = None
+    if script_data:
+        for script in script_data:
+            if script['video_id'] == recommended_video.get('video_id'):
+                video_script = script.get('script', '')
+                break
+    
+    # 스크립트 내용 요약 (너무 길면 잘라냄)
+    script_excerpt = ""
+    if video_script:
+        if len(video_script) > 3000:
+            script_excerpt = video_script[:3000] + "..."
+        else:
+            script_excerpt = video_script
+    
+    prompt = f"""
+    당신은 온라인 교육 플랫폼 '클래스유'의 사업개발 본부장 강승권입니다. 다음 정보를 바탕으로 선생님에게 보낼 개인화된 영업 이메일을 작성해 주세요.
+    
+    ## 선생님 정보
+    - 채널명: {recommended_video['channel']}
+    - 영상 제목: {recommended_video['title']}
+    - 영상 URL: {recommended_video['url']}
+    
+    ## 영상 스크립트 (일부 내용)
+    ```
+    {script_excerpt}
+    ```
+    
+    ## 키워드 분석 결과
+    {format_analysis_for_prompt(keywords_analysis)}
+    
+    ## 작성 지침
+    1. 선생님의 콘텐츠에 대한 진정한 감사와 관심을 표현하세요.
+    2. 선생님의 특정 영상(제목 명시)을 봤다고 언급하고, 그 영상에서 어떤 구체적인 부분에 감동받았는지 실제 스크립트 내용을 인용하며 서술하세요.
+    3. 결핍-집착 모델에 기반하여 선생님의 콘텐츠가 시청자들의 어떤 심리적 니즈를 충족시키는지 언급하세요.
+    4. 클래스유 플랫폼이 어떤 가치를 제공할 수 있는지 구체적으로 설명하세요.
+    5. 성공 사례를 간략히 언급하세요 (예: 유근용님 1,138만회, 샤이니쌤 683만회, 월 정산 금액 등).
+    6. 구체적인 협업 제안과 다음 단계를 포함하세요.
+    7. 친근하고 전문적인 톤을 유지하세요.
+    8. 이메일 길이는 300-500단어로 제한하세요.
+    
+    ## 이메일 형식
+    아래 형식을 참고하되, 선생님의 콘텐츠 특성과 스크립트 내용을 반영한 자연스러운 이메일을 작성하세요:
+    
+    ```
+    [선생님 호칭] 안녕하세요~!
+    저는 클래스유 사업개발 본부장 강승권이라고 합니다.
+    
+    **[선생님]의 [특정 콘텐츠/분야]를 더 많은 사람들에게 전달하고 싶어 이렇게 협업을 제안드립니다.**
+    
+    저는 얼마 전 [선생님]의 "[구체적인 영상 제목]" 영상을 보았습니다. 특히 "[영상에서 인상적이었던 구체적인 내용/말씀 인용]" 부분에 큰 감동을 받았습니다. [이 내용이 나에게 어떤 영향을 주었는지 간략히 설명]
+    
+    저희는 온라인 클래스 플랫폼으로 **'누구나 자신의 무한한 잠재력을 믿게 만든다'**는 사명을 갖고 수많은 선생님들의 이야기를 회원들에게 전달하는 역할을 하고 있습니다.
+    
+    [협업 제안 및 다음 단계]
+    
+    회신 부탁드립니다~!
+    ```
+    """
+    
+    try:
+        limits.claude_limiter.acquire()
+        response = clients.create_claude_message(
+            client,
+            model=config.CLAUDE_MODEL,
+            max_tokens=2000,
+            temperature=0.7,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        
+        email_content = response.content[0].text
+        events.update_progress(4, 1.0)  # 이 단계 완료
+        return email_content
+    except Exception as e:
+        events.error(f"Claude API 호출 중 오류 발생: {str(e)}")
+        return None
@@ -0,0 +1,358 @@
+"""Claude 응답 파서 (매칭 결과, 키워드 분석)
+
+응답 텍스트를 줄 단위로 한 번만 훑는 상태 기계로 파싱합니다. 정규식은 모듈을 불러올 때
+한 번만 컴파일하고, 채널명/콘텐츠 유형 같은 필드는 문서 전체가 아니라 해당 영상 블록
+안에서만 찾습니다.
+
+매칭 응답의 영상 블록 (matching_prompt.txt 출력 형식):
+
+    [영상 ID] - 영상 제목 - 종합 점수: X/10
+    * 링크: https://www.youtube.com/watch?v=영상 ID
+    * 채널: 채널명
+    * 주요 키워드: 키워드1, 키워드2
+    * 콘텐츠 품질: X/10 | 제작자 역량: X/10 | 키워드 연관성: X/10
+
+    <인사이트>
+    인사이트 문단
+
+블록은 '[영상 ID]'로 시작하는 줄부터 다음 블록 시작 줄 전까지입니다. 제목에 '-'가 들어
+있어도 마지막 '- 종합 점수' 앞까지를 제목으로 읽습니다.
+
+키워드 분석 응답(insighter_prompt.txt 응답 형식)은 '### 2. 핵심 키워드 및 연관 키워드' 같은
+제목으로 섹션을 나누고, 섹션 안의 '- **이름**: 값' 항목과 들여쓴 하위 항목을 읽습니다.
+"""
+import re
+
+# 블록 시작 줄 '[영상 ID]' (앞에 붙은 마크다운 기호는 무시)
+_BLOCK_START_PATTERN = re.compile(r'^[#*>\s]*\[([^\[\]\n]+)\]')
+# 추천 영상 머리 줄 '[영상 ID] - 제목 - 종합 점수: X/10'
+_RECOMMENDATION_HEADER_PATTERN = re.compile(
+    r'^[#*>\s]*\[([^\[\]\n]+)\]\s*-\s*(.+?)\s*-\s*\**\s*종합\s*점수\s*\**\s*:\s*(\d+(?:\.\d+)?)\s*/\s*10'
+)
+# 점수 값 'X/10' 또는 'N%' (필드 줄 '* 이름: 값'은 정규식 없이 ':'로 나눔)
+_SCORE_VALUE_PATTERN = re.compile(r'[\s*]*(\d+(?:\.\d+)?)\s*(?:/\s*10|%)')
+_VIDEO_URL_PATTERN = re.compile(r'https://www\.youtube\.com/watch\?v=([\w-]+)')
+# 최종 추천 영상 섹션이 없을 때의 영상별 분석 형식 ('영상 N: 제목' / 채널명 / 링크 / 관련성 점수)
+_LISTED_VIDEO_START_PATTERN = re.compile(r'영상\s*\d+\s*:\s*(.*?)\s*$')
+_BULLET_PATTERN = re.compile(r'^(\s*)[-*•]\s+(.*?)\s*$')
+_NUMBERED_ITEM_PATTERN = re.compile(r'^\s*\d+\.\s*(.+?)\s*$')
+# 마크다운 제목 ('## 제목' 또는 한 줄 전체가 '**제목**')
+_HEADING_PATTERN = re.compile(r'^\s*(?:#|\*\*[^*].*\*\*\s*$)')
+
+INSIGHT_MARKER = "<인사이트>"
+FINAL_SECTION_MARKER = "최종 추천 영상"
+SEARCH_KEYWORD_SECTION_MARKER = "유튜브 검색 최적화 키워드"
+
+# 키워드 분석 섹션 (구조화 필드 이름, 제목에 들어가는 문구)
+ANALYSIS_SECTIONS = (
+    ("keywords", ("핵심 키워드",)),
+    ("deficiency_solution_pairs", ("결핍-솔루션",)),
+    ("message_framework", ("발화 추정", "메시지 프레임워크")),
+)
+
+# 하위 항목 들여쓰기 기준 (이보다 깊게 들여쓴 '-' 항목은 바로 위 항목의 하위 항목)
+_CHILD_INDENT = 2
+
+# 점수 이름별 추천 정보 필드 (이전 출력 형식과 현재 프롬프트 형식을 모두 지원)
+EDUCATIONAL_SCORE_LABELS = ("교육 콘텐츠 점수", "콘텐츠 품질")
+TEACHER_SCORE_LABELS = ("교육자/경험 전달자 점수", "교육자 점수", "경험 전달자 점수", "교육자 특성 점수", "제작자 역량")
+KEYWORD_SCORE_LABELS = ("키워드 매칭", "키워드 연관성")
+SIMILARITY_SCORE_LABELS = ("발화 유사성",)
+DEFICIENCY_SCORE_LABELS = ("결핍-솔루션",)
+
+
+class MatchingBlock:
+    """매칭 응답의 영상 블록 하나 ('[영상 ID]' 줄부터 다음 블록 전까지)"""
+    __slots__ = ("video_id", "title", "score", "in_final_section", "lines", "fields", "scores", "insight")
+
+    def __init__(self, video_id, title=None, score=None, in_final_section=False):
+        self.video_id = video_id
+        self.title = title
+        self.score = score  # 종합 점수 (추천 영상 머리 줄이 아니면 None)
+        self.in_final_section = in_final_section
+        self.lines = []
+        self.fields = {}  # 필드 이름 -> 값 (블록 안에서 처음 나온 값)
+        self.scores = {}  # 점수 이름 -> 점수 (블록 안에서 처음 나온 값)
+        self.insight = ""
+
+    @property
+    def section(self):
+        return "\n".join(self.lines).strip()
+
+    def field(self, *labels, default=""):
+        for label in labels:
+            if label in self.fields:
+                return self.fields[label]
+        return default
+
+    def score_for(self, labels, default=0):
+        for label in labels:
+            if label in self.scores:
+                return self.scores[label]
+        return default
+
+
+def _split_field(text):
+    """'* **이름**: 값' -> (이름, 값) (':'가 없으면 None)"""
+    label, sep, value = text.partition(":")
+    if not sep:
+        return None
+    label = label.strip(" \t*-•")
+    return (label, value.strip().lstrip("* ").rstrip()) if label else None
+
+
+def _read_field_line(line, fields, scores):
+    field = _split_field(line)
+    if field is None:
+        return
+    fields.setdefault(*field)
+    if "/" in line or "%" in line:
+        for part in line.split("|"):
+            score = _split_field(part)
+            value = _SCORE_VALUE_PATTERN.match(score[1]) if score else None
+            if value:
+                scores.setdefault(score[0], float(value.group(1)))
+
+
+def parse_matching_blocks(text):
+    """매칭 응답을 한 번 훑어 영상 블록 목록 반환 (블록 밖의 줄은 무시)"""
+    blocks = []
+    block = None
+    in_final_section = False
+    in_insight = False
+    insight_lines = []
+
+    def close_insight():
+        if block is not None and in_insight and not block.insight:
+            block.insight = "\n".join(insight_lines).strip()
+
+    for line in (text or "").splitlines():
+        start = _BLOCK_START_PATTERN.match(line) if "[" in line else None
+        if start:
+            close_insight()
+            in_insight = False
+            header = _RECOMMENDATION_HEADER_PATTERN.match(line)
+            if header:
+                block = MatchingBlock(header.group(1).strip(), header.group(2).strip(), float(header.group(3)), in_final_section)
+            else:
+                block = MatchingBlock(start.group(1).strip(), in_final_section=in_final_section)
+            block.lines.append(line)
+            blocks.append(block)
+            continue
+
+        if FINAL_SECTION_MARKER in line:
+            in_final_section = True
+        if block is None:
+            continue
+        block.lines.append(line)
+
+        if in_insight:
+            if line.strip():
+                insight_lines.append(line)
+                continue
+            close_insight()
+            in_insight = False
+        elif line.strip() == INSIGHT_MARKER:
+            in_insight = True
+            insight_lines = []
+        elif line.strip():
+            _read_field_line(line, block.fields, block.scores)
+
+    close_insight()
+    return blocks
+
+
+def index_matching_blocks(blocks):
+    """영상 ID별 블록 색인 {영상 ID: {"section", "channel", "content_type"}} (같은 ID는 처음 블록)"""
+    index = {}
+    for block in blocks:
+        if block.video_id in index:
+            continue
+        index[block.video_id] = {
+            "section": block.section,
+            "channel": block.field("채널", "채널명", default="Unknown") or "Unknown",
+            "content_type": block.field("콘텐츠 유형", default="Unknown") or "Unknown",
+        }
+    return index
+
+
+def parse_final_recommendations(text, blocks=None):
+    """'최종 추천 영상' 줄 이후의 추천 영상 머리 줄 목록 [MatchingBlock] (섹션이 없으면 None)"""
+    if FINAL_SECTION_MARKER not in (text or ""):
+        return None
+    if blocks is None:
+        blocks = parse_matching_blocks(text)
+    return [block for block in blocks if block.in_final_section and block.score is not None]
+
+
+def parse_batch_recommendations(text):
+    """배치 매칭 응답에서 추천 영상 정보 목록 추출 (format_final_recommendations 입력 형식)"""
+    recommendations = []
+    for block in parse_matching_blocks(text):
+        if block.score is None:
+            continue
+        teacher_score = block.score_for(TEACHER_SCORE_LABELS, default=None)
+        if teacher_score is None:
+            # 이름이 조금 다른 교육자 점수 ('... 점수')
+            teacher_score = next(
+                (value for label, value in block.scores.items()
+                 if label.endswith("점수") and label not in EDUCATIONAL_SCORE_LABELS and label != "종합 점수"),
+                0
+            )
+        recommendations.append({
+            "video_id": block.video_id,
+            "title": block.title,
+            "channel": block.field("채널", "채널명", default="Unknown") or "Unknown",
+            "score": block.score,
+            "url": f"https://www.youtube.com/watch?v={block.video_id}",
+            "content_type": block.field("콘텐츠 유형", default="Unknown") or "Unknown",
+            "keywords": block.field("주요 키워드"),
+            "educational_score": block.score_for(EDUCATIONAL_SCORE_LABELS),
+            "teacher_score": teacher_score,
+            "keyword_score": block.score_for(KEYWORD_SCORE_LABELS),
+            "similarity_score": int(block.score_for(SIMILARITY_SCORE_LABELS)),
+            "deficiency_score": block.score_for(DEFICIENCY_SCORE_LABELS),
+            "deficiency_types": block.field("주요 결핍 유형"),
+            "insight": block.insight
+        })
+    return recommendations
+
+
+def parse_listed_videos(text):
+    """'영상 N: 제목' 형식의 영상별 분석에서 [(제목, 채널명, 링크, 영상 ID, 관련성 점수)] 추출
+
+    채널명/링크/점수는 해당 영상 항목 안에서만 찾고, 링크와 점수가 있는 항목만 목록에 넣습니다.
+    """
+    videos = []
+    current = None
+
+    def close():
+        if current and current["url"] and current["score"] is not None:
+            videos.append((current["title"], current["channel"], current["url"], current["video_id"], current["score"]))
+
+    for line in (text or "").splitlines():
+        start = _LISTED_VIDEO_START_PATTERN.search(line)
+        if start and "관련성 점수" not in line:
+            close()
+            current = {"title": start.group(1).strip(" *"), "channel": "", "url": "", "video_id": "", "score": None}
+            continue
+        if current is None:
+            continue
+        fields, scores = {}, {}
+        _read_field_line(line, fields, scores)
+        if "채널명" in fields and not current["channel"]:
+            current["channel"] = fields["채널명"]
+        url = _VIDEO_URL_PATTERN.search(line)
+        if url and not current["url"]:
+            current["url"] = url.group(0)
+            current["video_id"] = url.group(1)
+        if "관련성 점수" in scores and current["score"] is None:
+            current["score"] = scores["관련성 점수"]
+    close()
+    return videos
+
+
+def _clean_list_item(item):
+    return item.strip().strip("*\"'“”‘’").strip().strip("[]").strip()
+
+
+def _split_list(value):
+    """'키워드1, 키워드2' -> [키워드1, 키워드2]"""
+    return [item for item in (_clean_list_item(part) for part in re.split(r'[,、]', value)) if item]
+
+
+def _parse_bullet_items(lines):
+    """'- 이름: 값' 항목 목록 [(이름, 값, [(하위 이름, 하위 값)])]"""
+    items = []
+    for line in lines:
+        bullet = _BULLET_PATTERN.match(line)
+        if not bullet:
+            continue
+        field = _split_field(bullet.group(2)) or ("", bullet.group(2))
+        label, value = field[0], _clean_list_item(field[1])
+        if len(bullet.group(1).expandtabs(4)) >= _CHILD_INDENT and items:
+            items[-1][2].append((label, value))
+        else:
+            items.append((label, value, []))
+    return items
+
+
+def parse_insighter_analysis(text):
+    """키워드 분석 응답을 구조화 필드로 변환
+
+    {"keywords": [{"deficiency", "related_keywords"}],
+     "deficiency_solution_pairs": [{"deficiency", "solutions"}],
+     "message_framework": [{"deficiency", "phrases"}],
+     "search_keywords": [검색 키워드]}
+    """
+    section_lines = {name: [] for name, _ in ANALYSIS_SECTIONS}
+    current = None
+    for line in (text or "").splitlines():
+        if _HEADING_PATTERN.match(line):
+            current = next((name for name, markers in ANALYSIS_SECTIONS if any(marker in line for marker in markers)), None)
+            continue
+        if current:
+            section_lines[current].append(line)
+
+    keywords = [
+        {
+            "deficiency": value,
+            "related_keywords": [keyword for _, child in children for keyword in _split_list(child)]
+        }
+        for _, value, children in _parse_bullet_items(section_lines["keywords"])
+        if value
+    ]
+    pairs = [
+        {
+            "deficiency": value,
+            "solutions": [solution for _, child in children for solution in _split_list(child)]
+        }
+        for _, value, children in _parse_bullet_items(section_lines["deficiency_solution_pairs"])
+        if value
+    ]
+    framework = [
+        {
+            "deficiency": value,
+            "phrases": [phrase for _, phrase in children if phrase]
+        }
+        for _, value, children in _parse_bullet_items(section_lines["message_framework"])
+        if value
+    ]
+    return {
+        "keywords": keywords,
+        "deficiency_solution_pairs": pairs,
+        "message_framework": framework,
+        "search_keywords": parse_search_keywords(text),
+    }
+
+
+def parse_search_keywords(text, max_keywords=10):
+    """'유튜브 검색 최적화 키워드' 섹션의 번호 목록 추출 (없으면 빈 리스트)
+
+    섹션은 섹션 이름이 들어간 줄부터 다음 마크다운 제목 전까지입니다. 섹션 이름이 제목이 아닌
+    본문에 먼저 언급되어도, 그 이름을 가진 제목이 있으면 제목 아래의 목록을 사용합니다.
+    """
+    keywords = []
+    in_section = False
+    from_heading = False
+    for line in (text or "").splitlines():
+        heading = bool(_HEADING_PATTERN.match(line))
+        if SEARCH_KEYWORD_SECTION_MARKER in line and (heading or not (in_section or keywords)):
+            if heading:
+                from_heading = True
+            keywords = []
+            in_section = True
+            continue
+        if not in_section:
+            continue
+        if heading:
+            in_section = False
+            if from_heading and keywords:
+                break
+            continue
+        item = _NUMBERED_ITEM_PATTERN.match(line)
+        if item:
+            keyword = _clean_list_item(item.group(1))
+            if keyword:
+                keywords.append(keyword)
+    return keywords[:max_keywords]
@@ -0,0 +1,167 @@
+"""실행 단위 레코드 저장소
+
+파이프라인 단계 사이에서 주고받는 댓글/영상/채널/스크립트/추천/이메일 데이터를
+__slots__ 레코드로 한 번 변환해 RunStore에 모으고, 영상 ID·채널 ID·점수 색인으로 조회합니다.
+단계마다 리스트를 처음부터 훑지 않고, 레코드는 dict보다 메모리를 적게 씁니다.
+
+레코드는 읽기 전용 dict처럼 record["video_id"], record.get("script", "")으로도 읽을 수 있어
+dict를 받던 기존 함수에 그대로 넘길 수 있습니다. 체크포인트, 이벤트, 화면에는 to_dict()로
+변환한 dict를 사용합니다.
+"""
+import bisect
+from collections import defaultdict
+
+
+class Record:
+    """__slots__ 레코드 공통 기능 (FIELDS: {필드 이름: 기본값})
+
+    FIELDS에 없는 키는 extra에 보관해 to_dict()에서 그대로 돌려줍니다.
+    """
+    __slots__ = ("extra",)
+    FIELDS = {}
+
+    def __init__(self, **values):
+        for name, default in self.FIELDS.items():
+            setattr(self, name, values.pop(name, default))
+        self.extra = values or None
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def to_dict(self):
+        data = {name: getattr(self, name) for name in self.FIELDS}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def get(self, key, default=None):
+        if key in self.FIELDS:
+            return getattr(self, key)
+        return (self.extra or {}).get(key, default)
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.FIELDS or bool(self.extra and key in self.extra)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Comment(Record):
+    __slots__ = ("text", "author", "likes", "published_at", "video_id", "thread_id", "is_reply")
+    FIELDS = {"text": "", "author": "", "likes": 0, "published_at": "", "video_id": "", "thread_id": "", "is_reply": False}
+
+
+class Video(Record):
+    __slots__ = ("video_id", "title", "channel_name", "channel_id")
+    FIELDS = {"video_id": "", "title": "", "channel_name": "", "channel_id": ""}
+
+
+class Channel(Record):
+    __slots__ = ("channel_id", "channel_name", "subscriber_count")
+    FIELDS = {"channel_id": "", "channel_name": "", "subscriber_count": 0}
+
+
+class Script(Record):
+    __slots__ = (
+        "video_id", "title", "channel_name", "channel_id", "description", "view_count", "like_count",
+        "published_at", "duration_seconds", "category_id", "video_link", "subscriber_count", "script",
+    )
+    FIELDS = {
+        "video_id": "", "title": "", "channel_name": "", "channel_id": "", "description": "", "view_count": 0,
+        "like_count": 0, "published_at": "", "duration_seconds": 0, "category_id": "", "video_link": "",
+        "subscriber_count": 0, "script": "",
+    }
+
+
+class Recommendation(Record):
+    __slots__ = ("rank", "title", "channel", "score", "url", "video_id", "content_type")
+    FIELDS = {"rank": 0, "title": "", "channel": "", "score": 0.0, "url": "", "video_id": "", "content_type": "Unknown"}
+
+
+class Email(Record):
+    __slots__ = ("video_id", "title", "channel", "score", "email")
+    FIELDS = {"video_id": "", "title": "", "channel": "", "score": 0.0, "email": ""}
+
+
+class RunStore:
+    """키워드 한 번의 실행에서 단계들이 공유하는 레코드 저장소 (영상 ID, 채널 ID, 점수 색인)"""
+
+    def __init__(self):
+        self.comments = []
+        self.scripts = []
+        self._scripts_by_video = {}
+        self._scripts_by_channel = defaultdict(list)
+        self._channels = {}
+        self._recommendations_by_video = {}
+        self._recommendations_by_score = []  # 점수 오름차순 (점수, 순번, 레코드)
+        self._emails_by_video = {}
+
+    # 댓글
+    def add_comments(self, comments):
+        self.comments.extend(Comment.from_dict(comment) for comment in comments)
+
+    # 스크립트 / 채널
+    def add_scripts(self, scripts):
+        for data in scripts:
+            script = Script.from_dict(data)
+            self.scripts.append(script)
+            self._scripts_by_video.setdefault(script.video_id, script)
+            if script.channel_id:
+                self._scripts_by_channel[script.channel_id].append(script)
+            channel_key = script.channel_id or script.channel_name
+            if channel_key not in self._channels:
+                self._channels[channel_key] = Channel(
+                    channel_id=script.channel_id,
+                    channel_name=script.channel_name,
+                    subscriber_count=script.subscriber_count
+                )
+
+    def script(self, video_id):
+        return self._scripts_by_video.get(video_id)
+
+    def scripts_for_channel(self, channel_id):
+        return list(self._scripts_by_channel.get(channel_id, ()))
+
+    def channels(self):
+        return list(self._channels.values())
+
+    # 추천 영상
+    def add_recommendations(self, recommendations):
+        for data in recommendations:
+            recommendation = Recommendation.from_dict(data)
+            self._recommendations_by_video.setdefault(recommendation.video_id, recommendation)
+            bisect.insort(
+                self._recommendations_by_score,
+                (recommendation.score, len(self._recommendations_by_score), recommendation),
+                key=lambda entry: (entry[0], entry[1])
+            )
+
+    def recommendation(self, video_id):
+        return self._recommendations_by_video.get(video_id)
+
+    def recommendations(self, min_score=None):
+        """min_score 이상인 추천 영상 (추가된 순서, 점수 색인에서 이분 탐색으로 범위를 찾음)"""
+        entries = self._recommendations_by_score
+        start = bisect.bisect_left(entries, min_score, key=lambda entry: entry[0]) if min_score is not None else 0
+        return [entry[2] for entry in sorted(entries[start:], key=lambda entry: entry[1])]
+
+    # 이메일
+    def add_emails(self, emails):
+        """{video_id: {title, channel, score, email}} 형식의 이메일 추가"""
+        for video_id, data in emails.items():
+            self._emails_by_video[video_id] = Email.from_dict({**data, "video_id": video_id})
+
+    def email(self, video_id):
+        return self._emails_by_video.get(video_id)
+
+    def emails(self, min_score=None):
+        """min_score 이상인 이메일 (추가된 순서)"""
+        return [email for email in self._emails_by_video.values() if min_score is None or email.score >= min_score]
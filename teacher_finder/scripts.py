@@ -0,0 +1,342 @@
+"""영상 정보 및 스크립트(자막) 수집"""
+import concurrent.futures
+import time
+
+from . import clients, events, tracing
+from .search import get_top_videos_by_keyword
+from .channels import get_channel_registry
+
+
+# 3. 스크립트 수집 함수들
+def get_video_transcript(video_id):
+    """유튜브 영상의 스크립트(자막) 가져오기"""
+    events.write(f"✅ 영상 ID '{video_id}'의 스크립트 수집 시작")
+    try:
+        from youtube_transcript_api import YouTubeTranscriptApi
+        events.write(f"✅ YouTubeTranscriptApi 요청 시작")
+        attributes = {tracing.ATTR_DEPENDENCY: tracing.DEPENDENCY_TRANSCRIPT, "youtube.video_id": video_id}
+        with tracing.start_as_current_span("transcript.get_transcript", attributes) as span:
+            transcript_list = YouTubeTranscriptApi.get_transcript(video_id, languages=['ko'])
+            full_transcript = " ".join([entry['text'] for entry in transcript_list])
+            span.set_attributes({"transcript.segments": len(transcript_list), "http.response.body.size": len(full_transcript.encode("utf-8"))})
+        events.write(f"✅ 스크립트 수집 완료: {len(full_transcript)} 글자")
+        return full_transcript
+    except Exception as e:
+        events.warning(f"⚠️ 스크립트 수집 중 오류 발생: {str(e)}")
+        return None
+
+def collect_scripts_parallel(videos, max_videos_per_keyword, filter_duplicate_channels, collected_channels, min_duration_seconds, max_duration_seconds, max_age_days, min_subscribers, max_workers=5):
+    """여러 영상의 정보와 스크립트를 병렬로 수집"""
+    results = []
+    successful_count = 0
+    
+    # 상태 표시 변수
+    completed = 0
+    total = len(videos)
+    
+    def process_video(video):
+        video_id = video["video_id"]
+        channel_name = video["channel_name"]
+        
+        # 중복 채널 필터링
+        if filter_duplicate_channels and (channel_name in collected_channels or video.get("channel_id") in collected_channels):
+            return None
+            
+        # 영상 상세 정보 가져오기
+        video_details = get_video_details(
+            video_id, 
+            min_duration_seconds, 
+            max_duration_seconds, 
+            max_age_days,
+            min_subscribers
+        )
+        
+        if not video_details:
+            return None
+            
+        # 스크립트 가져오기
+        transcript = get_video_transcript(video_id)
+        
+        if transcript:
+            video_details["script"] = transcript
+            return video_details
+        
+        return None
+    
+    with events.ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+        # 여러 영상을 병렬로 처리
+        future_to_video = {executor.submit(process_video, video): video for video in videos}
+        
+        # 완료된 작업 결과 수집
+        for future in concurrent.futures.as_completed(future_to_video):
+            completed += 1
+            
+            # st.empty() 사용 대신 직접 상태 출력
+            events.write(f"병렬 처리 중: {completed}/{total} 완료 (성공: {successful_count}개)")
+            
+            try:
+                result = future.result()
+                if result:  # 유효한 결과만 추가
+                    results.append(result)
+                    collected_channels.add(result['channel_name'])
+                    successful_count += 1
+                    
+                    # 이미 충분한 영상을 수집했으면 종료
+                    if len(results) >= max_videos_per_keyword:
+                        break
+            except Exception as e:
+                video = future_to_video[future]
+                events.warning(f"영상 '{video['title']}' 처리 중 오류: {str(e)}")
+    
+    return results
+
+def get_channel_details(channel_id):
+    """유튜브 채널의 상세 정보(구독자 수 등) 가져오기"""
+    events.write(f"✅ 채널 ID '{channel_id}'의 상세 정보 수집 시작")
+    
+    max_retries = 3
+    retry_count = 0
+    
+    while retry_count < max_retries:
+        try:
+            events.write(f"✅ YouTube API 요청 시작: channel_id='{channel_id}'")
+            with clients.borrow_youtube_client() as youtube:
+                if not youtube:
+                    events.error("YouTube API 클라이언트를 생성할 수 없습니다.")
+                    return None
+                channel_response = youtube.channels().list(
+                    part="snippet,statistics",
+                    id=channel_id
+                ).execute()
+            
+            if not channel_response.get("items"):
+                events.warning(f"⚠️ 채널 ID '{channel_id}'의 정보를 찾을 수 없음")
+                return None
+            
+            channel_info = channel_response["items"][0]
+            statistics = channel_info["statistics"]
+            
+            # 구독자 수 가져오기 (비공개인 경우 0으로 처리)
+            subscriber_count = int(statistics.get("subscriberCount", 0))
+            
+            events.write(f"✅ 채널 정보 수집 완료: 구독자 수 {subscriber_count}명")
+            
+            return {
+                "channel_id": channel_id,
+                "subscriber_count": subscriber_count
+            }
+            
+        except Exception as e:
+            retry_count += 1
+            events.error(f"채널 정보 요청 오류: {str(e)}. 재시도 중... ({retry_count}/{max_retries})")
+            time.sleep(2)  # 잠시 대기 후 재시도
+            if retry_count >= max_retries:
+                events.error(f"최대 재시도 횟수({max_retries})를 초과했습니다.")
+                return None
+    
+    return None
+
+def get_channels_details_parallel(channel_ids, max_workers=5):
+    """여러 채널의 정보를 병렬로 수집"""
+    results = {}
+    
+    def process_channel(channel_id):
+        return (channel_id, get_channel_details(channel_id))
+    
+    with events.ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+        # 여러 채널을 병렬로 처리
+        future_to_channel = {executor.submit(process_channel, cid): cid for cid in channel_ids}
+        
+        # 완료된 작업 결과 수집
+        for future in concurrent.futures.as_completed(future_to_channel):
+            try:
+                channel_id, result = future.result()
+                if result:  # 유효한 결과만 추가
+                    results[channel_id] = result
+            except Exception as e:
+                channel_id = future_to_channel[future]
+                events.warning(f"채널 ID {channel_id} 처리 중 오류: {str(e)}")
+    
+    return results
+
+def get_video_details(video_id, min_duration_seconds=180, max_duration_seconds=1800, max_age_days=730, min_subscribers=5000):
+    events.write(f"✅ 영상 ID '{video_id}'의 상세 정보 수집 시작")
+    
+    max_retries = 3
+    retry_count = 0
+    
+    while retry_count < max_retries:
+        try:
+            events.write(f"✅ YouTube API 요청 시작: video_id='{video_id}'")
+            with clients.borrow_youtube_client() as youtube:
+                if not youtube:
+                    events.error("YouTube API 클라이언트를 생성할 수 없습니다.")
+                    return None
+                video_response = youtube.videos().list(
+                    part="snippet,statistics,contentDetails",
+                    id=video_id
+                ).execute()
+            
+            if not video_response.get("items"):
+                events.warning(f"⚠️ 영상 ID '{video_id}'의 정보를 찾을 수 없음")
+                return None
+            
+            video_info = video_response["items"][0]
+            snippet = video_info["snippet"]
+            statistics = video_info["statistics"]
+            content_details = video_info["contentDetails"]
+            
+            # 채널명 및 제목 가져오기
+            channel_name = snippet["channelTitle"]
+            title = snippet["title"]
+            description = snippet["description"]
+            category_id = snippet.get("categoryId", "")
+            
+            # 채널 ID 가져오기
+            channel_id = snippet["channelId"]
+            
+            # 채널 정보 가져오기
+            channel_details = get_channel_details(channel_id)
+            
+            if channel_details:
+                # 구독자 수 확인
+                subscriber_count = channel_details["subscriber_count"]
+                
+                # 구독자 수가 최소 구독자 수보다 적으면 필터링
+                if subscriber_count < min_subscribers:
+                    events.write(f"⚠️ 영상 ID '{video_id}'의 채널 구독자 수({subscriber_count}명)가 최소 기준({min_subscribers}명)보다 적어 제외됩니다.")
+                    return None
+                
+                # 구독자 수 정보 추가
+                video_details = {
+                    "subscriber_count": subscriber_count
+                }
+            
+            # 업로드 날짜 확인
+            from datetime import datetime, timezone
+            published_at = snippet["publishedAt"]
+            published_date = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
+            current_date = datetime.now(timezone.utc)
+            days_since_published = (current_date - published_date).days
+            
+            # 업로드 날짜 필터링만 유지
+            if max_age_days > 0 and days_since_published > max_age_days:
+                events.write(f"⚠️ 영상 ID '{video_id}'는 업로드 기간이 너무 오래되어 제외됩니다(업로드 후 {days_since_published}일).")
+                return None
+            
+            # 영상 길이 확인 (길이 제한 적용)
+            duration = content_details.get("duration", "")
+            if duration:
+                # ISO 8601 형식의 duration을 초 단위로 변환
+                import re
+                duration_match = re.match(r'PT(\d+H)?(\d+M)?(\d+S)?', duration)
+                if duration_match:
+                    hours = int(duration_match.group(1)[:-1]) if duration_match.group(1) else 0
+                    minutes = int(duration_match.group(2)[:-1]) if duration_match.group(2) else 0
+                    seconds = int(duration_match.group(3)[:-1]) if duration_match.group(3) else 0
+                    
+                    total_seconds = hours * 3600 + minutes * 60 + seconds
+                    
+                    if total_seconds < min_duration_seconds:
+                        events.write(f"⚠️ 영상 ID '{video_id}'는 길이가 너무 짧아 제외됩니다 ({total_seconds}초, 최소 {min_duration_seconds}초).")
+                        return None
+                        
+                    if max_duration_seconds > 0 and total_seconds > max_duration_seconds:
+                        events.write(f"⚠️ 영상 ID '{video_id}'는 길이가 너무 길어 제외됩니다 ({total_seconds}초, 최대 {max_duration_seconds}초).")
+                        return None
+            
+            # 조회수 및 좋아요 수 가져오기
+            view_count = int(statistics.get("viewCount", 0))
+            like_count = int(statistics.get("likeCount", 0))
+            
+            # 영상 정보 반환
+            video_details = {
+                "video_id": video_id,
+                "title": title,
+                "channel_name": channel_name,
+                "channel_id": channel_id,
+                "description": description,
+                "view_count": view_count,
+                "like_count": like_count,
+                "published_at": published_at,
+                "duration_seconds": total_seconds if 'total_seconds' in locals() else 0,
+                "category_id": category_id,
+                "video_link": f"https://www.youtube.com/watch?v={video_id}",
+                "subscriber_count": subscriber_count if 'subscriber_count' in locals() else 0
+            }
+            
+            events.write(f"✅ 영상 상세 정보 수집 완료: {title}")
+            return video_details
+            
+        except Exception as e:
+            retry_count += 1
+            events.error(f"영상 정보 요청 오류: {str(e)}. 재시도 중... ({retry_count}/{max_retries})")
+            time.sleep(2)  # 잠시 대기 후 재시도
+            if retry_count >= max_retries:
+                events.error(f"최대 재시도 횟수({max_retries})를 초과했습니다.")
+                return None
+    
+    return None
+
+def collect_scripts_by_keywords(keywords, max_videos_per_keyword=3, filter_duplicate_channels=True, min_duration_seconds=180, max_duration_seconds=1800, max_age_days=1000, min_subscribers=5000, spreadsheet_url=None, known_channels=None):
+    """키워드 리스트로 영상 검색 및 스크립트 수집 (병렬 처리 적용)
+
+    known_channels(저장소의 known_channels())를 주면 spreadsheet_url 대신 그 채널 목록으로 중복을 거릅니다.
+    """
+    events.write(f"✅ 스크립트 수집 시작: {len(keywords)}개 키워드, 키워드당 {max_videos_per_keyword}개 영상, 최소 구독자 수: {min_subscribers}명")
+    events.write(f"✅ 처리할 키워드: {keywords}")
+    events.update_progress(2, 0.1)  # 진행 상태 10%
+    
+    all_scripts = []
+    collected_channels = set()  # 이미 수집한 채널 추적
+    
+    # 스프레드시트에 이미 수집된 채널 (로컬 채널 목록을 시트의 새 행만큼 동기화한 뒤 사용)
+    if known_channels is not None and filter_duplicate_channels:
+        collected_channels = known_channels
+    elif spreadsheet_url and filter_duplicate_channels:
+        events.write("✅ 스프레드시트에서 이미 수집된 채널 확인 중...")
+        registry = get_channel_registry()
+        registry.sync(spreadsheet_url)
+        collected_channels = registry.channel_set(spreadsheet_url)
+        events.write(f"✅ 이미 수집된 {registry.count(spreadsheet_url)}개 채널을 중복 필터링에 적용합니다.")
+    
+    # 병렬 처리 워커 수 설정 (고정값 사용)
+    max_workers = 3  # 적절한 고정값으로 설정
+    events.write(f"✅ 병렬 처리 워커 수: {max_workers}개")
+    
+    for i, keyword in enumerate(keywords):
+        progress = 0.1 + (0.9 * (i / len(keywords)))  # 10%~100% 사이에서 진행
+        events.update_progress(2, progress)
+        
+        events.write(f"✅ 키워드 {i+1}/{len(keywords)} 처리 중: '{keyword}'")
+        
+        # 최대 150개 영상 검색
+        max_search_results = 150
+        videos = get_top_videos_by_keyword(keyword, max_search_results, exclude_shorts=True, min_duration=180)
+        events.write(f"✅ 키워드 '{keyword}'로 {len(videos)}개 영상 찾음")
+        
+        if not videos:
+            events.warning(f"⚠️ 키워드 '{keyword}'로 영상을 찾지 못했습니다.")
+            continue
+        
+        # 병렬 처리로 스크립트 수집
+        keyword_scripts = collect_scripts_parallel(
+            videos, 
+            max_videos_per_keyword, 
+            filter_duplicate_channels, 
+            collected_channels,
+            min_duration_seconds,
+            max_duration_seconds,
+            max_age_days,
+            min_subscribers,
+            max_workers=max_workers
+        )
+        
+        all_scripts.extend(keyword_scripts)
+        
+        events.write(f"✅ 키워드 '{keyword}'에 대해 {len(keyword_scripts)}/{max_videos_per_keyword}개 영상 수집됨")
+    
+    events.write(f"✅ 전체 수집 완료: {len(all_scripts)}개 영상의 스크립트 수집됨")
+    events.write(f"✅ 수집된 채널 수: {len(collected_channels)}개")
+    events.update_progress(2, 1.0)  # 이 단계 완료
+    return all_scripts
@@ -0,0 +1,145 @@
+"""YouTube 영상 검색"""
+import time
+
+from . import clients, events
+
+
+# 1. 데이터 수집 함수들
+def get_youtube_video_id(url):
+    """유튜브 URL에서 동영상 ID 추출"""
+    if "youtube.com/watch?v=" in url:
+        return url.split("youtube.com/watch?v=")[1].split("&")[0]
+    elif "youtu.be/" in url:
+        return url.split("youtu.be/")[1].split("?")[0]
+    return None
+
+def get_top_videos_by_keyword(keyword, max_results=100, exclude_shorts=False, min_duration=0):
+    events.write(f"✅ 키워드 '{keyword}'로 최대 {max_results}개 영상 검색 시작")
+    
+    videos = []
+    next_page_token = None
+    shorts_indicators = ["#shorts", "#short", "#Shorts", "#Short", "shorts", "Shorts", "쇼츠"]
+    
+    max_retries = 3
+    
+    try:
+        # 요청된 결과 수에 도달하거나 더 이상 결과가 없을 때까지 반복
+        while len(videos) < max_results:
+            search_query = keyword
+            if exclude_shorts:
+                search_query = f"{keyword} -shorts"
+            
+            events.write(f"✅ YouTube API 요청 시작: 키워드='{search_query}', 페이지 토큰={next_page_token}")
+            
+            retry_count = 0
+            success = False
+            
+            while retry_count < max_retries and not success:
+                try:
+                    search_params = {
+                        'q': search_query,
+                        'part': "id,snippet",
+                        'maxResults': min(50, max_results - len(videos) + 20),
+                        'type': "video",
+                        'relevanceLanguage': "ko"
+                    }
+                    
+                    if next_page_token:
+                        search_params['pageToken'] = next_page_token
+                        
+                    with clients.borrow_youtube_client() as youtube:
+                        if not youtube:
+                            events.error("YouTube API 클라이언트를 생성할 수 없습니다.")
+                            return videos
+                        search_response = youtube.search().list(**search_params).execute()
+                    success = True
+                
+                except Exception as e:
+                    retry_count += 1
+                    events.error(f"API 요청 오류: {str(e)}. 재시도 중... ({retry_count}/{max_retries})")
+                    time.sleep(2)  # 잠시 대기 후 재시도
+                    if retry_count >= max_retries:
+                        events.error("최대 재시도 횟수 초과")
+                        return videos
+            
+            # 검색된 비디오 ID 목록
+            video_ids = [item["id"]["videoId"] for item in search_response.get("items", []) 
+                        if item["id"]["kind"] == "youtube#video"]
+            
+            if not video_ids:
+                break
+                
+            # 비디오 세부 정보 일괄 가져오기 (길이 확인용)
+            retry_count = 0
+            video_details_success = False
+            
+            while retry_count < max_retries and not video_details_success:
+                try:
+                    with clients.borrow_youtube_client() as youtube:
+                        video_details_response = youtube.videos().list(
+                            part="snippet,contentDetails",
+                            id=",".join(video_ids)
+                        ).execute()
+                    
+                    video_details_success = True
+                    
+                    # 결과 처리 및 필터링
+                    for item in video_details_response.get("items", []):
+                        video_id = item["id"]
+                        snippet = item["snippet"]
+                        title = snippet["title"]
+                        description = snippet.get("description", "")
+                        channel_name = snippet["channelTitle"]
+                        
+                        # 숏츠 필터링
+                        if exclude_shorts and (any(indicator in title for indicator in shorts_indicators) or 
+                                            any(indicator in description for indicator in shorts_indicators)):
+                            events.write(f"⚠️ 숏츠로 판단되는 영상 건너뛰기: '{title}'")
+                            continue
+                        
+                        # 영상 길이 확인 (ISO 8601 형식)
+                        duration = item["contentDetails"]["duration"]
+                        import re
+                        duration_match = re.match(r'PT(\d+H)?(\d+M)?(\d+S)?', duration)
+                        if duration_match:
+                            hours = int(duration_match.group(1)[:-1]) if duration_match.group(1) else 0
+                            minutes = int(duration_match.group(2)[:-1]) if duration_match.group(2) else 0
+                            seconds = int(duration_match.group(3)[:-1]) if duration_match.group(3) else 0
+                            total_seconds = hours * 3600 + minutes * 60 + seconds
+                            
+                            # 최소 길이 필터링
+                            if min_duration > 0 and total_seconds < min_duration:
+                                events.write(f"⚠️ 영상 길이가 너무 짧아 제외됨: '{title}' ({total_seconds}초)")
+                                continue
+                        
+                        videos.append({
+                            "video_id": video_id,
+                            "title": title,
+                            "channel_name": channel_name,
+                            "channel_id": snippet.get("channelId", "")
+                        })
+                        
+                        if len(videos) >= max_results:
+                            break
+                
+                except Exception as e:
+                    retry_count += 1
+                    events.error(f"비디오 세부 정보 요청 오류: {str(e)}. 재시도 중... ({retry_count}/{max_retries})")
+                    time.sleep(2)
+                    if retry_count >= max_retries:
+                        break
+            
+            # 다음 페이지 토큰 확인
+            next_page_token = search_response.get("nextPageToken")
+            if not next_page_token or len(videos) >= max_results:
+                break
+                
+            time.sleep(0.5)
+        
+        events.write(f"✅ 검색 결과: {len(videos)}개 영상 찾음 (최소 길이 {min_duration}초 이상)")
+        return videos
+        
+    except Exception as e:
+        events.error(f"❌ 유튜브 영상 검색 중 오류 발생: {str(e)}")
+        events.exception(e)
+        return videos
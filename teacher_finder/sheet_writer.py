@@ -0,0 +1,226 @@
+"""시트 쓰기 지연 처리 (write-behind)
+
+파이프라인은 추가할 행을 enqueue()로 넘기고 바로 다음 단계로 진행합니다. 넘겨받은 행은
+먼저 디스크의 outbox(DATA_DIR/sheet_outbox/*.json)에 저장되고, 백그라운드 스레드가
+append_rows로 APPEND_CHUNK_SIZE행씩 시트 끝에 추가합니다.
+
+- 실패하면 지수 백오프로 다시 시도하고, 프로세스가 재시작되어도 outbox에 남은 행부터 이어서 씁니다.
+- 청크를 보낼 때마다 outbox 항목의 진행 위치(sent)를 기록하므로 이미 쓴 청크는 다시 보내지 않습니다.
+- 행마다 헤더 다음 열(기록 ID 열)에 '<항목 ID>:<청크 번호>' 표시를 붙여 보냅니다. 청크를 보내기 전에
+  outbox 항목에 보내는 중(in_flight)임을 기록하고, 요청이 시간 초과 등으로 결과를 알 수 없이
+  실패하거나 보내는 중에 프로세스가 종료되면 다시 보내기 전에 기록 ID 열에서 그 표시를 찾아
+  이미 추가된 청크는 건너뜁니다. 다른 writer가 사이에 행을 추가했거나 같은 링크가 이어서 추가되어도
+  청크마다 표시가 다르므로 같은 청크가 두 번 추가되거나 잘못 건너뛰지 않습니다.
+- 추가에 성공하면 응답의 updatedRange로 마지막으로 쓴 행을 기록해 두고, 표시는 그 다음 행부터만
+  찾습니다. (결과를 모르는 실패 뒤에만 기록 ID 열의 끝부분을 읽음)
+- A열이 비어 있는 행이므로 table_range="A1"로 표 시작 위치를 지정해 항상 A열부터 추가합니다.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+
+from gspread.utils import rowcol_to_a1
+
+from . import config, limits, tracing
+from .sheets import forget_spreadsheet, get_or_create_worksheet, invalidate_snapshot
+
+logger = logging.getLogger("teacher_finder")
+
+OUTBOX_DIR = os.path.join(config.DATA_DIR, "sheet_outbox")
+
+# append_rows 한 번에 보낼 최대 행 수
+APPEND_CHUNK_SIZE = 200
+
+# 재시도 대기 시간 (초): RETRY_BASE_DELAY * 2^(실패 횟수-1), 최대 RETRY_MAX_DELAY
+RETRY_BASE_DELAY = 2.0
+RETRY_MAX_DELAY = 300.0
+
+# 중복 확인용 표시를 쓰는 열의 헤더 (헤더 바로 다음 열)
+MARKER_HEADER = "기록 ID"
+
+
+def _write_entry(path, entry):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entry, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _chunk_marker(entry, chunk_start):
+    return f"{entry['id']}:{chunk_start // APPEND_CHUNK_SIZE}"
+
+
+def _column_letter(column):
+    return re.sub(r"\d", "", rowcol_to_a1(1, column))
+
+
+def _last_row(append_response):
+    """append_rows 응답의 updatedRange('시트'!A12:F14)에서 마지막 행 번호 (모르면 None)"""
+    updated_range = ((append_response or {}).get("updates") or {}).get("updatedRange", "")
+    match = re.search(r"(\d+)$", updated_range)
+    return int(match.group(1)) if match else None
+
+
+class SheetWriter:
+    """디스크 outbox를 거쳐 시트에 행을 추가하는 백그라운드 writer (프로세스당 하나)"""
+
+    def __init__(self, outbox_dir=OUTBOX_DIR):
+        self.outbox_dir = outbox_dir
+        os.makedirs(self.outbox_dir, exist_ok=True)
+        self._wakeup = threading.Condition()
+        self._idle = threading.Event()
+        self._stopped = False
+        self._dirty = False
+        self._thread = threading.Thread(target=self._loop, name="teacher-finder-sheet-writer", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, spreadsheet_url, worksheet, headers, rows):
+        """행 추가 요청을 outbox에 저장하고 바로 반환 (outbox 항목 ID 반환)
+
+        행은 헤더 길이에 맞춰 보내고, 헤더 다음 열에 중복 확인용 표시를 붙입니다.
+        """
+        entry_id = f"{time.time():.6f}-{uuid.uuid4().hex[:8]}"
+        _write_entry(os.path.join(self.outbox_dir, f"{entry_id}.json"), {
+            "id": entry_id,
+            "spreadsheet_url": spreadsheet_url,
+            "worksheet": worksheet,
+            "headers": headers,
+            "rows": rows,
+            "marker_column": len(headers) + 1,
+            "search_from": 1,  # 표시를 찾기 시작할 행 (마지막으로 추가를 확인한 행 다음)
+            "sent": 0,
+            "attempts": 0,
+            "in_flight": False,
+            "next_attempt_at": 0,
+            "last_error": "",
+            "trace_context": tracing.current_context()  # 시트에 쓰는 시간을 요청한 실행의 trace에 기록
+        })
+        with self._wakeup:
+            self._dirty = True
+            self._idle.clear()
+            self._wakeup.notify()
+        return entry_id
+
+    def pending(self):
+        """아직 시트에 추가되지 않은 outbox 항목 목록"""
+        entries = []
+        for name in sorted(os.listdir(self.outbox_dir)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.outbox_dir, name), "r", encoding="utf-8") as f:
+                    entries.append(json.load(f))
+            except (OSError, ValueError):
+                logger.exception(f"outbox 항목을 읽지 못했습니다: {name}")
+        return entries
+
+    def wait_until_idle(self, timeout=None):
+        """outbox가 빌 때까지 대기 (CLI 종료 전 등). 모두 쓰였으면 True"""
+        return self._idle.wait(timeout)
+
+    def stop(self):
+        with self._wakeup:
+            self._stopped = True
+            self._wakeup.notify()
+        self._thread.join()
+
+    def _loop(self):
+        while True:
+            with self._wakeup:
+                if self._stopped:
+                    return
+                self._dirty = False
+
+            entries = self.pending()
+            now = time.time()
+            due = [entry for entry in entries if entry["next_attempt_at"] <= now]
+            for entry in due:
+                self._process(entry)
+            if due:
+                continue
+
+            with self._wakeup:
+                if self._stopped:
+                    return
+                if self._dirty:
+                    continue  # 목록을 읽는 사이에 새 항목이 들어옴
+                if not entries:
+                    self._idle.set()
+                retry_times = [entry["next_attempt_at"] for entry in entries]
+                self._wakeup.wait(max(0.1, min(retry_times) - time.time()) if retry_times else None)
+
+    def _process(self, entry):
+        path = os.path.join(self.outbox_dir, f"{entry['id']}.json")
+        rows = entry["rows"]
+        try:
+            headers = entry["headers"]
+            marker_column = entry.get("marker_column") or len(headers) + 1  # 이전 버전의 outbox 항목에는 없음
+            worksheet = get_or_create_worksheet(entry["spreadsheet_url"], entry["worksheet"], headers + [MARKER_HEADER])
+            while entry["sent"] < len(rows):
+                marker = _chunk_marker(entry, entry["sent"])
+                chunk = [
+                    (list(row) + [""] * (marker_column - 1))[:marker_column - 1] + [marker]
+                    for row in rows[entry["sent"]:entry["sent"] + APPEND_CHUNK_SIZE]
+                ]
+                # 이전 시도의 결과를 모르면(실패했거나 보내는 중에 종료됨) 이미 추가되었는지 먼저 확인
+                found_row = None
+                if entry["attempts"] or entry.get("in_flight"):
+                    found_row = self._find_marker(worksheet, marker, marker_column, entry.get("search_from", 1))
+                if found_row:
+                    logger.info(f"이미 추가된 청크를 건너뜁니다: {entry['id']} ({entry['sent']}~)")
+                    last_row = found_row + len(chunk) - 1
+                else:
+                    entry["in_flight"] = True
+                    _write_entry(path, entry)
+                    attributes = {tracing.ATTR_DEPENDENCY: tracing.DEPENDENCY_SHEETS, "sheets.rows": len(chunk), "retry.attempt": entry["attempts"]}
+                    with limits.stage_slot(limits.GROUP_SHEETS), tracing.start_as_current_span("sheets.append_rows", attributes, context=entry.get("trace_context")):
+                        response = worksheet.append_rows(chunk, value_input_option="RAW", table_range="A1")
+                    last_row = _last_row(response)
+                invalidate_snapshot(entry["spreadsheet_url"], entry["worksheet"])
+                if last_row:
+                    entry["search_from"] = last_row + 1
+                entry["sent"] += len(chunk)
+                entry["attempts"] = 0
+                entry["in_flight"] = False
+                _write_entry(path, entry)
+            os.remove(path)
+        except Exception as e:
+            forget_spreadsheet(entry["spreadsheet_url"])
+            entry["attempts"] += 1
+            delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (entry["attempts"] - 1))
+            entry["next_attempt_at"] = time.time() + delay
+            entry["last_error"] = str(e)
+            _write_entry(path, entry)
+            logger.warning(f"시트 행 추가 실패 ({entry['attempts']}회), {delay:.0f}초 후 재시도: {e}")
+
+    @staticmethod
+    def _find_marker(worksheet, marker, marker_column, search_from):
+        """결과를 모르는 실패 뒤에 청크의 표시가 있는 첫 행 번호 찾기 (없으면 None)
+
+        기록 ID 열을 search_from행부터 끝까지만 읽습니다.
+        """
+        letter = _column_letter(marker_column)
+        attributes = {tracing.ATTR_DEPENDENCY: tracing.DEPENDENCY_SHEETS, "sheets.start_row": search_from}
+        with tracing.start_as_current_span("sheets.values_get", attributes):
+            values = worksheet.get(f"{letter}{search_from}:{letter}")
+        for offset, row in enumerate(values):
+            if row and row[0] == marker:
+                return search_from + offset
+        return None
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_sheet_writer():
+    """프로세스 전역 SheetWriter (처음 호출할 때 생성, outbox에 남은 행부터 이어서 씀)"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = SheetWriter()
+        return _writer
@@ -0,0 +1,411 @@
+"""Google 스프레드시트 연동 (키워드 목록, 실행 상태, 리스트업 결과)"""
+import contextvars
+import json
+import threading
+import time
+
+import gspread
+
+from . import config, events, limits, tracing
+from .matching import index_matching_result, matching_section
+
+# 서비스 계정 권한 범위
+SCOPES = [
+    'https://spreadsheets.google.com/feeds',
+    'https://www.googleapis.com/auth/drive'
+]
+
+# 프로세스 전역 gspread 클라이언트와 열어 둔 스프레드시트/워크시트 핸들
+# 인증은 처음 한 번만 하고, 액세스 토큰은 google-auth가 만료 전에 자동으로 갱신합니다.
+_client = None
+_client_lock = threading.Lock()
+_spreadsheets = {}  # URL -> Spreadsheet
+_worksheets = {}  # (URL, 워크시트 이름) -> Worksheet
+_handles_lock = threading.Lock()
+
+
+# Google Sheets API 설정 함수
+def setup_google_sheets():
+    """Google Sheets API 클라이언트 (프로세스 전체에서 공유, 처음 호출할 때 한 번만 인증)"""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            return _client
+
+        try:
+            # 서비스 계정 정보는 JSON 문자열 또는 (secrets.toml 테이블로 넣은 경우) dict
+            service_account_info = config.get_secret("gcp_service_account")
+            if isinstance(service_account_info, str):
+                service_account_info = json.loads(service_account_info)
+
+            # 임시 파일 없이 메모리의 인증 정보로 바로 인증
+            _client = gspread.service_account_from_dict(dict(service_account_info), scopes=SCOPES)
+            return _client
+
+        except Exception as e:
+            events.error(f"Google Sheets 연결 중 오류 발생: {str(e)}")
+            return None
+
+def open_spreadsheet(spreadsheet_url):
+    """URL로 스프레드시트 열기 (한 번 연 스프레드시트는 재사용)"""
+    with _handles_lock:
+        spreadsheet = _spreadsheets.get(spreadsheet_url)
+        if spreadsheet is None:
+            client = setup_google_sheets()
+            if client is None:
+                raise RuntimeError("Google Sheets 클라이언트를 만들 수 없습니다.")
+            spreadsheet = client.open_by_url(spreadsheet_url)
+            _spreadsheets[spreadsheet_url] = spreadsheet
+        return spreadsheet
+
+def get_worksheet(spreadsheet_url, title):
+    """스프레드시트의 워크시트 가져오기 (없으면 gspread.exceptions.WorksheetNotFound)"""
+    key = (spreadsheet_url, title)
+    with _handles_lock:
+        worksheet = _worksheets.get(key)
+    if worksheet is None:
+        worksheet = open_spreadsheet(spreadsheet_url).worksheet(title)
+        with _handles_lock:
+            _worksheets[key] = worksheet
+    return worksheet
+
+def add_worksheet(spreadsheet_url, title, rows, cols):
+    """워크시트를 새로 만들고 핸들을 캐시에 등록"""
+    worksheet = open_spreadsheet(spreadsheet_url).add_worksheet(title=title, rows=rows, cols=cols)
+    with _handles_lock:
+        _worksheets[(spreadsheet_url, title)] = worksheet
+    return worksheet
+
+def forget_spreadsheet(spreadsheet_url):
+    """캐시된 스프레드시트/워크시트 핸들 버리기 (시트가 삭제되거나 바뀌었을 수 있을 때)"""
+    with _handles_lock:
+        _spreadsheets.pop(spreadsheet_url, None)
+        for key in [key for key in _worksheets if key[0] == spreadsheet_url]:
+            del _worksheets[key]
+
+# 리스트업 시트 열 구성 (순서 변경: 빈칸, 채널명, 유튜브 링크, 매칭 결과, 영업 이메일)
+LISTUP_WORKSHEET = "리스트업"
+LISTUP_HEADERS = ["", "채널명", "유튜브 링크", "해당 채널 매칭 결과", "영업 이메일"]
+
+# 스냅샷으로 한 번에 읽는 범위 (워크시트 이름 -> A1 범위)
+KEYWORD_WORKSHEET = "키워드"
+SNAPSHOT_RANGES = {
+    KEYWORD_WORKSHEET: "A:B",  # 키워드, 실행 상태
+    LISTUP_WORKSHEET: "B:B",  # 채널명
+}
+
+# 스냅샷을 다시 읽지 않고 재사용하는 최대 시간 (초)
+SNAPSHOT_MAX_AGE = 60.0
+
+_snapshots = {}  # URL -> SheetSnapshot
+_snapshots_lock = threading.Lock()  # _snapshots 사전만 보호 (읽기는 스프레드시트별 lock)
+
+
+class SheetSnapshot:
+    """values.batchGet으로 읽어 둔 스프레드시트 범위들 (워크시트별로 읽은 시각을 따로 관리)
+
+    tables는 워크시트 이름 -> 행 목록(헤더 포함), missing은 시트가 없던 워크시트 이름입니다.
+    lock은 이 스프레드시트의 스냅샷을 읽고 고치는 동안 잡습니다. (다른 스프레드시트의 읽기는 기다리지 않음)
+    """
+
+    def __init__(self, spreadsheet_url):
+        self.spreadsheet_url = spreadsheet_url
+        self.tables = {}
+        self.missing = set()
+        self.loaded_at = {}
+        self.lock = threading.Lock()
+
+    def table(self, title):
+        """워크시트의 행 목록 (시트가 없으면 gspread.exceptions.WorksheetNotFound)"""
+        if title not in self.tables:
+            raise gspread.exceptions.WorksheetNotFound(title)
+        return self.tables[title]
+
+    def keywords(self):
+        """'키워드' 시트의 [(행 번호, 키워드, 실행 상태)] (헤더 제외)"""
+        return [
+            (i + 1, row[0] if row else "", row[1] if len(row) > 1 else "")
+            for i, row in enumerate(self.table(KEYWORD_WORKSHEET))
+            if i > 0
+        ]
+
+    def listup_channels(self, start_row=2):
+        """'리스트업' 시트 B열의 [(행 번호, 채널명)] (start_row행부터)"""
+        rows = self.table(LISTUP_WORKSHEET)
+        return [(i + 1, row[0] if row else "") for i, row in enumerate(rows) if i + 1 >= start_row]
+
+
+def _batch_get(spreadsheet, titles):
+    if not titles:
+        return {}
+    attributes = {tracing.ATTR_DEPENDENCY: tracing.DEPENDENCY_SHEETS, "sheets.ranges": len(titles)}
+    with tracing.start_as_current_span("sheets.values_batch_get", attributes) as span:
+        response = spreadsheet.values_batch_get([f"'{title}'!{SNAPSHOT_RANGES[title]}" for title in titles])
+        span.set_attribute("sheets.rows", sum(len(value_range.get("values", [])) for value_range in response.get("valueRanges", [])))
+    return {title: value_range.get("values", []) for title, value_range in zip(titles, response.get("valueRanges", []))}
+
+
+def get_snapshot(spreadsheet_url, max_age=SNAPSHOT_MAX_AGE, titles=None):
+    """SNAPSHOT_RANGES를 values.batchGet 한 번으로 읽은 스냅샷
+
+    titles(기본값: SNAPSHOT_RANGES 전체) 중 max_age초 안에 읽은 워크시트는 재사용하고,
+    오래되었거나 invalidate_snapshot()으로 버린 워크시트만 한 요청으로 다시 읽습니다.
+    max_age=0이면 모두 새로 읽습니다.
+    """
+    with _snapshots_lock:
+        snapshot = _snapshots.setdefault(spreadsheet_url, SheetSnapshot(spreadsheet_url))
+    with snapshot.lock:
+        now = time.time()
+        stale = [
+            title for title in (titles or SNAPSHOT_RANGES)
+            if not max_age or now - snapshot.loaded_at.get(title, 0) > max_age
+        ]
+        if not stale:
+            return snapshot
+
+        spreadsheet = open_spreadsheet(spreadsheet_url)
+        try:
+            tables = _batch_get(spreadsheet, stale)
+        except gspread.exceptions.APIError:
+            # 없는 워크시트가 범위에 있으면 요청 전체가 실패하므로, 있는 워크시트만 다시 요청
+            existing = {worksheet.title for worksheet in spreadsheet.worksheets()}
+            tables = _batch_get(spreadsheet, [title for title in stale if title in existing])
+
+        for title in stale:
+            if title in tables:
+                snapshot.tables[title] = tables[title]
+                snapshot.missing.discard(title)
+            else:
+                snapshot.tables.pop(title, None)
+                snapshot.missing.add(title)
+            snapshot.loaded_at[title] = now
+        return snapshot
+
+
+def invalidate_snapshot(spreadsheet_url, title=None):
+    """우리가 시트에 쓴 뒤 해당 워크시트(title이 None이면 전체)의 스냅샷을 버림"""
+    with _snapshots_lock:
+        snapshot = _snapshots.get(spreadsheet_url)
+    if snapshot is None:
+        return
+    with snapshot.lock:
+        for name in ([title] if title else list(SNAPSHOT_RANGES)):
+            snapshot.tables.pop(name, None)
+            snapshot.loaded_at.pop(name, None)
+            snapshot.missing.discard(name)
+
+# 스프레드시트 마지막 수정 시각 (Drive API modifiedTime)
+def get_spreadsheet_modified_time(spreadsheet_url):
+    """스프레드시트의 Drive modifiedTime (RFC 3339 문자열)"""
+    return open_spreadsheet(spreadsheet_url).get_lastUpdateTime()
+
+# 리스트업 시트의 채널명 열을 지정한 행부터 읽는 함수
+def get_listup_channels(spreadsheet_url, start_row=2, max_age=SNAPSHOT_MAX_AGE):
+    """'리스트업' 시트 B열(채널명)을 start_row행부터 끝까지 읽어 [(행 번호, 채널명)] 반환
+
+    처음부터 읽을 때(start_row가 2 이하, 전체 동기화)는 스냅샷을 쓰므로 max_age초 안에 읽은 열은 다시 읽지
+    않습니다. 이어서 읽을 때는 B{start_row}:B 범위만 읽습니다.
+    시트가 없으면 gspread.exceptions.WorksheetNotFound를 그대로 전달합니다.
+    """
+    if start_row <= 2:
+        return get_snapshot(spreadsheet_url, max_age=max_age, titles=[LISTUP_WORKSHEET]).listup_channels(start_row)
+
+    worksheet = get_worksheet(spreadsheet_url, LISTUP_WORKSHEET)
+    attributes = {tracing.ATTR_DEPENDENCY: tracing.DEPENDENCY_SHEETS, "sheets.start_row": start_row}
+    with tracing.start_as_current_span("sheets.values_get", attributes) as span:
+        values = worksheet.get(f"B{start_row}:B")
+        span.set_attribute("sheets.rows", len(values))
+    return [(start_row + i, row[0] if row else "") for i, row in enumerate(values)]
+
+def get_or_create_worksheet(spreadsheet_url, title, headers, rows=1000, cols=20):
+    """워크시트 가져오기 (없으면 만들고 헤더 설정)"""
+    try:
+        return get_worksheet(spreadsheet_url, title)
+    except gspread.exceptions.WorksheetNotFound:
+        events.write(f"✅ '{title}' 워크시트 생성 중")
+        worksheet = add_worksheet(spreadsheet_url, title, rows=rows, cols=cols)
+        worksheet.update("A1", [headers])
+        invalidate_snapshot(spreadsheet_url, title)
+        return worksheet
+
+def build_listup_rows(matching_index, recommended_videos, all_emails):
+    """리스트업 시트에 추가할 행 목록 만들기 (5.0점 이상인 영상만)
+
+    matching_index는 matching.index_matching_result()로 만든 영상 ID별 매칭 결과 색인입니다.
+    """
+    videos_by_id = {v.get('video_id'): v for v in recommended_videos}
+    rows = []
+    for video_id, data in all_emails.items():
+        if data.get('score', 0) >= config.MIN_RECOMMEND_SCORE:
+            video_info = videos_by_id.get(video_id, {})
+
+            # 매칭 결과에서 해당 비디오에 관한 부분만 조회
+            video_matching_result = matching_section(matching_index, video_id)
+
+            rows.append([
+                "",  # 첫 번째 열은 빈칸으로 설정
+                data.get('channel', ''),  # 채널명
+                video_info.get('url', ''),  # 유튜브 링크
+                video_matching_result,  # 해당 채널 매칭 결과
+                data.get('email', '')  # 영업 이메일
+            ])
+    return rows
+
+# 스프레드시트에 영업 이메일 저장 함수 (순서 변경)
+def save_matching_results_to_sheet(spreadsheet_url, matching_results, recommended_videos, all_emails=None):
+    """매칭된 선생님 목록과 영업 이메일을 Google 스프레드시트에 바로 저장
+
+    파이프라인에서는 기다리지 않도록 sheet_writer.get_sheet_writer().enqueue()를 사용합니다.
+    """
+    try:
+        if not all_emails:
+            events.write(f"⚠️ 이메일 데이터가 없어 스프레드시트에 저장하지 않습니다")
+            return True, "스프레드시트에 데이터가 성공적으로 저장되었습니다."
+
+        events.write(f"✅ 저장할 이메일 데이터: {len(all_emails)}개")
+        email_rows = build_listup_rows(index_matching_result(matching_results), recommended_videos, all_emails)
+        events.write(f"✅ 저장할 행 수: {len(email_rows)}개")
+
+        if email_rows:
+            # 시트 전체를 읽지 않고 마지막 행 다음에 바로 추가
+            email_worksheet = get_or_create_worksheet(spreadsheet_url, LISTUP_WORKSHEET, LISTUP_HEADERS)
+            with tracing.start_as_current_span("sheets.append_rows", {tracing.ATTR_DEPENDENCY: tracing.DEPENDENCY_SHEETS, "sheets.rows": len(email_rows)}):
+                email_worksheet.append_rows(email_rows, value_input_option="RAW", table_range="A1")
+            invalidate_snapshot(spreadsheet_url, LISTUP_WORKSHEET)
+            events.write(f"✅ 스프레드시트 데이터 추가 완료")
+        else:
+            events.write(f"⚠️ 저장할 데이터가 없습니다")
+
+        return True, "스프레드시트에 데이터가 성공적으로 저장되었습니다."
+
+    except Exception as e:
+        forget_spreadsheet(spreadsheet_url)
+        error_message = f"스프레드시트 저장 중 오류 발생: {str(e)}"
+        events.error(error_message)
+        return False, error_message
+
+# 매칭 결과에서 특정 비디오에 관한 부분만 추출하는 함수
+def extract_video_matching_result(matching_results, video_id):
+    """매칭 결과 텍스트에서 특정 비디오 ID에 관한 부분만 추출
+
+    여러 영상을 조회할 때는 index_matching_result()로 색인을 한 번 만들어 matching_section()을 사용하세요.
+    """
+    try:
+        return matching_section(index_matching_result(matching_results), video_id)
+    except Exception as e:
+        return f"매칭 결과 추출 중 오류 발생: {str(e)}"
+
+# 시트에서 키워드 목록을 읽어오는 함수
+def get_keywords_from_sheet(spreadsheet_url):
+    """Google 스프레드시트에서 키워드 목록을 가져옵니다."""
+    try:
+        events.write(f"✅ 키워드 목록을 시트에서 가져오는 중...")
+        
+        # 배치 실행에 필요한 범위(키워드, 리스트업 채널명)를 요청 한 번으로 새로 읽음
+        snapshot = get_snapshot(spreadsheet_url, max_age=0)
+        
+        # 키워드 워크시트 찾기
+        try:
+            keyword_rows = snapshot.keywords()
+        except gspread.exceptions.WorksheetNotFound:
+            # 키워드 시트가 없으면 새로 만듦
+            keyword_worksheet = add_worksheet(spreadsheet_url, KEYWORD_WORKSHEET, rows=1000, cols=2)
+            # 헤더 추가
+            keyword_worksheet.update('A1:B1', [["키워드", "실행 상태"]])
+            invalidate_snapshot(spreadsheet_url, KEYWORD_WORKSHEET)
+            events.warning("⚠️ '키워드' 시트가 없어 새로 생성했습니다. 키워드를 입력해주세요.")
+            return []
+        
+        # 헤더 제외하고 키워드 목록 추출 (첫 번째 열)
+        if keyword_rows:
+            keywords = [keyword for _, keyword, _ in keyword_rows if keyword.strip()]
+            events.success(f"✅ {len(keywords)}개의 키워드를 시트에서 가져왔습니다.")
+            return keywords
+        else:
+            events.warning("⚠️ 시트에 키워드가 없습니다.")
+            return []
+            
+    except Exception as e:
+        forget_spreadsheet(spreadsheet_url)
+        events.error(f"❌ 시트에서 키워드 목록을 가져오는 중 오류 발생: {str(e)}")
+        return []
+
+# 키워드의 실행 상태 업데이트 함수
+def update_keyword_status(spreadsheet_url, keyword, status):
+    """키워드의 실행 상태를 시트에 업데이트합니다. (여러 키워드를 갱신할 때는 KeywordStatusBoard 사용)"""
+    KeywordStatusBoard(spreadsheet_url).set(keyword, status)
+
+class KeywordStatusBoard:
+    """'키워드' 시트의 실행 상태(B열)를 모아서 한 번에 쓰는 관리자
+
+    생성할 때 스냅샷(없거나 오래되었으면 한 번 읽음)으로 키워드 → 행 번호 인덱스를 만들고, set()으로 받은 상태 변경은
+    모아 두었다가 flush()에서 batch_update 요청 하나로 씁니다. flush_interval(초)을 주면
+    대기 중인 변경을 그 간격 안에 자동으로 씁니다. 끝나면 close()로 남은 변경을 씁니다.
+    """
+
+    def __init__(self, spreadsheet_url, flush_interval=None):
+        self.spreadsheet_url = spreadsheet_url
+        self.flush_interval = flush_interval
+        self._rows = {}
+        self._pending = {}  # 행 번호 -> (키워드, 상태)
+        self._lock = threading.Lock()
+        self._timer = None
+
+        try:
+            snapshot = get_snapshot(spreadsheet_url, titles=[KEYWORD_WORKSHEET])
+            for row, keyword, _ in snapshot.keywords():
+                self._rows.setdefault(keyword, row)
+        except Exception as e:
+            forget_spreadsheet(spreadsheet_url)
+            events.error(f"❌ 키워드 시트를 읽는 중 오류 발생: {str(e)}")
+
+    def set(self, keyword, status, flush=False):
+        """키워드 상태 변경을 예약 (flush=True면 대기 중인 변경과 함께 바로 씀)"""
+        row = self._rows.get(keyword)
+        if row is None:
+            events.warning(f"⚠️ '키워드' 시트에서 '{keyword}'를 찾지 못해 상태를 업데이트하지 않습니다.")
+            return
+
+        with self._lock:
+            self._pending[row] = (keyword, status)
+            if not flush and self.flush_interval and self._timer is None:
+                # 타이머 스레드에서도 같은 이벤트 구독자에게 로그가 전달되도록 context 복사
+                self._timer = threading.Timer(self.flush_interval, contextvars.copy_context().run, args=(self.flush,))
+                self._timer.daemon = True
+                self._timer.start()
+
+        if flush or not self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """대기 중인 상태 변경을 batch_update 요청 하나로 쓰기"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not pending:
+            return
+
+        try:
+            keyword_worksheet = get_worksheet(self.spreadsheet_url, KEYWORD_WORKSHEET)
+            attributes = {tracing.ATTR_DEPENDENCY: tracing.DEPENDENCY_SHEETS, "sheets.rows": len(pending)}
+            with limits.stage_slot(limits.GROUP_SHEETS), tracing.start_as_current_span("sheets.batch_update", attributes):
+                keyword_worksheet.batch_update([
+                    {"range": f"B{row}", "values": [[status]]}
+                    for row, (_, status) in sorted(pending.items())
+                ])
+            invalidate_snapshot(self.spreadsheet_url, KEYWORD_WORKSHEET)
+            for keyword, status in pending.values():
+                events.write(f"✅ 키워드 '{keyword}'의 상태를 '{status}'로 업데이트했습니다.")
+        except Exception as e:
+            forget_spreadsheet(self.spreadsheet_url)
+            events.error(f"❌ 키워드 상태 업데이트 중 오류 발생: {str(e)}")
+            with self._lock:
+                # 실패한 변경은 다음 flush에서 다시 시도 (그 사이 새로 들어온 상태가 우선)
+                for row, item in pending.items():
+                    self._pending.setdefault(row, item)
+
+    def close(self):
+        """남은 상태 변경을 모두 쓰기"""
+        self.flush()
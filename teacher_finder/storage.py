@@ -0,0 +1,383 @@
+"""파이프라인 저장소 (키워드 목록/상태, 채널 목록, 리스트업 결과)
+
+파이프라인은 저장 위치를 직접 다루지 않고 open_storage()가 돌려주는 저장소를 사용합니다.
+모든 저장소는 같은 메서드와 같은 시트 구성('키워드': 키워드/실행 상태,
+'리스트업': 빈칸/채널명/유튜브 링크/매칭 결과/영업 이메일)을 따릅니다.
+
+- SheetsStorage: Google 스프레드시트 (기존 방식)
+- SQLiteStorage: 로컬 SQLite (오프라인 개발, 부하 테스트, 벤치마크용)
+- MirrorStorage: 로컬 SQLite에서 읽고 먼저 쓰며, 스프레드시트와는 백그라운드로 주고받음
+
+저장소 메서드:
+    get_keywords() -> [키워드]
+    add_keywords(keywords)
+    status_board(flush_interval=None) -> set(keyword, status, flush=False) / close()를 가진 객체
+    known_channels() -> 중복 채널 필터링에 쓰는 집합 형태 객체 (in, add)
+    register_channels([(채널명, 채널 ID)])
+    append_results(rows) -> 결과 메시지
+"""
+import concurrent.futures
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from . import config, events
+from .channels import ChannelRegistry, get_channel_registry
+from .sheet_writer import get_sheet_writer
+from .sheets import (
+    KEYWORD_WORKSHEET,
+    LISTUP_HEADERS,
+    LISTUP_WORKSHEET,
+    KeywordStatusBoard,
+    get_keywords_from_sheet,
+    get_or_create_worksheet,
+    invalidate_snapshot,
+)
+
+# 저장소 종류 (PipelineSettings.storage 값)
+STORAGE_SHEETS = "sheets"
+STORAGE_SQLITE = "sqlite"
+STORAGE_MIRROR = "mirror"
+
+STORAGE_KINDS = (STORAGE_SHEETS, STORAGE_SQLITE, STORAGE_MIRROR)
+
+# 스프레드시트 URL 없이 SQLite만 쓸 때의 작업 공간 이름
+LOCAL_WORKSPACE = "local"
+
+logger = logging.getLogger("teacher_finder")
+
+# 미러 모드에서 스프레드시트의 키워드 상태를 모아서 쓰는 간격 (초)
+MIRROR_STATUS_FLUSH_INTERVAL = 5.0
+
+# 미러 모드에서 로컬 사본(키워드, 채널 목록)을 스프레드시트에서 다시 받아 오는 최소 간격 (초)
+MIRROR_REFRESH_INTERVAL = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS keywords (
+    workspace TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    keyword TEXT NOT NULL,
+    status TEXT DEFAULT '',
+    updated_at REAL,
+    PRIMARY KEY (workspace, keyword)
+);
+CREATE INDEX IF NOT EXISTS idx_keywords_position ON keywords (workspace, position);
+CREATE TABLE IF NOT EXISTS listup (
+    workspace TEXT NOT NULL,
+    memo TEXT DEFAULT '',
+    channel_name TEXT NOT NULL,
+    video_url TEXT DEFAULT '',
+    matching_result TEXT DEFAULT '',
+    email TEXT DEFAULT '',
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_listup_channel ON listup (workspace, channel_name);
+"""
+
+
+class SheetsStorage:
+    """Google 스프레드시트 저장소"""
+
+    def __init__(self, spreadsheet_url):
+        self.spreadsheet_url = spreadsheet_url
+        self.registry = get_channel_registry()
+
+    def get_keywords(self):
+        return get_keywords_from_sheet(self.spreadsheet_url)
+
+    def add_keywords(self, keywords):
+        existing = set(self.get_keywords())
+        new_keywords = [k for k in keywords if k not in existing]
+        if new_keywords:
+            worksheet = get_or_create_worksheet(self.spreadsheet_url, KEYWORD_WORKSHEET, ["키워드", "실행 상태"], cols=2)
+            worksheet.append_rows([[k, ""] for k in new_keywords], value_input_option="RAW", table_range="A1")
+            invalidate_snapshot(self.spreadsheet_url, KEYWORD_WORKSHEET)
+
+    def status_board(self, flush_interval=None):
+        return KeywordStatusBoard(self.spreadsheet_url, flush_interval=flush_interval)
+
+    def known_channels(self):
+        self.registry.sync(self.spreadsheet_url)
+        return self.registry.channel_set(self.spreadsheet_url)
+
+    def register_channels(self, channels):
+        for channel_name, channel_id in channels:
+            self.registry.add(self.spreadsheet_url, channel_name, channel_id)
+
+    def append_results(self, rows):
+        entry_id = get_sheet_writer().enqueue(
+            self.spreadsheet_url,
+            LISTUP_WORKSHEET,
+            LISTUP_HEADERS,
+            rows
+        )
+        return f"{len(rows)}개 행을 스프레드시트 저장 대기열에 추가했습니다. (ID: {entry_id})"
+
+
+class SQLiteStorage:
+    """로컬 SQLite 저장소 (스프레드시트와 같은 구성, 스레드 간 공유 가능)"""
+
+    def __init__(self, workspace=LOCAL_WORKSPACE, path=None):
+        self.workspace = workspace
+        self.path = path or os.path.join(config.DATA_DIR, "storage.db")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+        self.registry = ChannelRegistry(path=os.path.join(os.path.dirname(self.path), "storage_channels.db"))
+
+    def _execute(self, sql, params=()):
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params)
+
+    def _executemany(self, sql, params):
+        with self._lock, self._conn:
+            return self._conn.executemany(sql, params)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def get_keywords(self):
+        rows = self._query("SELECT keyword FROM keywords WHERE workspace = ? ORDER BY position", (self.workspace,))
+        keywords = [row[0] for row in rows]
+        events.success(f"✅ {len(keywords)}개의 키워드를 로컬 저장소에서 가져왔습니다.")
+        return keywords
+
+    def add_keywords(self, keywords):
+        rows = self._query("SELECT COALESCE(MAX(position), 0) FROM keywords WHERE workspace = ?", (self.workspace,))
+        start = rows[0][0] + 1
+        self._executemany(
+            "INSERT OR IGNORE INTO keywords (workspace, position, keyword, updated_at) VALUES (?, ?, ?, ?)",
+            [(self.workspace, start + i, keyword, time.time()) for i, keyword in enumerate(keywords)]
+        )
+
+    def sync_keywords(self, keywords):
+        """키워드 목록을 keywords에 맞춤 (순서 갱신, 빠진 키워드 삭제, 실행 상태는 유지)
+
+        빈 목록은 읽기 실패일 수 있으므로 무시합니다.
+        """
+        if not keywords:
+            return
+        placeholders = ", ".join("?" for _ in keywords)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"DELETE FROM keywords WHERE workspace = ? AND keyword NOT IN ({placeholders})",
+                (self.workspace, *keywords)
+            )
+            self._conn.executemany(
+                """
+                INSERT INTO keywords (workspace, position, keyword, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (workspace, keyword) DO UPDATE SET position = excluded.position
+                """,
+                [(self.workspace, position, keyword, now) for position, keyword in enumerate(keywords, 1)]
+            )
+
+    def get_keyword_statuses(self):
+        """[(키워드, 실행 상태)] (키워드 순서대로)"""
+        return self._query("SELECT keyword, status FROM keywords WHERE workspace = ? ORDER BY position", (self.workspace,))
+
+    def set_keyword_status(self, keyword, status):
+        """키워드 상태 저장 (로컬에 없는 키워드면 목록 끝에 추가)
+
+        앱과 작업은 키워드를 스프레드시트에서 바로 읽으므로 로컬 테이블에 아직 없을 수 있습니다.
+        """
+        self._execute(
+            """
+            INSERT INTO keywords (workspace, position, keyword, status, updated_at)
+            VALUES (?, (SELECT COALESCE(MAX(position), 0) + 1 FROM keywords WHERE workspace = ?), ?, ?, ?)
+            ON CONFLICT (workspace, keyword) DO UPDATE SET status = excluded.status, updated_at = excluded.updated_at
+            """,
+            (self.workspace, self.workspace, keyword, status, time.time())
+        )
+
+    def status_board(self, flush_interval=None):
+        return _SQLiteStatusBoard(self)
+
+    def known_channels(self):
+        return self.registry.channel_set(self.workspace)
+
+    def register_channels(self, channels):
+        for channel_name, channel_id in channels:
+            self.registry.add(self.workspace, channel_name, channel_id)
+
+    def append_results(self, rows):
+        now = time.time()
+        self._executemany(
+            """
+            INSERT INTO listup (workspace, memo, channel_name, video_url, matching_result, email, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [(self.workspace, *row[:5], now) for row in rows]
+        )
+        return f"{len(rows)}개 행을 로컬 저장소에 저장했습니다."
+
+    def get_results(self):
+        """리스트업 행 목록 ([빈칸, 채널명, 유튜브 링크, 매칭 결과, 영업 이메일])"""
+        rows = self._query(
+            "SELECT memo, channel_name, video_url, matching_result, email FROM listup WHERE workspace = ? ORDER BY rowid",
+            (self.workspace,)
+        )
+        return [list(row) for row in rows]
+
+
+class _SQLiteStatusBoard:
+    """SQLite 저장소의 키워드 상태 관리자 (바로 쓰므로 모을 필요 없음)"""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def set(self, keyword, status, flush=False):
+        self.storage.set_keyword_status(keyword, status)
+        events.write(f"✅ 키워드 '{keyword}'의 상태를 '{status}'로 업데이트했습니다.")
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class MirrorStorage:
+    """로컬 SQLite에서 읽고 먼저 쓰며, 스프레드시트와는 백그라운드로 주고받는 저장소
+
+    - 키워드와 채널 목록은 로컬 사본에서 바로 읽고, 사본은 MIRROR_REFRESH_INTERVAL마다
+      백그라운드에서 스프레드시트로 갱신합니다. (사본이 아직 없을 때만 처음 한 번 기다려서 읽음)
+    - 키워드 추가와 채널 등록은 로컬에 바로 쓰고, 키워드는 백그라운드에서 스프레드시트에 추가합니다.
+    - 상태는 MIRROR_STATUS_FLUSH_INTERVAL마다 모아서(flush=True면 바로), 결과는 sheet_writer로 씁니다.
+    """
+
+    def __init__(self, spreadsheet_url):
+        self.spreadsheet_url = spreadsheet_url
+        self.local = SQLiteStorage(workspace=spreadsheet_url)
+        self.remote = SheetsStorage(spreadsheet_url)
+        self._background = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="teacher-finder-mirror")
+        self._pending = set()
+        self._refreshed_at = {}  # 갱신 종류 -> 마지막으로 갱신을 예약한 시각
+        self._lock = threading.Lock()
+
+    def _submit(self, fn, *args):
+        def run():
+            try:
+                fn(*args)
+            except Exception as e:
+                logger.warning(f"미러 저장소 백그라운드 작업 실패 ({fn.__name__}): {e}")
+
+        future = self._background.submit(run)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._forget)
+
+    def _forget(self, future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def _schedule_refresh(self, kind, fn, *args):
+        """MIRROR_REFRESH_INTERVAL 안에 같은 갱신을 예약한 적이 없으면 백그라운드에서 실행"""
+        now = time.time()
+        with self._lock:
+            if now - self._refreshed_at.get(kind, 0) < MIRROR_REFRESH_INTERVAL:
+                return
+            self._refreshed_at[kind] = now
+        self._submit(fn, *args)
+
+    def wait_until_synced(self, timeout=None):
+        """예약된 백그라운드 작업이 끝날 때까지 대기 (CLI 종료 전 등). 모두 끝났으면 True"""
+        with self._lock:
+            pending = list(self._pending)
+        _, not_done = concurrent.futures.wait(pending, timeout=timeout)
+        return not not_done
+
+    def _refresh_keywords(self):
+        self.local.sync_keywords(self.remote.get_keywords())
+
+    def get_keywords(self):
+        keywords = self.local.get_keywords()
+        if keywords:
+            self._schedule_refresh("keywords", self._refresh_keywords)
+            return keywords
+        # 로컬 사본이 없으면 처음 한 번은 스프레드시트에서 읽음
+        with self._lock:
+            self._refreshed_at["keywords"] = time.time()
+        keywords = self.remote.get_keywords()
+        self.local.sync_keywords(keywords)
+        return keywords
+
+    def add_keywords(self, keywords):
+        self.local.add_keywords(keywords)
+        self._submit(self.remote.add_keywords, keywords)
+
+    def status_board(self, flush_interval=None):
+        return _MirrorStatusBoard(
+            self.local.status_board(),
+            self.remote.status_board(flush_interval=flush_interval or MIRROR_STATUS_FLUSH_INTERVAL)
+        )
+
+    def known_channels(self):
+        """스프레드시트 채널 목록의 로컬 사본 (리스트업 시트 동기화는 백그라운드에서)"""
+        registry = self.remote.registry
+        if registry.has_synced(self.spreadsheet_url):
+            self._schedule_refresh("channels", registry.sync, self.spreadsheet_url)
+        else:
+            with self._lock:
+                self._refreshed_at["channels"] = time.time()
+            registry.sync(self.spreadsheet_url)
+        return registry.channel_set(self.spreadsheet_url)
+
+    def register_channels(self, channels):
+        # 둘 다 로컬 SQLite (스프레드시트 사본 레지스트리에는 시트에 쓰이기 전의 등록으로 기록)
+        self.local.register_channels(channels)
+        self.remote.register_channels(channels)
+
+    def append_results(self, rows):
+        self.local.append_results(rows)
+        return self.remote.append_results(rows)
+
+
+class _MirrorStatusBoard:
+    def __init__(self, local_board, remote_board):
+        self.local_board = local_board
+        self.remote_board = remote_board
+
+    def set(self, keyword, status, flush=False):
+        self.local_board.set(keyword, status)
+        # 스프레드시트는 타이머로 모아서 씀 (완료/실패처럼 flush=True인 상태는 바로 씀)
+        self.remote_board.set(keyword, status, flush=flush)
+
+    def flush(self):
+        self.remote_board.flush()
+
+    def close(self):
+        self.remote_board.close()
+
+
+_storages = {}
+_storages_lock = threading.Lock()
+
+
+def open_storage(kind, spreadsheet_url=None):
+    """저장소 열기 (kind: STORAGE_KINDS 중 하나). 스프레드시트가 필요한데 URL이 없으면 None
+
+    같은 종류/URL의 저장소는 프로세스 안에서 하나를 만들어 공유합니다.
+    """
+    if kind not in STORAGE_KINDS:
+        raise ValueError(f"알 수 없는 저장소 종류입니다: {kind} (사용 가능: {', '.join(STORAGE_KINDS)})")
+    if kind != STORAGE_SQLITE and not spreadsheet_url:
+        return None
+
+    with _storages_lock:
+        storage = _storages.get((kind, spreadsheet_url))
+        if storage is None:
+            if kind == STORAGE_SQLITE:
+                storage = SQLiteStorage(workspace=spreadsheet_url or LOCAL_WORKSPACE)
+            elif kind == STORAGE_MIRROR:
+                storage = MirrorStorage(spreadsheet_url)
+            else:
+                storage = SheetsStorage(spreadsheet_url)
+            _storages[(kind, spreadsheet_url)] = storage
+        return storage
@@ -0,0 +1,309 @@
+"""단계/외부 호출 추적 (span)
+
+파이프라인 실행 하나가 trace 하나이고(start_trace), 단계(stage.*)와 외부 호출(youtube.*, transcript.*,
+claude.*, sheets.*)이 그 안의 span입니다. trace 밖에서 시작한 span(화면의 수동 단계 등)은 기록하지 않습니다. span마다 시작/끝 시각, 걸린 시간, 속성(재시도 횟수, 응답 바이트,
+토큰 수 등), 상태(OK/ERROR)를 기록합니다.
+
+API는 OpenTelemetry의 Tracer/Span과 같은 모양입니다. (start_as_current_span, set_attribute,
+record_exception, set_status) 현재 span은 contextvars로 전달되므로 events.ContextThreadPoolExecutor의
+워커 스레드에서 시작한 span도 같은 trace에 속합니다.
+
+끝난 span은 등록된 exporter로 보냅니다.
+- JsonlSpanExporter: DATA_DIR/traces/<trace_id>.jsonl (기본)
+- ConsoleSpanExporter: 표준 오류에 한 줄씩 (TEACHER_FINDER_TRACE_CONSOLE=1)
+
+    with tracing.start_as_current_span("claude.messages.create", {"dependency": "claude"}) as span:
+        response = client.messages.create(...)
+        span.set_attribute("gen_ai.usage.output_tokens", response.usage.output_tokens)
+"""
+import contextvars
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from . import config
+
+TRACE_DIR = os.path.join(config.DATA_DIR, "traces")
+
+# 추적 파일 보관 개수 (오래된 것부터 삭제)
+MAX_TRACE_FILES = 200
+
+STATUS_UNSET = "UNSET"
+STATUS_OK = "OK"
+STATUS_ERROR = "ERROR"
+
+# 외부 의존성 구분 속성 (p50/p95 집계 단위)
+ATTR_DEPENDENCY = "dependency"
+DEPENDENCY_YOUTUBE = "youtube"
+DEPENDENCY_TRANSCRIPT = "transcript"
+DEPENDENCY_CLAUDE = "claude"
+DEPENDENCY_SHEETS = "sheets"
+
+_current_span = contextvars.ContextVar("teacher_finder_current_span", default=None)
+
+
+class Span:
+    """시간 구간 하나 (OpenTelemetry Span과 같은 메서드)"""
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status", "status_description", "events", "recording")
+
+    def __init__(self, name, trace_id, parent_id=None, attributes=None, recording=True):
+        self.name = name
+        self.recording = recording
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.status = STATUS_UNSET
+        self.status_description = ""
+        self.events = []
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes):
+        self.attributes.update(attributes)
+
+    def add_event(self, name, attributes=None):
+        self.events.append({"name": name, "time_unix_nano": time.time_ns(), "attributes": dict(attributes or {})})
+
+    def record_exception(self, exception):
+        self.add_event("exception", {
+            "exception.type": type(exception).__name__,
+            "exception.message": str(exception),
+        })
+
+    def set_status(self, status, description=""):
+        self.status = status
+        self.status_description = description
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            if self.recording:
+                _export(self)
+
+    @property
+    def duration_ms(self):
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1_000_000
+
+    def to_dict(self):
+        """OpenTelemetry JSON 형식과 같은 필드 이름의 dict"""
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "attributes": self.attributes,
+            "status": {"code": self.status, "description": self.status_description},
+            "events": self.events,
+        }
+
+
+@contextmanager
+def start_as_current_span(name, attributes=None, context=None, new_trace=False):
+    """span을 시작해 현재 span으로 두고, 블록이 끝나면 종료 (예외는 ERROR 상태로 기록하고 다시 던짐)
+
+    context(current_context()의 반환값)를 주면 그 span의 자식으로, 없으면 현재 span의 자식으로
+    시작합니다. new_trace=True이면 새 trace의 루트 span이 되고, 부모도 새 trace도 아니면 기록하지
+    않는 span입니다. (그 안에서 시작한 span도 기록하지 않음)
+    """
+    parent = _current_span.get()
+    if new_trace:
+        span = Span(name, secrets.token_hex(16), None, attributes)
+    elif context:
+        span = Span(name, context["trace_id"], context["span_id"], attributes)
+    elif parent:
+        span = Span(name, parent.trace_id, parent.span_id, attributes, recording=parent.recording)
+    else:
+        span = Span(name, "", None, attributes, recording=False)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        span.set_status(STATUS_ERROR, str(e))
+        raise
+    else:
+        if span.status == STATUS_UNSET:
+            span.set_status(STATUS_OK)
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+def start_trace(name, attributes=None):
+    """새 trace의 루트 span 시작 (파이프라인 실행, 벤치마크 등)"""
+    return start_as_current_span(name, attributes, new_trace=True)
+
+
+def get_current_span():
+    return _current_span.get()
+
+
+def current_trace_id():
+    span = _current_span.get()
+    return span.trace_id if span and span.recording else None
+
+
+def current_context():
+    """다른 스레드나 나중 작업(시트 쓰기 대기열 등)에서 이어 붙일 현재 span 위치 (기록 중이 아니면 None)"""
+    span = _current_span.get()
+    return {"trace_id": span.trace_id, "span_id": span.span_id} if span and span.recording else None
+
+
+# exporter
+class JsonlSpanExporter:
+    """trace마다 DATA_DIR/traces/<trace_id>.jsonl 파일에 span을 한 줄씩 추가"""
+
+    def __init__(self, directory=None, max_files=MAX_TRACE_FILES):
+        self.directory = directory or TRACE_DIR
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self._known_traces = set()
+
+    def export(self, span):
+        os.makedirs(self.directory, exist_ok=True)
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            with open(os.path.join(self.directory, f"{span.trace_id}.jsonl"), "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            if span.trace_id not in self._known_traces:
+                self._known_traces.add(span.trace_id)
+                self._prune()
+
+    def _prune(self):
+        paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".jsonl")]
+        if len(paths) <= self.max_files:
+            return
+        for path in sorted(paths, key=os.path.getmtime)[:len(paths) - self.max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class ConsoleSpanExporter:
+    """표준 오류에 span을 한 줄씩 출력"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stderr
+
+    def export(self, span):
+        attributes = " ".join(f"{key}={value}" for key, value in span.attributes.items())
+        self.stream.write(f"[trace {span.trace_id[:8]}] {span.name} {span.duration_ms:.1f}ms {span.status} {attributes}\n")
+
+
+_exporters = [JsonlSpanExporter()]
+if os.environ.get("TEACHER_FINDER_TRACE_CONSOLE"):
+    _exporters.append(ConsoleSpanExporter())
+_exporters_lock = threading.Lock()
+
+
+def add_exporter(exporter):
+    with _exporters_lock:
+        _exporters.append(exporter)
+
+
+def remove_exporter(exporter):
+    with _exporters_lock:
+        if exporter in _exporters:
+            _exporters.remove(exporter)
+
+
+def _export(span):
+    with _exporters_lock:
+        exporters = list(_exporters)
+    for exporter in exporters:
+        try:
+            exporter.export(span)
+        except Exception:
+            pass  # 추적 실패가 파이프라인을 멈추지 않도록 무시
+
+
+# 저장된 trace 읽기 / 집계
+def list_traces(limit=20, directory=None):
+    """최근 trace 목록 [{trace_id, name, start_time_unix_nano, duration_ms, attributes}] (루트 span 기준)"""
+    directory = directory or TRACE_DIR
+    if not os.path.isdir(directory):
+        return []
+    paths = sorted(
+        (os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".jsonl")),
+        key=os.path.getmtime,
+        reverse=True
+    )
+    traces = []
+    for path in paths[:limit]:
+        spans = load_trace(os.path.basename(path)[:-len(".jsonl")], directory)
+        roots = [span for span in spans if not span["parent_span_id"]] or spans
+        if not roots:
+            continue
+        root = min(roots, key=lambda span: span["start_time_unix_nano"])
+        traces.append({
+            "trace_id": root["trace_id"],
+            "name": root["name"],
+            "start_time_unix_nano": root["start_time_unix_nano"],
+            "duration_ms": span_duration_ms(root),
+            "attributes": root["attributes"],
+        })
+    return traces
+
+
+def load_trace(trace_id, directory=None):
+    """trace의 span dict 목록 (시작 순)"""
+    path = os.path.join(directory or TRACE_DIR, f"{os.path.basename(trace_id)}.jsonl")
+    spans = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    spans.append(json.loads(line))
+                except ValueError:
+                    continue  # 쓰는 중인 마지막 줄
+    except OSError:
+        return []
+    return sorted(spans, key=lambda span: span["start_time_unix_nano"])
+
+
+def span_duration_ms(span):
+    return ((span["end_time_unix_nano"] or span["start_time_unix_nano"]) - span["start_time_unix_nano"]) / 1_000_000
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize_dependencies(spans):
+    """외부 의존성별 호출 수, 오류 수, 전체/p50/p95 시간, 바이트, 토큰 [dict] (전체 시간 순)"""
+    groups = {}
+    for span in spans:
+        dependency = span["attributes"].get(ATTR_DEPENDENCY)
+        if dependency:
+            groups.setdefault(dependency, []).append(span)
+    summary = []
+    for dependency, group in groups.items():
+        durations = sorted(span_duration_ms(span) for span in group)
+        attributes = [span["attributes"] for span in group]
+        summary.append({
+            "dependency": dependency,
+            "calls": len(group),
+            "errors": sum(1 for span in group if span["status"]["code"] == STATUS_ERROR),
+            "retries": sum(1 for a in attributes if a.get("retry.attempt", 0) > 0),
+            "total_ms": round(sum(durations), 1),
+            "p50_ms": round(_percentile(durations, 0.5), 1),
+            "p95_ms": round(_percentile(durations, 0.95), 1),
+            "bytes": sum(a.get("http.response.body.size", 0) for a in attributes),
+            "input_tokens": sum(a.get("gen_ai.usage.input_tokens", 0) for a in attributes),
+            "output_tokens": sum(a.get("gen_ai.usage.output_tokens", 0) for a in attributes),
+        })
+    return sorted(summary, key=lambda row: row["total_ms"], reverse=True)
@@ -0,0 +1,63 @@
+"""Claude 응답 파서 골든 파일 테스트
+
+tests/golden/의 기록된 응답(*.txt)을 파싱해 같은 이름의 *.expected.json과 비교합니다.
+파일 이름이 'matching'으로 시작하면 매칭 응답, 'analysis'로 시작하면 키워드 분석 응답입니다.
+파서 동작을 의도적으로 바꿨다면 UPDATE_GOLDEN=1로 실행해 기대값을 다시 기록하고 차이를 검토하세요.
+"""
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from teacher_finder import parsers
+
+GOLDEN_DIR = Path(__file__).parent / "golden"
+RESPONSE_FILES = sorted(GOLDEN_DIR.glob("*.txt"))
+
+
+def _parse_matching(text):
+    blocks = parsers.parse_matching_blocks(text)
+    index = parsers.index_matching_blocks(blocks)
+    final_blocks = parsers.parse_final_recommendations(text, blocks)
+    return {
+        "index": {
+            video_id: {"channel": entry["channel"], "content_type": entry["content_type"]}
+            for video_id, entry in index.items()
+        },
+        "final_recommendations": None if final_blocks is None else [
+            [block.video_id, block.title, block.score] for block in final_blocks
+        ],
+        "batch_recommendations": parsers.parse_batch_recommendations(text),
+        "listed_videos": [list(video) for video in parsers.parse_listed_videos(text)],
+    }
+
+
+def _parse_analysis(text):
+    return parsers.parse_insighter_analysis(text)
+
+
+PARSERS = {
+    "matching": _parse_matching,
+    "analysis": _parse_analysis,
+}
+
+
+def _parse_golden(path):
+    kind = path.stem.split("_")[0]
+    return PARSERS[kind](path.read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("path", RESPONSE_FILES, ids=[path.stem for path in RESPONSE_FILES])
+def test_parser_matches_golden(path):
+    expected_path = path.with_suffix(".expected.json")
+    actual = _parse_golden(path)
+    if os.environ.get("UPDATE_GOLDEN"):
+        expected_path.write_text(json.dumps(actual, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    assert expected_path.exists(), f"{expected_path.name}이 없습니다. UPDATE_GOLDEN=1로 실행해 기록하세요."
+    # JSON을 한 번 거쳐 튜플/리스트 차이 없이 비교
+    assert json.loads(json.dumps(actual, ensure_ascii=False)) == json.loads(expected_path.read_text(encoding="utf-8"))
+
+
+def test_golden_files_present():
+    assert RESPONSE_FILES, "tests/golden에 기록된 응답이 없습니다."